@@ -1,15 +1,26 @@
 import asyncio
 import os
 import traceback
+from collections.abc import AsyncIterator
 from textwrap import dedent
 
 from agno.agent import Agent, RunResponse
-from agno.storage.sqlite import SqliteStorage
-from agno.tools.mcp import MultiMCPTools
+from agno.run.response import RunEvent, RunResponseEvent
 from agno.utils.log import logger
 from dotenv import load_dotenv
 
 from llm_model import get_model
+from mcp_cache import MCPServerSpec
+from mcp_pool import (
+    MCP_REQUEST_TIMEOUT,
+    MCP_STARTUP_TIMEOUT,
+    MCPServerPool,
+    get_mcp_pool,
+)
+from pr_builder import PullRequestTools
+from schema_cache import SchemaCacheHook
+from schema_tools import SchemaTools, fetch_project_schema
+from session_storage import get_session_storage
 
 INSTRUCTIONS = dedent(
     """\
@@ -26,21 +37,22 @@ INSTRUCTIONS = dedent(
        - Apply the requested schema changes using data modeling requests
        - If there is already similar schema change, just return the existing schema
        - Validate the changes by getting the updated schema
+       - Schema reads return a compact view: after a change, the diff and the affected tables in full,
+         and a one-line summary of the other tables. Use get_table_details when you need the exact
+         columns of other tables instead of asking for the whole schema again
 
     2. **Model Generation**: After successful schema changes in GibsonAI:
-       - **IMPORTANT**: Get the EXACT current database schema from GibsonAI using the project schema tool
-       - **CRITICAL**: Generate Python models that match EXACTLY what GibsonAI schema returns
+       - **IMPORTANT**: Call the generate_models tool with the project ID, the requested model type and the models directory
+       - **CRITICAL**: NEVER write model code yourself. generate_models fetches the current schema from GibsonAI
+         and returns the finished Pydantic and/or SQLAlchemy files, with types, defaults, nullability,
+         foreign keys and relationships already handled
        - **DO NOT** show Python code in markdown blocks to the user
-       - **INSTEAD**: Use GitHub MCP tools to create the actual Python files
-       - Create Pydantic models for data validation with proper imports
-       - Include SQLAlchemy models for ORM if requested
-       - Use correct type hints and field definitions
-       - Handle relationships and constraints properly
-
-    3. **GitHub PR Creation**: Use GitHub MCP tools systematically:
-       - Use the create_branch tool to create a new branch
-       - Use create_or_update_file tool to add/update Python model files
-       - Use create_pull_request tool to create the PR
+       - **INSTEAD**: The generated files are kept for the pull request, you only get their paths back
+
+    3. **GitHub PR Creation**: Call create_pull_request_with_files exactly once:
+       - It creates the branch, commits every file returned by generate_models in a single commit and opens the PR
+       - Give it a descriptive branch name, PR title and PR description
+       - **DO NOT** use create_branch, create_or_update_file or push_files for the generated model files
        - **IMPORTANT**: Use tools one at a time, don't try to call multiple tools in arrays
        - **CRITICAL**: Do not format tool calls as markdown code blocks or JSON arrays
 
@@ -49,7 +61,7 @@ INSTRUCTIONS = dedent(
     - NEVER write: [{"name": "tool_name", ...}] (JSON arrays)
     - ALWAYS use tools directly to create files
     - Call ONE tool at a time and wait for response
-    - When you need to create a Python model, use create_or_update_file tool immediately
+    - When you need Python models, call generate_models, then create_pull_request_with_files once
 
     Tool Usage Guidelines:
     - NEVER format tool calls as JSON arrays in markdown blocks
@@ -59,7 +71,7 @@ INSTRUCTIONS = dedent(
     - Call tools one at a time and wait for responses
     - Always check tool responses before proceeding to the next step
     - If a tool fails, provide clear error information to the user
-    - When you need to create Python model files, use the create_or_update_file tool immediately
+    - When you need to create Python model files, use generate_models and then the create_pull_request_with_files tool immediately
     - EXAMPLE: Don't write `[{"name": "create_branch", ...}]` - just use the tool directly
 
     Key Capabilities:
@@ -71,7 +83,7 @@ INSTRUCTIONS = dedent(
 
     Guidelines:
     - Always validate schema changes before proceeding
-    - Generate clean, well-documented Python code with proper imports
+    - Use the generated model files as they are, don't edit or rewrite them
     - Use proper naming conventions (snake_case for DB, PascalCase for classes)
     - Include type hints and docstrings
     - Create meaningful commit messages and PR descriptions
@@ -86,7 +98,7 @@ INSTRUCTIONS = dedent(
     - When creating Python models, use tools immediately - don't show code first
 
     Begin by understanding the user's schema change request and proceed systematically through the workflow.
-    When you need to create Python models, use the GitHub MCP tools to create the actual files immediately.
+    When you need to create Python models, call generate_models and open the PR with create_pull_request_with_files immediately.
     """
 )
 
@@ -106,56 +118,163 @@ GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME")
 DEFAULT_BRANCH = os.getenv("DEFAULT_BRANCH", "main")
 MODELS_DIR = os.getenv("MODELS_DIR", "models")
 
-
-async def run_schema_to_pr_agent(
-    message: str, model_id: str | None = None, session_id: str | None = None
-) -> RunResponse:
+# MCP servers kept warm in the process-wide pool. Their versions are resolved once
+# and pinned in the MCP cache, e.g. `uvx --from gibson-cli==<version> gibson mcp run`.
+MCP_SERVERS = {
+    "gibson": MCPServerSpec("pypi", "gibson-cli", ("gibson", "mcp", "run")),
+    "github": MCPServerSpec("npm", "@modelcontextprotocol/server-github"),
+}
+
+# Agent events passed on to the caller of stream_schema_to_pr_agent
+STREAMED_EVENTS = {
+    RunEvent.run_response_content,
+    RunEvent.tool_call_started,
+    RunEvent.tool_call_completed,
+    RunEvent.run_error,
+}
+
+
+def build_request_prompt(
+    request: str,
+    project_id: str,
+    repository: str | None = None,
+    models_dir: str = MODELS_DIR,
+    model_type: str = "Pydantic",
+) -> str:
+    """The agent message for a schema change request and its configuration."""
+    return f"""
+Schema Change Request: {request}
+
+Configuration:
+- GibsonAI Project ID: {project_id}
+- GitHub Repository: {repository or "from environment variables"}
+- Models Directory: {models_dir}
+- Model Type: {model_type}
+
+Please process this schema change request following the complete workflow:
+1. Analyze and apply database schema changes in GibsonAI project {project_id}
+2. Generate appropriate Python model classes ({model_type})
+3. Create a GitHub pull request with the changes
+
+Important: Use GibsonAI project {project_id} for all database operations.
     """
-    Runs the Schema-to-PR agent with dual MCP connections (GibsonAI + GitHub) and session storage.
 
-    Args:
-        message (str): The message to send to the agent.
-        model_id (Optional[str]): The ID of the language model to use.
-        session_id (Optional[str]): The session ID for conversation persistence.
 
-    Returns:
-        RunResponse: The agent's response.
+def build_request_context(
+    repository: str | None = None,
+    models_dir: str = MODELS_DIR,
+    model_type: str = "Pydantic",
+) -> dict[str, str]:
+    """The settings a request index entry is keyed on, the same for every entry point.
 
-    Raises:
-        RuntimeError: If there is an error connecting to MCP servers.
-        ValueError: If required environment variables are missing.
+    A missing repository resolves to the one the agent falls back to,
+    ``GITHUB_REPO_OWNER``/``GITHUB_REPO_NAME``, or ``""`` if that is unset too.
     """
+    if not repository and GITHUB_REPO_OWNER and GITHUB_REPO_NAME:
+        repository = f"{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}"
+    return {
+        "repository": repository or "",
+        "models_dir": models_dir,
+        "model_type": model_type,
+    }
+
+
+def get_schema_pr_mcp_pool() -> MCPServerPool:
+    """Return the shared GibsonAI + GitHub MCP pool, starting it on first use."""
     # Validate GitHub configuration
     if not GITHUB_TOKEN:
         raise ValueError(
             "GitHub configuration incomplete. Please set GITHUB_PERSONAL_ACCESS_TOKEN environment variable."
         )
 
-    # Set up SQLite storage for session persistence
-    storage = SqliteStorage(
-        table_name="schema_pr_agent_sessions", db_file="tmp/schema_pr_agent.db"
-    )
-
     # Set up environment for MCP servers
     env = {
         **os.environ,
         "GITHUB_PERSONAL_ACCESS_TOKEN": GITHUB_TOKEN,
     }
+    return get_mcp_pool(MCP_SERVERS, env=env)
+
+
+def read_schema_hash(project_id: str) -> str | None:
+    """Hash of a project's current schema, read once through the warm MCP pool.
+
+    No model turns are involved, and the schema is stored in the schema cache.
+    Returns ``None`` when GibsonAI cannot be reached or reports an error.
+    """
+
+    async def read() -> str | None:
+        gibson = (await pool.acquire())["gibson"]
+        schema_hash, _ = await SchemaCacheHook().fetch(
+            "get_project_schema",
+            project_id,
+            None,
+            lambda: fetch_project_schema(gibson, project_id),
+        )
+        return schema_hash
 
     try:
-        # Connect to both MCP servers using MultiMCPTools with extended timeout
-        async with MultiMCPTools(
-            [
-                "uvx --from gibson-cli@latest gibson mcp run",
-                "npx -y @modelcontextprotocol/server-github",
-            ],
-            env=env,
-            timeout_seconds=300,  # Increase timeout to 5 minutes
-        ) as mcp_tools:
+        pool = get_schema_pr_mcp_pool()
+        return pool.submit(read()).result(MCP_STARTUP_TIMEOUT + MCP_REQUEST_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Could not read the schema of {project_id}: {e}")
+        return None
+
+
+async def stream_schema_to_pr_agent(
+    message: str, model_id: str | None = None, session_id: str | None = None
+) -> AsyncIterator[RunResponseEvent | RunResponse]:
+    """
+    Runs the Schema-to-PR agent and yields its progress while it works.
+
+    The agent runs on the MCP pool's loop, where the MCP sessions live. Its events
+    are handed over to the caller's loop as they happen, so the caller can render
+    them live: the response content as it streams in, and every tool call when it
+    starts and completes. The last item is the final ``RunResponse``.
+
+    Args:
+        message (str): The message to send to the agent.
+        model_id (Optional[str]): The ID of the language model to use.
+        session_id (Optional[str]): The session ID for conversation persistence.
+
+    Yields:
+        RunResponseEvent | RunResponse: Content and tool-call events, then the response.
+
+    Raises:
+        RuntimeError: If there is an error connecting to MCP servers.
+        ValueError: If required environment variables are missing.
+    """
+    pool = get_schema_pr_mcp_pool()
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def emit(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def run_agent():
+        # Runs on the pool's loop, where the MCP sessions live
+        try:
+            mcp_tools = await pool.acquire()
+            # Serves repeated schema reads from the shared cache, traced per run
+            schema_cache = SchemaCacheHook()
+            # Generates the model files locally from the schema instead of the LLM
+            schema_tools = SchemaTools(mcp_tools["gibson"], schema_cache=schema_cache)
+            # Commits all generated files in one local commit and opens the PR
+            pr_tools = PullRequestTools(
+                schema_tools.generated_files,
+                GITHUB_TOKEN,
+                repo_owner=GITHUB_REPO_OWNER,
+                repo_name=GITHUB_REPO_NAME,
+                base_branch=DEFAULT_BRANCH,
+            )
+
+            # Process-wide SQLite storage, compacted so history stays small
+            storage = get_session_storage()
+
             agent = Agent(
                 name="Schema-to-PR Agent",
                 model=get_model(MODEL_ID, MODEL_API_KEY),
-                tools=[mcp_tools],
+                tools=[*mcp_tools.values(), schema_tools, pr_tools],
                 instructions=INSTRUCTIONS,
                 storage=storage,
                 session_id=session_id,
@@ -163,14 +282,35 @@ async def run_schema_to_pr_agent(
                 add_history_to_messages=True,
                 num_history_runs=3,  # Include last 3 conversation turns
                 show_tool_calls=True,
+                tool_hooks=[schema_cache.tool_hook],
             )
-
-            response = await agent.arun(message)
-            return response
+            stream = await agent.arun(
+                message, stream=True, stream_intermediate_steps=True
+            )
+            async for event in stream:
+                if event.event in STREAMED_EVENTS:
+                    emit(event)
+            response = agent.run_response
+            response.metrics = {
+                **(response.metrics or {}),
+                "schema_cache": schema_cache.summary(),
+                "schema_cache_trace": schema_cache.trace,
+            }
+            emit(response)
+        finally:
+            emit(done)
+
+    # Reuse the warm GibsonAI and GitHub MCP connections from the pool
+    task = asyncio.ensure_future(pool.run(run_agent()))
+    try:
+        while (event := await events.get()) is not done:
+            yield event
+        await task
 
     except TimeoutError as te:
         print("=== MCP SERVER TIMEOUT ===")
         print("One or more MCP servers failed to start within the timeout period.")
+        print(f"Server status: {pool.status()}")
         print("This could be due to:")
         print("1. GibsonAI CLI not authenticated (run 'gibson auth login')")
         print(
@@ -187,6 +327,38 @@ async def run_schema_to_pr_agent(
         raise RuntimeError(
             f"Error connecting to MCP servers or running agent: {e}"
         ) from e
+    finally:
+        # The consumer stopped early (e.g. the page was closed): stop the run too
+        task.cancel()
+
+
+async def run_schema_to_pr_agent(
+    message: str, model_id: str | None = None, session_id: str | None = None
+) -> RunResponse:
+    """
+    Runs the Schema-to-PR agent with dual MCP connections (GibsonAI + GitHub) and session storage.
+
+    The MCP servers come from a process-wide pool that is started on the first call
+    and kept warm, so later calls only wait for the agent itself. Use
+    ``stream_schema_to_pr_agent`` to follow the run while it happens.
+
+    Args:
+        message (str): The message to send to the agent.
+        model_id (Optional[str]): The ID of the language model to use.
+        session_id (Optional[str]): The session ID for conversation persistence.
+
+    Returns:
+        RunResponse: The agent's response.
+
+    Raises:
+        RuntimeError: If there is an error connecting to MCP servers.
+        ValueError: If required environment variables are missing.
+    """
+    response = None
+    async for event in stream_schema_to_pr_agent(message, model_id, session_id):
+        if isinstance(event, RunResponse):
+            response = event
+    return response
 
 
 async def main():
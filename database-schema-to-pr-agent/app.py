@@ -1,10 +1,14 @@
-import asyncio
 import os
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from agent import run_schema_to_pr_agent
+from agent import (
+    build_request_context,
+    build_request_prompt,
+    get_schema_pr_mcp_pool,
+)
+from jobs import JOB_MAX_CONCURRENCY, get_job_executor
 
 # Load environment variables
 load_dotenv()
@@ -12,11 +16,19 @@ load_dotenv()
 # Get GibsonAI Project ID from environment
 GIBSON_PROJECT_ID = os.getenv("GIBSON_PROJECT_ID")
 
+# Start the shared MCP servers and the job executor while the page loads. Both
+# live for the whole process: every browser session submits its requests to the
+# same executor, which runs them on the pool's warm connections.
+try:
+    mcp_pool = get_schema_pr_mcp_pool()
+    job_executor = get_job_executor()
+except ValueError:
+    mcp_pool = job_executor = None  # reported when a request is made
+
+
 # Initialize session state early
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "processing" not in st.session_state:
-    st.session_state.processing = False
 if "session_id" not in st.session_state:
     # Generate a unique session ID for conversation persistence
     import uuid
@@ -64,6 +76,23 @@ with st.sidebar:
     st.markdown(f"**Session ID:** `{st.session_state.session_id[:8]}...`")
     st.caption("💡 Chat history is automatically saved and restored")
 
+    if mcp_pool is not None:
+        st.markdown("**MCP Servers**")
+        for name, status in mcp_pool.status().items():
+            if status["ready"]:
+                st.markdown(f"✅ `{name}` connected")
+            elif status["last_error"]:
+                st.markdown(f"⚠️ `{name}` restarting: {status['last_error']}")
+            else:
+                st.markdown(f"⏳ `{name}` starting...")
+
+    if job_executor is not None:
+        st.markdown("**Jobs**")
+        stats = job_executor.stats()
+        st.markdown(
+            f"{stats['running']}/{JOB_MAX_CONCURRENCY} running, {stats['queued']} queued"
+        )
+
 # Configuration section
 st.header("⚙️ Configuration")
 
@@ -95,10 +124,34 @@ with col2:
 # Main chat interface
 st.header("💬 Schema Change Request")
 
+
+@st.fragment(run_every=1)
+def show_job(message: dict):
+    """Poll a background job and show its progress until it finishes."""
+    job = job_executor.get(message["job_id"]) if job_executor else None
+    if job is None:
+        message["content"] = "❌ **Error:** The job is no longer available."
+        message["status"] = "failed"
+    elif job.done:
+        message["content"] = job.markdown()
+        message["status"] = job.status
+    else:
+        st.markdown(job.markdown())
+        if st.button("Cancel", key=f"cancel_{job.id}"):
+            job_executor.cancel(job.id)
+        return
+    # Finished: render it as a regular message and stop polling
+    del message["job_id"]
+    st.rerun()
+
+
 # Display chat history
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+        if "job_id" in message:
+            show_job(message)
+        else:
+            st.markdown(message["content"])
 
 # Schema change examples
 with st.expander("📝 Example Schema Requests", expanded=False):
@@ -134,10 +187,10 @@ user_query = st.chat_input(
     "Describe your database schema changes..."
     if GIBSON_PROJECT_ID
     else "Please configure GibsonAI Project ID in .env file first",
-    disabled=st.session_state.processing or not GIBSON_PROJECT_ID,
+    disabled=not GIBSON_PROJECT_ID,
 )
 
-if user_query and not st.session_state.processing:
+if user_query:
     # Validate GibsonAI Project ID
     if not GIBSON_PROJECT_ID:
         st.error(
@@ -148,75 +201,34 @@ if user_query and not st.session_state.processing:
     # Add user message to chat
     st.session_state.messages.append({"role": "user", "content": user_query})
 
-    # Display user message
-    with st.chat_message("user"):
-        st.markdown(user_query)
-
-    # Set processing state
-    st.session_state.processing = True
-
     # Create enhanced prompt with configuration
-    enhanced_prompt = f"""
-Schema Change Request: {user_query}
-
-Configuration:
-- GibsonAI Project ID: {GIBSON_PROJECT_ID}
-- GitHub Repository: {github_owner}/{github_repo if github_owner and github_repo else "from environment variables"}
-- Models Directory: {models_dir}
-- Model Type: {model_type}
-
-Please process this schema change request following the complete workflow:
-1. Analyze and apply database schema changes in GibsonAI project {GIBSON_PROJECT_ID}
-2. Generate appropriate Python model classes ({model_type})
-3. Create a GitHub pull request with the changes
-
-Important: Use GibsonAI project {GIBSON_PROJECT_ID} for all database operations.
-    """
-
-    # Process the request
-    with st.chat_message("assistant"):
-        message_placeholder = st.empty()
-        message_placeholder.markdown("🔄 Processing schema changes...")
-
-        try:
-            # Run the agent with session persistence
-            response = asyncio.run(
-                run_schema_to_pr_agent(
-                    enhanced_prompt, session_id=st.session_state.session_id
-                )
-            )
-
-            # Display the response
-            message_placeholder.markdown(response.content)
-
-            # Add to session state
-            st.session_state.messages.append(
-                {"role": "assistant", "content": response.content}
-            )
-
-            # Success notification
-            st.success("✅ Schema changes processed successfully!")
-
-        except ValueError as ve:
-            error_msg = f"❌ **Configuration Error:** {str(ve)}"
-            message_placeholder.markdown(error_msg)
-            st.session_state.messages.append(
-                {"role": "assistant", "content": error_msg}
-            )
-            st.error("Please check your environment variables and configuration.")
-
-        except Exception as e:
-            error_msg = f"❌ **Error:** {str(e)}"
-            message_placeholder.markdown(error_msg)
-            st.session_state.messages.append(
-                {"role": "assistant", "content": error_msg}
-            )
-            st.error("An unexpected error occurred. Please try again.")
-
-        finally:
-            # Reset processing state
-            st.session_state.processing = False
-            st.rerun()
+    repository = (
+        f"{github_owner}/{github_repo}" if github_owner and github_repo else None
+    )
+    enhanced_prompt = build_request_prompt(
+        user_query, GIBSON_PROJECT_ID, repository, models_dir, model_type
+    )
+
+    # Queue the request; the chat polls the job while it runs in the background
+    if job_executor is None:
+        error_msg = (
+            "❌ **Configuration Error:** GitHub configuration incomplete. "
+            "Please set GITHUB_PERSONAL_ACCESS_TOKEN environment variable."
+        )
+        st.session_state.messages.append({"role": "assistant", "content": error_msg})
+    else:
+        # Repeats of a queued, running or applied request reuse its result
+        job_id = job_executor.submit(
+            enhanced_prompt,
+            st.session_state.session_id,
+            project_id=GIBSON_PROJECT_ID,
+            request=user_query,
+            context=build_request_context(repository, models_dir, model_type),
+        )
+        st.session_state.messages.append(
+            {"role": "assistant", "content": "", "job_id": job_id}
+        )
+    st.rerun()
 
 # Status section
 st.header("📊 Status")
@@ -236,7 +248,7 @@ with col2:
         [
             m
             for m in st.session_state.messages
-            if m["role"] == "assistant" and "✅" in m["content"]
+            if m["role"] == "assistant" and m.get("status") == "succeeded"
         ]
     )
     st.metric("Successful", successful_requests)
@@ -254,7 +266,6 @@ with col3:
 # Clear chat button
 if st.button("🗑️ Clear Chat History"):
     st.session_state.messages = []
-    st.session_state.processing = False
     st.rerun()
 
 # Footer
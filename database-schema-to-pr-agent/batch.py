@@ -0,0 +1,239 @@
+"""Apply a file of schema change requests without the web interface.
+
+Usage::
+
+    python batch.py requests.jsonl --report tmp/batch_report.jsonl --concurrency 4
+
+Each line of the input is either plain text, one request per line, or a JSON
+object with a ``request`` and optionally ``project_id``, ``repository``,
+``models_dir`` and ``model_type``. Blank lines and lines starting with ``#`` are
+skipped. Missing settings fall back to the command-line options, then to the
+environment (``GIBSON_PROJECT_ID``, ``GITHUB_REPO_OWNER``/``GITHUB_REPO_NAME``).
+
+All requests share one MCP pool and one set of model clients. They run through a
+``JobExecutor`` with one session per project, so requests for different projects
+run side by side, up to ``--concurrency`` at a time, and requests for the same
+project run one after the other, in file order. A line is written to the report
+as soon as its request finishes.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import uuid
+
+from agno.utils.log import logger
+
+from agent import (
+    GITHUB_REPO_NAME,
+    GITHUB_REPO_OWNER,
+    MODELS_DIR,
+    build_request_context,
+    build_request_prompt,
+)
+from jobs import JOB_MAX_CONCURRENCY, Job, JobExecutor
+from request_index import pull_request_url
+
+BATCH_REPORT_FILE = os.getenv("BATCH_REPORT_FILE", "tmp/batch_report.jsonl")
+MODEL_TYPES = ("Pydantic", "SQLAlchemy", "Both")
+
+
+def read_requests(path: str, defaults: dict[str, str | None]) -> list[dict]:
+    """The requests of an input file, each with its line number and settings."""
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{number}: invalid JSON: {e}") from None
+            else:
+                item = {"request": line}
+            if not item.get("request"):
+                raise ValueError(f"{path}:{number}: no request")
+            item = {**defaults, **{k: v for k, v in item.items() if v}}
+            if not item.get("project_id"):
+                raise ValueError(
+                    f"{path}:{number}: no project_id, pass --project or set GIBSON_PROJECT_ID"
+                )
+            if item["model_type"] not in MODEL_TYPES:
+                raise ValueError(
+                    f"{path}:{number}: model_type must be one of {', '.join(MODEL_TYPES)}"
+                )
+            requests.append({"line": number, **item})
+    return requests
+
+
+def report_entry(item: dict, job: Job) -> dict:
+    """One line of the report: what was asked, how it ended and the PR it opened."""
+    if job.duplicate_of is not None:
+        pr_url, duration = job.duplicate_of.pr_url, 0.0
+    else:
+        pr_url = pull_request_url(job.response) if job.response else None
+        duration = job.progress.elapsed if job.progress else 0.0
+    return {
+        "line": item["line"],
+        "project_id": item["project_id"],
+        "request": item["request"],
+        "job_id": job.id,
+        "status": job.status,
+        "duplicate": job.duplicate_of is not None,
+        "duration": round(duration, 2),
+        "tool_calls": len(job.progress.steps) if job.progress else 0,
+        "pr_url": pr_url,
+        "error": job.error,
+    }
+
+
+def run_batch(
+    requests: list[dict], report_path: str, max_concurrency: int = JOB_MAX_CONCURRENCY
+) -> list[dict]:
+    """Run ``requests`` and write one report line per request as it finishes."""
+    executor = JobExecutor(max_concurrency=max_concurrency)
+    batch_id = uuid.uuid4().hex[:8]
+    submitted: list[tuple[dict, str]] = []
+    for item in requests:
+        context = build_request_context(
+            item["repository"], item["models_dir"], item["model_type"]
+        )
+        job_id = executor.submit(
+            build_request_prompt(
+                item["request"],
+                item["project_id"],
+                item["repository"],
+                item["models_dir"],
+                item["model_type"],
+            ),
+            # one session per project: its requests run in order and see each
+            # other in the history, other projects run in parallel
+            f"batch-{batch_id}-{item['project_id']}",
+            project_id=item["project_id"],
+            request=item["request"],
+            context=context,
+        )
+        submitted.append((item, job_id))
+    logger.info(
+        f"Batch {batch_id}: {len(submitted)} requests queued, "
+        f"up to {max_concurrency} at a time"
+    )
+
+    # a repeated line shares the job of the first one
+    waiting: dict[concurrent.futures.Future, list[tuple[dict, Job]]] = {}
+    finished: list[tuple[dict, Job]] = []
+    for item, job_id in submitted:
+        job = executor.get(job_id)
+        if job.future is None or job.done:
+            finished.append((item, job))
+        else:
+            waiting.setdefault(job.future, []).append((item, job))
+
+    directory = os.path.dirname(report_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    entries = []
+    with open(report_path, "w", encoding="utf-8") as report:
+
+        def write(item: dict, job: Job):
+            entry = report_entry(item, job)
+            # a later line that repeats an earlier one of the same run
+            entry["duplicate"] |= any(e["job_id"] == job.id for e in entries)
+            entries.append(entry)
+            report.write(json.dumps(entry) + "\n")
+            report.flush()
+            logger.info(
+                f"[{len(entries)}/{len(submitted)}] line {entry['line']} "
+                f"{entry['status']} in {entry['duration']}s {entry['pr_url'] or ''}"
+            )
+
+        for item, job in finished:
+            write(item, job)
+        try:
+            for future in concurrent.futures.as_completed(waiting):
+                for item, job in waiting.pop(future):
+                    write(item, job)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, cancelling the remaining requests")
+            for future in waiting:
+                future.cancel()
+            # let the running jobs record their cancellation on the pool's loop
+            concurrent.futures.wait(waiting, timeout=10)
+            for jobs in waiting.values():
+                for item, job in jobs:
+                    write(item, job)
+    return entries
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Apply a file of schema change requests and open their pull requests."
+    )
+    parser.add_argument(
+        "requests", help="File with one request per line, as text or JSON objects"
+    )
+    parser.add_argument(
+        "--report",
+        default=BATCH_REPORT_FILE,
+        help=f"JSONL report of the outcomes (default: {BATCH_REPORT_FILE})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=JOB_MAX_CONCURRENCY,
+        help="Requests run at the same time, across projects "
+        f"(default: {JOB_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--project",
+        default=os.getenv("GIBSON_PROJECT_ID"),
+        help="GibsonAI project of requests that name none (default: GIBSON_PROJECT_ID)",
+    )
+    parser.add_argument(
+        "--repository",
+        help="owner/name of the repository for the pull requests "
+        "(default: GITHUB_REPO_OWNER/GITHUB_REPO_NAME)",
+    )
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--model-type", default="Pydantic", choices=MODEL_TYPES)
+    args = parser.parse_args(argv)
+
+    defaults = {
+        "project_id": args.project,
+        "repository": args.repository
+        or (
+            f"{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}"
+            if GITHUB_REPO_OWNER and GITHUB_REPO_NAME
+            else None
+        ),
+        "models_dir": args.models_dir,
+        "model_type": args.model_type,
+    }
+    try:
+        requests = read_requests(args.requests, defaults)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return 2
+    if not requests:
+        logger.error(f"No requests in {args.requests}")
+        return 2
+
+    try:
+        entries = run_batch(requests, args.report, max(1, args.concurrency))
+    except ValueError as ve:
+        logger.error(f"Configuration error: {ve}")
+        return 2
+    failed = [entry for entry in entries if entry["status"] != "succeeded"]
+    logger.info(
+        f"{len(entries) - len(failed)} of {len(entries)} requests succeeded, "
+        f"report written to {args.report}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
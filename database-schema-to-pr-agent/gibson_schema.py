@@ -0,0 +1,457 @@
+"""Parse the schema returned by GibsonAI into plain table definitions.
+
+GibsonAI describes a project schema either as structured entities (a ``name`` and
+a ``struct`` with ``attributes`` and ``keys``, as the GibsonAI CLI uses them) or as
+MySQL ``CREATE TABLE`` statements. ``parse_schema`` accepts both, as JSON text or
+already decoded, and returns the tables in a form the model generator can use.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class Column:
+    name: str
+    data_type: str  # lower case base type, e.g. "varchar" or "bigint"
+    length: int | None = None
+    precision: int | None = None
+    scale: int | None = None
+    nullable: bool = True
+    default: str | None = None  # SQL expression, e.g. "'light'" or "current_timestamp"
+    on_update: str | None = None
+    primary_key: bool = False
+    autoincrement: bool = False
+    unique: bool = False
+    unsigned: bool = False
+    values: list[str] | None = None  # enum and set members
+    comment: str | None = None
+
+
+@dataclass
+class ForeignKey:
+    columns: list[str]
+    ref_table: str
+    ref_columns: list[str]
+    on_delete: str | None = None
+    on_update: str | None = None
+
+
+@dataclass
+class Table:
+    name: str
+    columns: list[Column] = field(default_factory=list)
+    foreign_keys: list[ForeignKey] = field(default_factory=list)
+
+    @property
+    def primary_key(self) -> list[str]:
+        return [column.name for column in self.columns if column.primary_key]
+
+    def column(self, name: str) -> Column | None:
+        return next((c for c in self.columns if c.name == name), None)
+
+
+class SchemaParseError(ValueError):
+    pass
+
+
+def parse_schema(schema: str | dict | list) -> list[Table]:
+    """Return the tables described by a GibsonAI schema, in their original order."""
+    if isinstance(schema, str):
+        text = schema.strip()
+        if not text.startswith(("{", "[")):
+            return parse_ddl(text)
+        try:
+            schema = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise SchemaParseError(f"Schema is neither JSON nor DDL: {e}") from e
+
+    tables = []
+    for entry in _entries(schema):
+        if isinstance(entry, str):
+            tables.extend(parse_ddl(entry))
+        elif isinstance(entry, dict):
+            tables.append(_parse_entity(entry))
+        else:
+            raise SchemaParseError(f"Unrecognized schema entry: {entry!r}")
+    if not tables:
+        raise SchemaParseError("Schema does not contain any tables")
+    return tables
+
+
+def _entries(schema: Any) -> list[Any]:
+    if isinstance(schema, list):
+        return schema
+    if isinstance(schema, dict):
+        for key in ("entities", "tables", "schema", "code"):
+            if key in schema:
+                value = schema[key]
+                return _entries(json.loads(value) if _is_json(value) else value)
+        if "struct" in schema or "entity" in schema or "definition" in schema:
+            return [schema]
+        # {"table_name": <struct or DDL>, ...}
+        if schema and all(_is_table(value) for value in schema.values()):
+            return [
+                {"name": name, "struct": value} if isinstance(value, dict) else value
+                for name, value in schema.items()
+            ]
+        raise SchemaParseError(f"Unrecognized schema: {json.dumps(schema)[:200]}")
+    if isinstance(schema, str):
+        return [schema]
+    raise SchemaParseError(f"Unsupported schema format: {type(schema).__name__}")
+
+
+def _is_table(value: Any) -> bool:
+    if isinstance(value, dict):
+        return "attributes" in value
+    return isinstance(value, str) and "create" in value.lower()
+
+
+def _is_json(value: Any) -> bool:
+    return isinstance(value, str) and value.lstrip().startswith(("{", "["))
+
+
+def _parse_entity(entry: dict[str, Any]) -> Table:
+    entity = entry.get("entity", entry)
+    definition = entry.get("definition") or entity.get("definition")
+    struct = entity.get("struct") or entry.get("struct")
+    if struct is None and definition:
+        return parse_ddl(definition)[0]
+    if struct is None:
+        raise SchemaParseError(f"Entity has no struct or definition: {entry}")
+
+    name = entity.get("name") or entry.get("name")
+    table = Table(name=name)
+    for attribute in struct.get("attributes") or []:
+        table.columns.append(_parse_attribute(attribute))
+        reference = _specifics(attribute).get("reference")
+        if reference:
+            table.foreign_keys.append(_parse_reference([attribute["name"]], reference))
+
+    keys = struct.get("keys") or {}
+    primary = keys.get("primary")
+    for name in (primary or {}).get("attributes") or []:
+        column = table.column(_attribute_name(name))
+        if column is not None:
+            column.primary_key = True
+            column.nullable = False
+    for unique in keys.get("unique") or []:
+        attributes = unique.get("attributes") or []
+        if len(attributes) == 1:
+            column = table.column(_attribute_name(attributes[0]))
+            if column is not None:
+                column.unique = True
+    for foreign in keys.get("foreign") or []:
+        columns = [_attribute_name(name) for name in foreign.get("attributes") or []]
+        table.foreign_keys.append(_parse_reference(columns, foreign["references"]))
+    return table
+
+
+def _specifics(attribute: dict[str, Any]) -> dict[str, Any]:
+    # some GibsonAI payloads spell the key "datstore"
+    datastore = attribute.get("datastore") or attribute.get("datstore") or {}
+    return datastore.get("specifics") or {}
+
+
+def _attribute_name(attribute: str | dict[str, Any]) -> str:
+    return attribute["name"] if isinstance(attribute, dict) else attribute
+
+
+def _parse_attribute(attribute: dict[str, Any]) -> Column:
+    specifics = _specifics(attribute)
+    data_type = attribute.get("data_type") or {}
+    key = attribute.get("key") or {}
+    numeric = attribute.get("numeric") or {}
+    raw_type = (data_type.get("raw") or data_type.get("formatted") or "").lower()
+    primary_key = bool(key.get("primary"))
+    default = attribute.get("default")
+    if default is not None:
+        default = str(default)
+        if default.lower() == "null":
+            default = None
+    on_update = specifics.get("on")
+    if on_update and on_update.lower().startswith("update "):
+        on_update = on_update[len("update ") :]
+    values = specifics.get("values")
+    return Column(
+        name=attribute["name"],
+        data_type=raw_type.split("(")[0].strip(),
+        length=attribute.get("length"),
+        precision=numeric.get("precision"),
+        scale=numeric.get("scale"),
+        # GibsonAI leaves "nullable" unset for columns that allow NULL
+        nullable=attribute.get("nullable") is not False and not primary_key,
+        default=default,
+        on_update=on_update,
+        primary_key=primary_key,
+        autoincrement=bool(
+            ((specifics.get("extra") or {}).get("increment") or {}).get("auto")
+        ),
+        unique=bool(key.get("unique")),
+        unsigned=bool(specifics.get("unsigned")),
+        values=[_unquote(value) for value in values] if values else None,
+        comment=specifics.get("comment"),
+    )
+
+
+def _parse_reference(columns: list[str], reference: dict[str, Any]) -> ForeignKey:
+    entity = reference.get("entity") or {}
+    on = reference.get("on") or {}
+    return ForeignKey(
+        columns=columns,
+        ref_table=entity.get("name") if isinstance(entity, dict) else entity,
+        ref_columns=[_attribute_name(name) for name in reference.get("attributes")],
+        on_delete=on.get("delete"),
+        on_update=on.get("update"),
+    )
+
+
+# --- MySQL DDL -----------------------------------------------------------------
+
+_TOKEN = re.compile(
+    r"""
+    `(?:[^`]|``)*`           # quoted identifier
+    | '(?:[^'\\]|\\.|'')*'   # string literal
+    | "(?:[^"\\]|\\.|"")*"   # string literal or ANSI quoted identifier
+    | --[^\n]*               # comment
+    | /\*.*?\*/              # comment
+    | [A-Za-z0-9_$.]+        # word, number or qualified name
+    | [(),;=]
+    | \S
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def parse_ddl(ddl: str) -> list[Table]:
+    """Parse the ``CREATE TABLE`` statements in a MySQL DDL script."""
+    tokens = [
+        token for token in _TOKEN.findall(ddl) if not token.startswith(("--", "/*"))
+    ]
+    tables = []
+    position = 0
+    while position < len(tokens):
+        words = [token.lower() for token in tokens[position : position + 3]]
+        if words[:2] == ["create", "table"]:
+            table, position = _parse_create_table(tokens, position + 2)
+            tables.append(table)
+        elif words == ["create", "temporary", "table"]:
+            table, position = _parse_create_table(tokens, position + 3)
+            tables.append(table)
+        else:
+            position += 1
+    if not tables:
+        raise SchemaParseError("No CREATE TABLE statements found")
+    return tables
+
+
+def _parse_create_table(tokens: list[str], position: int) -> tuple[Table, int]:
+    words = [token.lower() for token in tokens[position : position + 3]]
+    if words == ["if", "not", "exists"]:
+        position += 3
+    table = Table(name=_identifier(tokens[position]).split(".")[-1])
+    if tokens[position + 1] != "(":
+        raise SchemaParseError(f"Expected '(' after CREATE TABLE {table.name}")
+
+    definitions, position = _split_definitions(tokens, position + 2)
+    for definition in definitions:
+        _parse_definition(table, definition)
+    # skip the table options up to the end of the statement
+    while position < len(tokens) and tokens[position] != ";":
+        position += 1
+    return table, position + 1
+
+
+def _split_definitions(tokens: list[str], position: int) -> tuple[list[list[str]], int]:
+    definitions: list[list[str]] = [[]]
+    depth = 0
+    while position < len(tokens):
+        token = tokens[position]
+        position += 1
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            if depth == 0:
+                return [d for d in definitions if d], position
+            depth -= 1
+        elif token == "," and depth == 0:
+            definitions.append([])
+            continue
+        definitions[-1].append(token)
+    raise SchemaParseError("Unterminated CREATE TABLE statement")
+
+
+def _parse_definition(table: Table, tokens: list[str]):
+    words = [token.lower() for token in tokens]
+    if words[0] == "constraint":
+        # CONSTRAINT [symbol] PRIMARY KEY | UNIQUE | FOREIGN KEY | CHECK ...
+        start = 1 if words[1] in ("primary", "unique", "foreign", "check") else 2
+        return _parse_definition(table, tokens[start:])
+    if words[0] == "primary":
+        for name in _column_list(tokens, words.index("(")):
+            column = table.column(name)
+            if column is not None:
+                column.primary_key = True
+                column.nullable = False
+        return
+    if words[0] == "unique":
+        columns = _column_list(tokens, words.index("("))
+        if len(columns) == 1 and table.column(columns[0]) is not None:
+            table.column(columns[0]).unique = True
+        return
+    if words[0] == "foreign":
+        columns = _column_list(tokens, words.index("("))
+        table.foreign_keys.append(
+            _parse_references(columns, tokens[words.index("references") :])
+        )
+        return
+    if words[0] in ("key", "index", "fulltext", "spatial", "check"):
+        return
+    column, reference = _parse_column(tokens)
+    table.columns.append(column)
+    if reference is not None:
+        table.foreign_keys.append(reference)
+
+
+def _parse_column(tokens: list[str]) -> tuple[Column, ForeignKey | None]:
+    column = Column(name=_identifier(tokens[0]), data_type=tokens[1].lower())
+    position = 2
+    if column.data_type == "double" and len(tokens) > 2:
+        if tokens[2].lower() == "precision":
+            position += 1
+    if position < len(tokens) and tokens[position] == "(":
+        end = tokens.index(")", position)
+        arguments = [t for t in tokens[position + 1 : end] if t != ","]
+        position = end + 1
+        if column.data_type in ("enum", "set"):
+            column.values = [_unquote(value) for value in arguments]
+        elif column.data_type in ("decimal", "numeric", "dec", "fixed"):
+            column.precision = int(arguments[0])
+            column.scale = int(arguments[1]) if len(arguments) > 1 else 0
+        elif arguments and arguments[0].isdigit():
+            column.length = int(arguments[0])
+
+    reference = None
+    explicit_null = False
+    words = [token.lower() for token in tokens]
+    while position < len(tokens):
+        word = words[position]
+        if word == "unsigned":
+            column.unsigned = True
+        elif word == "not" and words[position + 1 : position + 2] == ["null"]:
+            column.nullable = False
+            position += 1
+        elif word == "null":
+            explicit_null = True
+        elif word == "auto_increment" or word == "autoincrement":
+            column.autoincrement = True
+        elif word == "primary":
+            column.primary_key = True
+            position += 1 if words[position + 1 : position + 2] == ["key"] else 0
+        elif word == "unique":
+            column.unique = True
+            position += 1 if words[position + 1 : position + 2] == ["key"] else 0
+        elif word == "default":
+            column.default, position = _expression(tokens, position + 1)
+            if column.default.lower() == "null":
+                column.default = None
+            continue
+        elif word == "on" and words[position + 1 : position + 2] == ["update"]:
+            column.on_update, position = _expression(tokens, position + 2)
+            continue
+        elif word == "comment":
+            column.comment = _unquote(tokens[position + 1])
+            position += 1
+        elif word == "references":
+            reference = _parse_references([column.name], tokens[position:])
+            break
+        elif word in ("collate", "charset"):
+            position += 1
+        elif word == "character" and words[position + 1 : position + 2] == ["set"]:
+            position += 2
+        position += 1
+
+    if column.primary_key:
+        column.nullable = False
+    elif explicit_null:
+        column.nullable = True
+    return column, reference
+
+
+def _expression(tokens: list[str], position: int) -> tuple[str, int]:
+    """Read a default value: a literal, a function call or a parenthesised expression."""
+    parts = [tokens[position]]
+    position += 1
+    depth = 1 if parts[0] == "(" else 0
+    if depth == 0 and position < len(tokens) and tokens[position] == "(":
+        parts.append("(")
+        depth = 1
+        position += 1
+    while depth and position < len(tokens):
+        token = tokens[position]
+        depth += {"(": 1, ")": -1}.get(token, 0)
+        parts.append(token)
+        position += 1
+    expression = ""
+    for part in parts:
+        # no spaces around parentheses and before commas
+        if expression and part not in ("(", ")", ",") and expression[-1] not in "(":
+            expression += " "
+        expression += part
+    return expression, position
+
+
+def _parse_references(columns: list[str], tokens: list[str]) -> ForeignKey:
+    # REFERENCES table (columns) [MATCH ...] [ON DELETE action] [ON UPDATE action]
+    words = [token.lower() for token in tokens]
+    reference = ForeignKey(
+        columns=columns,
+        ref_table=_identifier(tokens[1]).split(".")[-1],
+        ref_columns=_column_list(tokens, 2),
+    )
+    for index, word in enumerate(words):
+        if word == "on" and index + 1 < len(words):
+            action = []
+            for next_word in words[index + 2 :]:
+                if next_word == "on":
+                    break
+                action.append(next_word)
+            if words[index + 1] == "delete":
+                reference.on_delete = " ".join(action).upper()
+            elif words[index + 1] == "update":
+                reference.on_update = " ".join(action).upper()
+    return reference
+
+
+def _column_list(tokens: list[str], position: int) -> list[str]:
+    """Read the parenthesised column list starting at ``tokens[position]``."""
+    names = []
+    depth = 0
+    for token in tokens[position + 1 :]:
+        if token == "(":
+            depth += 1  # index prefix length, e.g. `name`(10)
+        elif token == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and token != ",":
+            names.append(_identifier(token))
+    return names
+
+
+def _identifier(token: str) -> str:
+    if token[:1] in ("`", '"'):
+        return token[1:-1].replace(token[0] * 2, token[0])
+    return token
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
+        return (
+            value[1:-1]
+            .replace(value[0] * 2, value[0])
+            .replace("\\" + value[0], value[0])
+        )
+    return value
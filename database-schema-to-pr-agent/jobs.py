@@ -0,0 +1,296 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from agno.agent import RunResponse
+from agno.run.response import RunEvent, RunResponseEvent
+from agno.utils.log import logger
+
+from agent import get_schema_pr_mcp_pool, read_schema_hash, stream_schema_to_pr_agent
+from request_index import IndexedRequest, get_request_index, normalize_request
+
+# How many agent runs execute at the same time, across all browser sessions
+JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", "4"))
+# Seconds a finished job is kept for the UI to pick up its result
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+
+
+class RunProgress:
+    """Markdown view of a streamed agent run: tool steps with timings, then the reply."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.steps: dict[str, dict] = {}  # tool call id -> name, start, end, error
+        self.content = ""
+        self.finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def update(self, event: RunResponseEvent):
+        now = time.monotonic() - self.started
+        if event.event == RunEvent.run_response_content and isinstance(
+            event.content, str
+        ):
+            self.content += event.content
+        elif event.event == RunEvent.tool_call_started:
+            self.steps[event.tool.tool_call_id] = {
+                "name": event.tool.tool_name,
+                "start": now,
+                "end": None,
+                "error": False,
+            }
+        elif event.event == RunEvent.tool_call_completed:
+            step = self.steps.get(event.tool.tool_call_id)
+            if step is not None:
+                step["end"] = now
+                step["error"] = bool(event.tool.tool_call_error)
+        elif event.event == RunEvent.run_error:
+            self.content += f"\n\n⚠️ {event.content}"
+
+    def markdown(self) -> str:
+        lines = []
+        for step in list(self.steps.values()):
+            if step["end"] is None:
+                running = self.elapsed - step["start"]
+                lines.append(f"- ⏳ `{step['name']}` running for {running:.1f}s")
+            else:
+                icon = "⚠️" if step["error"] else "✔️"
+                lines.append(
+                    f"- {icon} `{step['name']}` {step['end'] - step['start']:.1f}s "
+                    f"(at {step['start']:.1f}s)"
+                )
+        if self.finished is None:
+            lines.append(f"\n🔄 Processing schema changes... {self.elapsed:.0f}s")
+        else:
+            lines.append(
+                f"\n⏱️ Finished in {self.elapsed:.1f}s with {len(self.steps)} tool calls"
+            )
+        if self.content:
+            lines.append(f"\n{self.content}")
+        return "\n".join(lines)
+
+
+@dataclass
+class Job:
+    id: str
+    session_id: str
+    message: str
+    status: str = "queued"  # queued, running, succeeded, failed, cancelled
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    progress: RunProgress | None = None
+    response: RunResponse | None = None
+    error: str | None = None
+    future: concurrent.futures.Future | None = field(default=None, repr=False)
+    # what the request index knows the job by: project, request text, context
+    project_id: str | None = None
+    request: str | None = None
+    context: dict[str, str] | None = None
+    # the applied request this job repeats, answered without running the agent
+    duplicate_of: IndexedRequest | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def markdown(self) -> str:
+        """What the chat shows for this job right now."""
+        if self.status == "queued":
+            return "🕒 Queued, waiting for a free worker..."
+        if self.status == "cancelled":
+            return "❌ **Cancelled**"
+        if self.duplicate_of is not None:
+            applied = self.duplicate_of
+            return (
+                f"♻️ This change was already applied on {time.ctime(applied.applied_at)}, "
+                f"so nothing was run again.\n\n**Pull request:** {applied.pr_url}"
+                f"\n\n{applied.response}"
+            )
+        if self.status == "failed" and self.progress is None:
+            return f"❌ **Error:** {self.error}"
+        text = self.progress.markdown()
+        if self.status == "failed":
+            text += f"\n\n❌ **Error:** {self.error}"
+        return text
+
+
+class JobExecutor:
+    """Runs schema change requests in the background, shared by every browser session.
+
+    Jobs run on the MCP pool's loop, the one long-lived loop that owns the warm MCP
+    sessions, with at most ``max_concurrency`` agent runs at a time. Jobs of the
+    same chat session run one after the other, since they share its history.
+    ``submit`` returns a job id right away; the UI polls ``get`` for the progress
+    and the result.
+    """
+
+    def __init__(self, max_concurrency: int = JOB_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._pool = get_schema_pr_mcp_pool()
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # created on the pool's loop by _start
+        self._slots: asyncio.Semaphore | None = None
+        self._sessions: dict[str, asyncio.Lock] = {}
+        self._pool.submit(self._start()).result()
+
+    async def _start(self):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    def submit(
+        self,
+        message: str,
+        session_id: str,
+        project_id: str | None = None,
+        request: str | None = None,
+        context: dict[str, str] | None = None,
+    ) -> str:
+        """Queue a request and return its job id.
+
+        With ``project_id`` and the user's ``request``, a repeat of a request that
+        is already queued or running returns that job, and a repeat of an applied
+        one finishes at once with the earlier result from the request index.
+        """
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            session_id=session_id,
+            message=message,
+            project_id=project_id,
+            request=request,
+            context=context or {},
+        )
+        if project_id and request:
+            with self._lock:
+                pending = self._pending_duplicate(job)
+            if pending is not None:
+                logger.info(f"Job {pending.id} already handles this request")
+                return pending.id
+            job.duplicate_of = get_request_index().find(
+                project_id, request, job.context, read_schema_hash=read_schema_hash
+            )
+            if job.duplicate_of is not None:
+                job.status = "succeeded"
+                job.finished_at = time.time()
+                with self._lock:
+                    self._jobs[job.id] = job
+                return job.id
+
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = self._pool.submit(self._run(job))
+        job.future.add_done_callback(lambda _: self._cancelled_before_start(job))
+        logger.info(f"Job {job.id} queued for session {session_id[:8]}")
+        return job.id
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, session_id: str | None = None) -> list[Job]:
+        with self._lock:
+            return [
+                job
+                for job in self._jobs.values()
+                if session_id is None or job.session_id == session_id
+            ]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.done or job.future is None:
+            return False
+        return job.future.cancel()
+
+    def stats(self) -> dict[str, int]:
+        counts = {"queued": 0, "running": 0}
+        for job in self.jobs():
+            if job.status in counts:
+                counts[job.status] += 1
+        return counts
+
+    async def _run(self, job: Job):
+        session = self._sessions.setdefault(job.session_id, asyncio.Lock())
+        try:
+            async with session, self._slots:
+                job.status = "running"
+                job.progress = RunProgress()
+                logger.info(f"Job {job.id} started")
+                async for event in stream_schema_to_pr_agent(
+                    job.message, session_id=job.session_id
+                ):
+                    if isinstance(event, RunResponse):
+                        job.response = event
+                    else:
+                        job.progress.update(event)
+                if job.response is not None and isinstance(job.response.content, str):
+                    job.progress.content = job.response.content
+                job.status = "succeeded"
+                if job.project_id and job.request and job.response is not None:
+                    get_request_index().add(
+                        job.project_id, job.request, job.context, job.response
+                    )
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.error(f"Job {job.id} failed: {e}")
+        finally:
+            if job.progress is not None:
+                job.progress.finished = time.monotonic()
+            job.finished_at = time.time()
+            logger.info(f"Job {job.id} {job.status}")
+
+    def _pending_duplicate(self, job: Job) -> Job | None:
+        normalized = normalize_request(job.request)
+        for other in self._jobs.values():
+            if (
+                not other.done
+                and other.project_id == job.project_id
+                and other.request is not None
+                and other.context == job.context
+                and normalize_request(other.request) == normalized
+            ):
+                return other
+        return None
+
+    def _cancelled_before_start(self, job: Job):
+        # a job cancelled while queued never runs, so _run cannot record it
+        if not job.done and job.future.cancelled():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [
+            job.id
+            for job in self._jobs.values()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+        # drop the locks of sessions with nothing queued or running, so a
+        # long-lived server does not keep one per session it has ever seen
+        active = {job.session_id for job in self._jobs.values() if not job.done}
+        for session_id, lock in list(self._sessions.items()):
+            if session_id not in active and not lock.locked():
+                self._sessions.pop(session_id, None)
+
+
+_executor: JobExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """Return the process-wide job executor, starting the MCP pool on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
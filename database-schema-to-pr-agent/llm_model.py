@@ -1,18 +1,420 @@
+"""Language models for the agent.
+
+``get_model`` returns a ``RoutedModel``: every LLM turn of a run goes to the
+fast or the strong model depending on the step, and to the next model in line
+when one is rate limited or slower than ``MODEL_LATENCY_BUDGET``. The provider
+models behind it are created once per (provider, model, API key) and reused, so
+their HTTP connections are kept across requests.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from agno.exceptions import ModelProviderError
 from agno.models.anthropic import Claude
+from agno.models.base import Model
 from agno.models.groq import Groq
+from agno.models.message import Message
 from agno.models.openai import OpenAIChat
+from agno.models.response import ModelResponse
+from agno.utils.log import logger
+from groq import AsyncGroq
 
+# Model for cheap steps (project lookup, opening the PR, the final summary).
+# Unset, every step goes to MODEL_ID.
+MODEL_FAST_ID = os.getenv("MODEL_FAST_ID")
+# Comma-separated models tried in order when a model is rate limited or too slow
+MODEL_FALLBACK_IDS = [
+    model_id.strip()
+    for model_id in os.getenv("MODEL_FALLBACK_IDS", "").split(",")
+    if model_id.strip()
+]
+# Seconds to the first streamed token (or the whole reply when not streaming)
+# before the next model is tried
+MODEL_LATENCY_BUDGET = float(os.getenv("MODEL_LATENCY_BUDGET", "30"))
 
-def get_model(model_id: str, api_key: str):
-    model_lower = model_id.lower()
+# Provider errors worth retrying on another model: rate limited or overloaded
+RETRYABLE_STATUS_CODES = {429, 503, 529}
+
+# API keys for models of another provider than MODEL_ID
+PROVIDER_KEY_ENV = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "groq": "GROQ_API_KEY",
+}
+# Providers whose models share a message format, so one can continue a
+# conversation (tool calls and results included) that another one started
+MESSAGE_FORMATS = {"openai": "openai", "groq": "openai", "anthropic": "anthropic"}
 
+# Tools after which the next step is cheap: looking up projects, opening the PR
+# and summarizing. After anything else (the user request, schema reads and
+# changes) the model has to reason about the schema.
+FAST_AFTER_TOOLS = {
+    "get_projects",
+    "get_project_details",
+    "get_project_hosted_api_details",
+    "generate_models",
+    "create_pull_request_with_files",
+    "create_branch",
+    "create_pull_request",
+    "list_branches",
+}
+
+
+def get_provider(model_id: str) -> str:
+    """Provider of a model, from an explicit "provider:" prefix or its name."""
+    prefix, _, _ = model_id.partition(":")
+    if prefix in PROVIDER_KEY_ENV:
+        return prefix
+
+    model_lower = model_id.lower()
     # OpenAI models (GPT, o1, o3, etc.)
     if any(pattern in model_lower for pattern in ["gpt", "o1", "o3", "o4"]):
-        return OpenAIChat(id=model_id, api_key=api_key)
-
+        return "openai"
     # Anthropic Claude models
     if "claude" in model_lower:
+        return "anthropic"
+    # Default to Groq for other models (llama, mixtral, gemma, etc.)
+    return "groq"
+
+
+_models: dict[tuple[str, str, str | None], Model] = {}
+_models_lock = threading.Lock()
+
+
+def get_provider_model(model_id: str, api_key: str | None) -> Model:
+    """Return the cached provider model, creating it and its client on first use.
+
+    The async HTTP clients are bound to the event loop that first uses them. All
+    agent runs happen on the MCP pool's loop, so they are shared safely.
+    """
+    provider = get_provider(model_id)
+    name = model_id.removeprefix(f"{provider}:")
+    key = (provider, name, api_key)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = _create_model(provider, name, api_key)
+            logger.info(f"Created {provider} client for {name}")
+        return model
+
+
+def _create_model(provider: str, model_id: str, api_key: str | None) -> Model:
+    if provider == "openai":
+        # agno 1.7 builds a new OpenAI client per request; a shared HTTP client
+        # keeps the connection pool
+        return OpenAIChat(id=model_id, api_key=api_key, http_client=_http_client())
+    if provider == "anthropic":
+        # Claude keeps its async client once created
         return Claude(id=model_id, api_key=api_key)
+    return Groq(
+        id=model_id,
+        api_key=api_key,
+        async_client=AsyncGroq(api_key=api_key, http_client=_http_client()),
+    )
 
-    # Default to Groq for other models (llama, mixtral, gemma, etc.)
-    return Groq(id=model_id, api_key=api_key)
+
+def _http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(600, connect=10),
+    )
+
+
+def route_step(messages: list[Message]) -> tuple[str, str]:
+    """Return ``(tier, reason)`` for the next LLM turn: "fast" or "strong"."""
+    tools = _last_tool_results(messages)
+    if not tools:
+        return "strong", "request"
+    reason = f"after {', '.join(dict.fromkeys(tools))}"
+    if all(tool in FAST_AFTER_TOOLS for tool in tools):
+        return "fast", reason
+    return "strong", reason
+
+
+def _last_tool_results(messages: list[Message]) -> list[str]:
+    """Names of the tools whose results end ``messages``, in call order.
+
+    OpenAI-style models get one ``role="tool"`` message per result. Claude gets a
+    single user message of ``tool_result`` blocks that only carry the id of the
+    call, so the names are looked up in the assistant message that made them.
+    """
+    results: list[Message] = []
+    for message in reversed(messages):
+        if message.role != "tool" and not _is_tool_result(message):
+            break
+        results.append(message)
+    if not results:
+        return []
+
+    names: dict[str, str] = {}
+    for message in reversed(messages[: len(messages) - len(results)]):
+        if message.role == "assistant":
+            for call in message.tool_calls or []:
+                names[call.get("id")] = call.get("function", {}).get("name")
+            break
+
+    tools = []
+    for message in reversed(results):
+        if message.role == "tool":
+            tools.append(message.tool_name or names.get(message.tool_call_id))
+        else:
+            tools += [names.get(block.get("tool_use_id")) for block in message.content]
+    return [tool or "unknown tool" for tool in tools]
+
+
+def _is_tool_result(message: Message) -> bool:
+    return (
+        message.role == "user"
+        and isinstance(message.content, list)
+        and bool(message.content)
+        and all(
+            isinstance(block, dict) and block.get("type") == "tool_result"
+            for block in message.content
+        )
+    )
+
+
+@dataclass
+class ModelStats:
+    calls: int = 0
+    seconds: float = 0.0
+    fallbacks: int = 0  # times the model was skipped for being slow or rate limited
+
+    @property
+    def average(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+_stats: dict[str, ModelStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_model_stats() -> dict[str, dict[str, float]]:
+    """Calls, average latency and fallbacks of every model since the start."""
+    with _stats_lock:
+        return {
+            model_id: {
+                "calls": stats.calls,
+                "average_seconds": round(stats.average, 2),
+                "fallbacks": stats.fallbacks,
+            }
+            for model_id, stats in _stats.items()
+        }
+
+
+def _record(model: Model, seconds: float | None):
+    with _stats_lock:
+        stats = _stats.setdefault(model.id, ModelStats())
+        if seconds is None:
+            stats.fallbacks += 1
+        else:
+            stats.calls += 1
+            stats.seconds += seconds
+
+
+class _Retry(Exception):
+    """The model failed in a way the next model in line may not."""
+
+
+@dataclass
+class RoutedModel(Model):
+    """A model that picks the provider model for each LLM turn of a run.
+
+    ``tiers`` maps "strong" and "fast" to the models to try, in order. ``route``
+    picks the tier from the conversation so far; a model that is rate limited or
+    slower than ``latency_budget`` is skipped for the next one of the tier.
+    Responses are parsed by the model that produced them.
+    """
+
+    id: str = "router"
+    name: str = "RoutedModel"
+    provider: str = "Router"
+    tiers: dict[str, list[Model]] = field(default_factory=dict)
+    latency_budget: float = MODEL_LATENCY_BUDGET
+
+    def __post_init__(self):
+        super().__post_init__()
+        primary = self.tiers["strong"][0]
+        self.id = primary.id
+        self.supports_native_structured_outputs = (
+            primary.supports_native_structured_outputs
+        )
+        self.tool_message_role = primary.tool_message_role
+        self.assistant_message_role = primary.assistant_message_role
+
+    @property
+    def primary(self) -> Model:
+        return self.tiers["strong"][0]
+
+    def route(self, messages: list[Message]) -> tuple[str, str]:
+        return route_step(messages)
+
+    def _candidates(self, messages: list[Message]) -> list[Model]:
+        tier, reason = self.route(messages)
+        candidates = self.tiers.get(tier) or self.tiers["strong"]
+        logger.info(f"Routing {reason} to {tier} model {candidates[0].id}")
+        return candidates
+
+    async def ainvoke(self, messages: list[Message], **kwargs) -> Any:
+        error = None
+        for model in self._candidates(messages):
+            started = time.monotonic()
+            try:
+                response = await self._within_budget(
+                    model, model.ainvoke(messages=messages, **kwargs)
+                )
+            except _Retry as e:
+                error = e.__cause__
+                continue
+            self._log_latency(model, started)
+            return model, response
+        raise error
+
+    async def ainvoke_stream(
+        self, messages: list[Message], **kwargs
+    ) -> AsyncIterator[Any]:
+        error = None
+        for model in self._candidates(messages):
+            started = time.monotonic()
+            stream = model.ainvoke_stream(messages=messages, **kwargs)
+            try:
+                # the budget covers the first chunk; once the reply has started
+                # there is no switching models
+                first = await self._within_budget(model, stream.__anext__())
+            except StopAsyncIteration:
+                self._log_latency(model, started)
+                return
+            except _Retry as e:
+                error = e.__cause__
+                await stream.aclose()
+                continue
+            self._log_latency(model, started, "first token")
+            yield model, first
+            async for chunk in stream:
+                yield model, chunk
+            return
+        raise error
+
+    def invoke(self, messages: list[Message], **kwargs) -> Any:
+        error = None
+        for model in self._candidates(messages):
+            started = time.monotonic()
+            try:
+                response = model.invoke(messages=messages, **kwargs)
+            except ModelProviderError as e:
+                if not self._retryable(model, e):
+                    raise
+                error = e
+                continue
+            self._log_latency(model, started)
+            return model, response
+        raise error
+
+    def invoke_stream(self, messages: list[Message], **kwargs) -> Iterator[Any]:
+        model = self._candidates(messages)[0]
+        for chunk in model.invoke_stream(messages=messages, **kwargs):
+            yield model, chunk
+
+    def parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        model, response = response
+        return model.parse_provider_response(response, **kwargs)
+
+    def parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        model, response = response
+        return model.parse_provider_response_delta(response)
+
+    # Everything that shapes the conversation follows the primary model, which
+    # shares its message format with every other model of the router
+    def format_function_call_results(
+        self, messages: list[Message], function_call_results: list[Message], **kwargs
+    ) -> None:
+        self.primary.format_function_call_results(
+            messages=messages, function_call_results=function_call_results, **kwargs
+        )
+
+    def parse_tool_calls(self, tool_calls_data: list[dict[str, Any]]) -> list[dict]:
+        return self.primary.parse_tool_calls(tool_calls_data)
+
+    def get_system_message_for_model(
+        self, tools: list[Any] | None = None
+    ) -> str | None:
+        return self.primary.get_system_message_for_model(tools)
+
+    def get_instructions_for_model(
+        self, tools: list[Any] | None = None
+    ) -> list[str] | None:
+        return self.primary.get_instructions_for_model(tools)
+
+    async def _within_budget(self, model: Model, call) -> Any:
+        try:
+            return await asyncio.wait_for(call, timeout=self.latency_budget)
+        except asyncio.TimeoutError as e:
+            logger.warning(
+                f"Model {model.id} did not answer within {self.latency_budget:g}s"
+            )
+            _record(model, None)
+            raise _Retry from e
+        except ModelProviderError as e:
+            if self._retryable(model, e):
+                raise _Retry from e
+            raise
+
+    @staticmethod
+    def _retryable(model: Model, error: ModelProviderError) -> bool:
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return False
+        logger.warning(f"Model {model.id} failed ({error.status_code}): {error}")
+        _record(model, None)
+        return True
+
+    @staticmethod
+    def _log_latency(model: Model, started: float, what: str = "reply"):
+        seconds = time.monotonic() - started
+        _record(model, seconds)
+        logger.info(f"Model {model.id} {what} in {seconds:.2f}s")
+
+
+def get_model(model_id: str, api_key: str) -> RoutedModel:
+    """Return the agent's model: ``model_id`` for reasoning steps, with
+    ``MODEL_FAST_ID`` for cheap steps and ``MODEL_FALLBACK_IDS`` behind both."""
+    provider = get_provider(model_id)
+
+    def model(candidate_id: str) -> Model | None:
+        candidate_provider = get_provider(candidate_id)
+        if MESSAGE_FORMATS[candidate_provider] != MESSAGE_FORMATS[provider]:
+            logger.warning(
+                f"Ignoring {candidate_id}: {candidate_provider} models cannot "
+                f"continue a {provider} conversation"
+            )
+            return None
+        key = (
+            api_key
+            if candidate_provider == provider
+            else os.getenv(PROVIDER_KEY_ENV[candidate_provider])
+        )
+        return get_provider_model(candidate_id, key)
+
+    fallbacks = [model(candidate_id) for candidate_id in MODEL_FALLBACK_IDS]
+    fast = model(MODEL_FAST_ID) if MODEL_FAST_ID else None
+    strong = [get_provider_model(model_id, api_key)]
+    tiers = {"strong": [*strong, *fallbacks]}
+    if fast is not None:
+        tiers["fast"] = [fast, *strong, *fallbacks]
+    return RoutedModel(tiers={tier: _unique(models) for tier, models in tiers.items()})
+
+
+def _unique(models: list[Model | None]) -> list[Model]:
+    seen: set[int] = set()
+    unique = []
+    for model in models:
+        if model is not None and id(model) not in seen:
+            seen.add(id(model))
+            unique.append(model)
+    return unique
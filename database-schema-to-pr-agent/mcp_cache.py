@@ -0,0 +1,196 @@
+import json
+import os
+import shlex
+import threading
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agno.tools.mcp import MCPTools
+from agno.utils.log import logger
+from mcp.types import ListToolsResult, Tool
+
+MCP_CACHE_FILE = os.getenv("MCP_CACHE_FILE", "tmp/mcp_cache.json")
+# How long a resolved server version stays pinned before the registry is asked again
+MCP_PIN_TTL_HOURS = float(os.getenv("MCP_PIN_TTL_HOURS", "168"))
+# Start servers from the local uv/npm caches only, never touching the registries
+MCP_OFFLINE = os.getenv("MCP_OFFLINE", "false").lower() in ("1", "true", "yes")
+REGISTRY_TIMEOUT = 10
+
+PYPI_URL = "https://pypi.org/pypi/{package}/json"
+NPM_URL = "https://registry.npmjs.org/{package}/latest"
+
+
+@dataclass(frozen=True)
+class MCPServerSpec:
+    """An MCP server started from a PyPI package with uvx or an npm package with npx."""
+
+    ecosystem: Literal["pypi", "npm"]
+    package: str
+    args: tuple[str, ...] = field(default_factory=tuple)
+
+    def command(self, version: str | None = None) -> str:
+        """Command line that starts the server, pinned to ``version`` when given."""
+        if self.ecosystem == "pypi":
+            spec = f"{self.package}=={version}" if version else f"{self.package}@latest"
+            parts = ["uvx", *(["--offline"] if MCP_OFFLINE else []), "--from", spec]
+        else:
+            spec = f"{self.package}@{version}" if version else self.package
+            parts = [
+                "npx",
+                "-y",
+                "--offline" if MCP_OFFLINE else "--prefer-offline",
+                spec,
+            ]
+        return shlex.join([*parts, *self.args])
+
+
+class MCPCache:
+    """JSON file with the pinned server versions and the tools each version exposes.
+
+    Entries look like::
+
+        {"versions": {"gibson": {"package": ..., "version": ..., "resolved_at": ...}},
+         "tools": {"gibson@0.8.1": [<MCP tool definitions sorted by name>]}}
+    """
+
+    def __init__(self, path: str = MCP_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"versions": {}, "tools": {}}
+
+    def _update(self, section: str, key: str, value: Any):
+        with self._lock:
+            data = self._read()
+            data.setdefault(section, {})[key] = value
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # write to a temporary file first so readers never see a torn file
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def pinned_version(self, name: str, spec: MCPServerSpec) -> dict[str, Any] | None:
+        pin = self._read().get("versions", {}).get(name)
+        if pin is None or pin.get("package") != spec.package:
+            return None
+        return pin
+
+    def pin_version(self, name: str, spec: MCPServerSpec, version: str):
+        self._update(
+            "versions",
+            name,
+            {"package": spec.package, "version": version, "resolved_at": time.time()},
+        )
+
+    def tools(self, key: str) -> list[Tool] | None:
+        tools = self._read().get("tools", {}).get(key)
+        if tools is None:
+            return None
+        return [Tool.model_validate(tool) for tool in tools]
+
+    def save_tools(self, key: str, tools: list[Tool]):
+        self._update(
+            "tools",
+            key,
+            [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        )
+
+
+_cache: MCPCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_mcp_cache() -> MCPCache:
+    """Return the process-wide MCP cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MCPCache()
+        return _cache
+
+
+def latest_version(spec: MCPServerSpec) -> str:
+    """Ask PyPI or npm for the latest release of the server package."""
+    template = PYPI_URL if spec.ecosystem == "pypi" else NPM_URL
+    url = template.format(package=urllib.parse.quote(spec.package, safe="@"))
+    with urllib.request.urlopen(url, timeout=REGISTRY_TIMEOUT) as response:
+        payload = json.load(response)
+    return (
+        payload["info"]["version"] if spec.ecosystem == "pypi" else payload["version"]
+    )
+
+
+def resolve_server(name: str, spec: MCPServerSpec) -> tuple[str, str | None]:
+    """Return the pinned command for a server and the version it is pinned to.
+
+    The registry is only asked when there is no pin or the pin is older than
+    ``MCP_PIN_TTL_HOURS``. If that lookup fails the old pin is kept, and without
+    any pin the unpinned command is returned.
+    """
+    cache = get_mcp_cache()
+    pin = cache.pinned_version(name, spec)
+    fresh = pin is not None and (
+        MCP_OFFLINE or time.time() - pin["resolved_at"] < MCP_PIN_TTL_HOURS * 3600
+    )
+    if not fresh and not MCP_OFFLINE:
+        try:
+            version = latest_version(spec)
+        except Exception as e:
+            logger.warning(f"Could not resolve the latest {spec.package}: {e}")
+        else:
+            if pin is None or pin["version"] != version:
+                logger.info(f"Pinned MCP server '{name}' to {spec.package} {version}")
+            cache.pin_version(name, spec, version)
+            pin = {"version": version}
+
+    version = pin["version"] if pin else None
+    return spec.command(version), version
+
+
+class CachedMCPTools(MCPTools):
+    """MCPTools that lists its tools from the MCP cache when it can.
+
+    The tool definitions are cached per server version, so a reconnect does not
+    ask the server for them again. They are always sorted by name, so the tool
+    schemas sent to the model are identical from one request to the next.
+    """
+
+    def __init__(self, *args, cache_key: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    async def initialize(self) -> None:
+        if self._initialized or self.session is None:
+            return await super().initialize()
+
+        cache = get_mcp_cache()
+        list_tools = self.session.list_tools
+
+        async def list_cached_tools(*args, **kwargs) -> ListToolsResult:
+            tools = cache.tools(self.cache_key) if self.cache_key else None
+            if tools is None:
+                tools = sorted((await list_tools(*args, **kwargs)).tools, key=_name)
+                if self.cache_key:
+                    cache.save_tools(self.cache_key, tools)
+            return ListToolsResult(tools=tools)
+
+        self.session.list_tools = list_cached_tools
+        try:
+            await super().initialize()
+        finally:
+            del self.session.list_tools
+
+
+def _name(tool: Tool) -> str:
+    return tool.name
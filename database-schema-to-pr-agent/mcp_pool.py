@@ -0,0 +1,217 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from agno.tools.mcp import MCPTools
+from agno.utils.log import logger
+
+from mcp_cache import CachedMCPTools, MCPServerSpec, resolve_server
+
+T = TypeVar("T")
+
+# How long a request waits for the servers to come up. The first start can take
+# minutes while uvx and npx download their packages; later starts are fast.
+MCP_STARTUP_TIMEOUT = float(os.getenv("MCP_STARTUP_TIMEOUT", "300"))
+# Read timeout for a single MCP request, including the initial handshake
+MCP_REQUEST_TIMEOUT = int(os.getenv("MCP_REQUEST_TIMEOUT", "300"))
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+MCP_PING_TIMEOUT = 10.0
+MAX_RESTART_BACKOFF = 60.0
+
+
+class _MCPServer:
+    """One MCP server process and the connection the pool keeps open to it."""
+
+    def __init__(self, name: str, spec: MCPServerSpec):
+        self.name = name
+        self.spec = spec
+        self.version: str | None = None
+        self.tools: MCPTools | None = None
+        self.ready = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.restarts = 0
+        self.failures = 0  # consecutive, drives the restart backoff
+        self.last_error: str | None = None
+
+
+class MCPServerPool:
+    """Process-wide pool of warm MCP server connections.
+
+    The servers are started once and kept running on a dedicated event loop thread,
+    so requests and Streamlit reruns reuse them instead of paying for process
+    startup and the MCP handshake every time. Each server lives in its own
+    long-lived task that opens the connection, health-checks it with a ping every
+    ``MCP_HEALTH_CHECK_INTERVAL`` seconds and reconnects with a backoff if the
+    server dies. Coroutines that use the pooled tools must run on the pool's loop,
+    which ``run`` takes care of.
+    """
+
+    def __init__(
+        self, servers: dict[str, MCPServerSpec], env: dict[str, str] | None = None
+    ):
+        self.env = env
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="mcp-pool", daemon=True
+        )
+        self._thread.start()
+        self._servers: dict[str, _MCPServer] = asyncio.run_coroutine_threadsafe(
+            self._start(servers), self._loop
+        ).result()
+
+    async def _start(self, servers: dict[str, MCPServerSpec]) -> dict[str, _MCPServer]:
+        started = {}
+        for name, spec in servers.items():
+            server = _MCPServer(name, spec)
+            server.task = asyncio.create_task(self._serve(server), name=f"mcp-{name}")
+            started[name] = server
+        return started
+
+    async def _serve(self, server: _MCPServer):
+        # The connection is entered and exited in this same task, as the anyio
+        # cancel scopes inside the MCP stdio client require.
+        while not server.stopping.is_set():
+            try:
+                # pinned command, resolved from the MCP cache without the network
+                # unless the pin is missing or stale
+                command, server.version = await asyncio.to_thread(
+                    resolve_server, server.name, server.spec
+                )
+                async with CachedMCPTools(
+                    command,
+                    env=self.env,
+                    timeout_seconds=MCP_REQUEST_TIMEOUT,
+                    cache_key=f"{server.name}@{server.version}"
+                    if server.version
+                    else None,
+                ) as tools:
+                    server.tools = tools
+                    server.ready.set()
+                    server.failures = 0
+                    server.last_error = None
+                    logger.info(f"MCP server '{server.name}' is ready")
+                    await self._watch(server, tools)
+            except Exception as e:
+                server.last_error = f"{type(e).__name__}: {e}"
+                logger.warning(
+                    f"MCP server '{server.name}' failed: {server.last_error}"
+                )
+            finally:
+                server.ready.clear()
+                server.tools = None
+
+            if server.stopping.is_set():
+                break
+            server.restarts += 1
+            server.failures += 1
+            backoff = min(MAX_RESTART_BACKOFF, 2.0 ** (server.failures - 1))
+            logger.info(f"Restarting MCP server '{server.name}' in {backoff:.0f}s")
+            try:
+                await asyncio.wait_for(server.stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _watch(self, server: _MCPServer, tools: MCPTools):
+        """Return when the pool stops; raise once the server stops answering pings."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    server.stopping.wait(), timeout=MCP_HEALTH_CHECK_INTERVAL
+                )
+                return
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.wait_for(tools.session.send_ping(), timeout=MCP_PING_TIMEOUT)
+
+    async def acquire(
+        self, timeout: float = MCP_STARTUP_TIMEOUT
+    ) -> dict[str, MCPTools]:
+        """Wait until every server is connected and return their toolkits by name.
+
+        Must be awaited on the pool's loop.
+        """
+        servers = list(self._servers.values())
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(server.ready.wait() for server in servers)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError as e:
+            waiting = ", ".join(
+                f"{server.name} ({server.last_error or 'still starting'})"
+                for server in servers
+                if not server.ready.is_set()
+            )
+            raise TimeoutError(f"MCP servers not ready: {waiting}") from e
+        return {server.name: server.tools for server in servers}
+
+    async def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the pool's loop and await its result from any loop."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        )
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        """Schedule ``coro`` on the pool's loop from any thread without waiting."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "ready": server.ready.is_set(),
+                "version": server.version,
+                "restarts": server.restarts,
+                "last_error": server.last_error,
+            }
+            for name, server in self._servers.items()
+        }
+
+    def close(self, timeout: float = 10.0):
+        """Disconnect every server and stop the pool's loop."""
+        if not self._loop.is_running():
+            return
+
+        async def stop():
+            for server in self._servers.values():
+                server.stopping.set()
+            await asyncio.wait(
+                [server.task for server in self._servers.values()], timeout=timeout
+            )
+
+        try:
+            asyncio.run_coroutine_threadsafe(stop(), self._loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error while stopping MCP servers: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+
+_pool: MCPServerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_mcp_pool(
+    servers: dict[str, MCPServerSpec], env: dict[str, str] | None = None
+) -> MCPServerPool:
+    """Return the process-wide MCP pool, starting its servers on first use.
+
+    Later calls return the same pool; ``servers`` and ``env`` only apply to the
+    first one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPServerPool(servers, env)
+            atexit.register(_pool.close)
+        return _pool
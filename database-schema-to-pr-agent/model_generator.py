@@ -0,0 +1,598 @@
+"""Generate Pydantic and SQLAlchemy 2.0 models from a GibsonAI schema.
+
+The output only depends on the schema, so the same schema always produces the same
+files. Run it against a saved schema to check the output offline:
+
+    python model_generator.py schema.json --model-type both --models-dir models
+"""
+
+import argparse
+import json
+import keyword
+import re
+from dataclasses import dataclass, field
+
+from gibson_schema import Column, ForeignKey, Table, parse_schema
+
+MODEL_TYPES = ("pydantic", "sqlalchemy", "both")
+PYDANTIC_FILE = "pydantic_models.py"
+SQLALCHEMY_FILE = "sqlalchemy_models.py"
+LINE_LENGTH = 88  # of the generated code, as ruff formats it
+
+# names that clash with attributes of the generated base classes
+_RESERVED = {
+    "pydantic": {"model_config", "model_fields", "copy", "dict", "json", "schema"},
+    "sqlalchemy": {"metadata", "registry", "query"},
+}
+
+# MySQL base type -> (python type, SQLAlchemy type)
+_TYPES = {
+    "bool": ("bool", "Boolean"),
+    "boolean": ("bool", "Boolean"),
+    "bit": ("bool", "Boolean"),
+    "tinyint": ("int", "SmallInteger"),
+    "smallint": ("int", "SmallInteger"),
+    "mediumint": ("int", "Integer"),
+    "int": ("int", "Integer"),
+    "integer": ("int", "Integer"),
+    "serial": ("int", "Integer"),
+    "bigint": ("int", "BigInteger"),
+    "bigserial": ("int", "BigInteger"),
+    "year": ("int", "SmallInteger"),
+    "decimal": ("Decimal", "Numeric"),
+    "numeric": ("Decimal", "Numeric"),
+    "dec": ("Decimal", "Numeric"),
+    "fixed": ("Decimal", "Numeric"),
+    "float": ("float", "Float"),
+    "double": ("float", "Double"),
+    "real": ("float", "Double"),
+    "char": ("str", "String"),
+    "varchar": ("str", "String"),
+    "tinytext": ("str", "Text"),
+    "text": ("str", "Text"),
+    "mediumtext": ("str", "Text"),
+    "longtext": ("str", "Text"),
+    "enum": ("str", "Enum"),
+    "set": ("str", "String"),
+    "uuid": ("str", "Uuid"),
+    "json": ("Any", "JSON"),
+    "jsonb": ("Any", "JSON"),
+    "date": ("date", "Date"),
+    "datetime": ("datetime", "DateTime"),
+    "timestamp": ("datetime", "DateTime"),
+    "time": ("time", "Time"),
+    "binary": ("bytes", "LargeBinary"),
+    "varbinary": ("bytes", "LargeBinary"),
+    "tinyblob": ("bytes", "LargeBinary"),
+    "blob": ("bytes", "LargeBinary"),
+    "mediumblob": ("bytes", "LargeBinary"),
+    "longblob": ("bytes", "LargeBinary"),
+}
+# python type -> module it is imported from
+_PYTHON_IMPORTS = {
+    "Decimal": "decimal",
+    "date": "datetime",
+    "datetime": "datetime",
+    "time": "datetime",
+    "Any": "typing",
+    "Literal": "typing",
+}
+_NUMBER = re.compile(r"^[+-]?\d+(\.\d+)?$")
+
+
+@dataclass
+class _Relationship:
+    name: str
+    target: str  # class name
+    child_table: str  # table holding the foreign key
+    foreign_key: ForeignKey
+    collection: bool
+    back_populates: str = ""
+    self_referential: bool = False
+
+
+@dataclass
+class _Model:
+    table: Table
+    class_name: str
+    attributes: dict[str, str] = field(default_factory=dict)  # column -> attribute
+    relationships: list[_Relationship] = field(default_factory=list)
+
+
+def generate_models(
+    schema: str | dict | list | list[Table],
+    model_type: str = "pydantic",
+    models_dir: str = "models",
+    source: str = "GibsonAI",
+) -> dict[str, str]:
+    """Return the generated model files as ``{path: content}``.
+
+    ``model_type`` is ``pydantic``, ``sqlalchemy`` or ``both`` (case-insensitive,
+    as chosen in the app). ``source`` names the schema in the file header.
+    """
+    model_type = model_type.lower()
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"model_type must be one of {', '.join(MODEL_TYPES)}")
+    if isinstance(schema, list) and schema and isinstance(schema[0], Table):
+        tables = schema
+    else:
+        tables = parse_schema(schema)
+
+    header = (
+        f'"""Models for the {source} schema.\n\n'
+        'Generated by model_generator.py; do not edit by hand.\n"""\n'
+    )
+    directory = models_dir.strip("/")
+    files = {}
+    if model_type in ("pydantic", "both"):
+        files[_join(directory, PYDANTIC_FILE)] = header + _pydantic(tables)
+    if model_type in ("sqlalchemy", "both"):
+        files[_join(directory, SQLALCHEMY_FILE)] = header + _sqlalchemy(tables)
+    return files
+
+
+def _join(directory: str, filename: str) -> str:
+    return f"{directory}/{filename}" if directory else filename
+
+
+# --- naming ----------------------------------------------------------------------
+
+
+def _class_name(table_name: str) -> str:
+    words = re.split(r"[^0-9A-Za-z]+", _singular(table_name))
+    name = "".join(word[:1].upper() + word[1:] for word in words if word)
+    return name if name and not name[0].isdigit() else f"Table{name}"
+
+
+def _singular(name: str) -> str:
+    lower = name.lower()
+    if lower.endswith("ies") and len(name) > 3:
+        return name[:-3] + "y"
+    if lower.endswith(("sses", "xes", "ches", "shes", "zzes")):
+        return name[:-2]
+    if lower.endswith("s") and not lower.endswith(("ss", "us", "is")):
+        return name[:-1]
+    return name
+
+
+def _plural(name: str) -> str:
+    lower = name.lower()
+    if lower.endswith("s"):
+        return name
+    if lower.endswith("y") and lower[-2:-1] not in "aeiou":
+        return name[:-1] + "ies"
+    if lower.endswith(("x", "ch", "sh", "z")):
+        return name + "es"
+    return name + "s"
+
+
+def _attribute(name: str, kind: str) -> str:
+    attribute = re.sub(r"\W", "_", name)
+    if attribute[:1].isdigit():
+        attribute = f"_{attribute}"
+    if keyword.iskeyword(attribute) or attribute in _RESERVED[kind]:
+        attribute += "_"
+    return attribute
+
+
+def _unique_name(name: str, used: set[str]) -> str:
+    candidate = name
+    number = 2
+    while candidate in used:
+        candidate = f"{name}{number}"
+        number += 1
+    used.add(candidate)
+    return candidate
+
+
+def _models(tables: list[Table], kind: str) -> dict[str, _Model]:
+    models: dict[str, _Model] = {}
+    class_names: set[str] = set()
+    for table in tables:
+        class_name = _class_name(table.name)
+        if class_name in class_names:
+            # two tables singularize to the same name, keep the table name as is
+            class_name = _class_name(table.name + "_")
+        models[table.name] = _Model(
+            table=table, class_name=_unique_name(class_name, class_names)
+        )
+        for column in table.columns:
+            models[table.name].attributes[column.name] = _attribute(column.name, kind)
+    return models
+
+
+def _link_relationships(models: dict[str, _Model]):
+    used = {name: set(model.attributes.values()) for name, model in models.items()}
+    for model in models.values():
+        for foreign_key in model.table.foreign_keys:
+            parent = models.get(foreign_key.ref_table)
+            if parent is None:
+                continue  # the referenced table is not part of this schema
+            column = foreign_key.columns[0]
+            name = column[:-3] if column.lower().endswith("_id") else column
+            if name == column or len(foreign_key.columns) > 1:
+                name = f"{name}_{_singular(parent.table.name)}"
+            name = _unique_name(_attribute(name, "sqlalchemy"), used[model.table.name])
+
+            collection = _plural(model.table.name)
+            if collection in used[parent.table.name]:
+                collection = f"{collection}_by_{name}"
+            collection = _unique_name(
+                _attribute(collection, "sqlalchemy"), used[parent.table.name]
+            )
+            self_referential = parent is model
+            model.relationships.append(
+                _Relationship(
+                    name=name,
+                    target=parent.class_name,
+                    child_table=model.table.name,
+                    foreign_key=foreign_key,
+                    collection=False,
+                    back_populates=collection,
+                    self_referential=self_referential,
+                )
+            )
+            parent.relationships.append(
+                _Relationship(
+                    name=collection,
+                    target=model.class_name,
+                    child_table=model.table.name,
+                    foreign_key=foreign_key,
+                    collection=True,
+                    back_populates=name,
+                    self_referential=self_referential,
+                )
+            )
+
+
+# --- values ----------------------------------------------------------------------
+
+
+def _python_type(column: Column) -> str:
+    if column.data_type == "tinyint" and column.length == 1:
+        return "bool"
+    if column.data_type == "enum" and column.values:
+        return "Literal[" + ", ".join(_py(value) for value in column.values) + "]"
+    return _TYPES.get(column.data_type, ("Any", "String"))[0]
+
+
+def _python_default(column: Column) -> tuple[bool, object]:
+    """Return whether the SQL default is a literal, and its Python value."""
+    if column.default is None:
+        return False, None
+    default = column.default.strip()
+    python_type = _python_type(column)
+    if default[:1] in ("'", '"') and default[-1:] == default[:1]:
+        value = default[1:-1].replace(default[0] * 2, default[0])
+        if python_type == "str" or python_type.startswith("Literal"):
+            return True, value
+        default = value
+    if python_type == "bool":
+        if default.lower() in ("1", "true", "b'1'"):
+            return True, True
+        if default.lower() in ("0", "false", "b'0'"):
+            return True, False
+    if python_type == "int" and _NUMBER.match(default) and "." not in default:
+        return True, int(default)
+    if python_type == "float" and _NUMBER.match(default):
+        return True, float(default)
+    if python_type == "Decimal" and _NUMBER.match(default):
+        return True, _Code(f'Decimal("{default}")')
+    return False, None
+
+
+def _server_generated(column: Column) -> bool:
+    return column.autoincrement or (
+        column.default is not None and not _python_default(column)[0]
+    )
+
+
+class _Code(str):
+    """Source code that ``_py`` emits as is."""
+
+
+def _py(value: object) -> str:
+    """Python source for ``value``, with double-quoted strings as ruff formats them."""
+    if isinstance(value, _Code):
+        return str(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        return "[" + ", ".join(_py(item) for item in value) + "]"
+    return repr(value)
+
+
+# --- Pydantic --------------------------------------------------------------------
+
+
+def _pydantic(tables: list[Table]) -> str:
+    models = _models(tables, "pydantic")
+    imports: dict[str, set[str]] = {"pydantic": {"BaseModel", "ConfigDict"}}
+    classes = []
+    for model in models.values():
+        table = model.table
+        aliased = any(
+            attribute != column for column, attribute in model.attributes.items()
+        )
+        config = "from_attributes=True"
+        if aliased:
+            config += ", populate_by_name=True"
+        lines = [
+            f"class {model.class_name}(BaseModel):",
+            f'    """Row of the ``{table.name}`` table."""',
+            "",
+            f"    model_config = ConfigDict({config})",
+            "",
+        ]
+        references = {
+            column: foreign_key
+            for foreign_key in table.foreign_keys
+            for column in foreign_key.columns
+        }
+        for column in table.columns:
+            python_type = _python_type(column)
+            if python_type.startswith("Literal"):
+                _add_import(imports, "Literal")
+            else:
+                _add_import(imports, python_type)
+
+            is_literal, value = _python_default(column)
+            optional = column.nullable or _server_generated(column)
+            annotation = f"{python_type} | None" if optional else python_type
+
+            arguments = []
+            if is_literal:
+                arguments.append(f"default={_py(value)}")
+            elif optional:
+                arguments.append("default=None")
+            attribute = model.attributes[column.name]
+            if attribute != column.name:
+                arguments.append(f"alias={_py(column.name)}")
+            if column.length and python_type == "str":
+                arguments.append(f"max_length={column.length}")
+            if python_type == "Decimal" and column.precision:
+                arguments.append(f"max_digits={column.precision}")
+                arguments.append(f"decimal_places={column.scale or 0}")
+            if column.unsigned and python_type in ("int", "float", "Decimal"):
+                arguments.append("ge=0")
+            description = column.comment
+            if column.name in references:
+                foreign_key = references[column.name]
+                target = foreign_key.ref_columns[foreign_key.columns.index(column.name)]
+                description = f"References {foreign_key.ref_table}.{target}"
+            if description:
+                arguments.append(f"description={_py(description)}")
+
+            prefix = f"    {attribute}: {annotation}"
+            if len(arguments) == 1 and arguments[0].startswith("default="):
+                lines.append(f"{prefix} = {arguments[0][len('default=') :]}")
+            elif arguments:
+                imports["pydantic"].add("Field")
+                lines.append(_call(f"{prefix} = Field", arguments))
+            else:
+                lines.append(prefix)
+        classes.append("\n".join(lines))
+    return _module(imports, ["pydantic"], classes)
+
+
+# --- SQLAlchemy ------------------------------------------------------------------
+
+
+def _sqlalchemy(tables: list[Table]) -> str:
+    models = _models(tables, "sqlalchemy")
+    _link_relationships(models)
+    imports: dict[str, set[str]] = {
+        "sqlalchemy": set(),
+        "sqlalchemy.orm": {"DeclarativeBase", "Mapped", "mapped_column"},
+    }
+    classes = [
+        'class Base(DeclarativeBase):\n    """Declarative base of the generated models."""'
+    ]
+    for model in models.values():
+        table = model.table
+        lines = [
+            f"class {model.class_name}(Base):",
+            f"    __tablename__ = {_py(table.name)}",
+        ]
+        single_column = {
+            foreign_key.columns[0]: foreign_key
+            for foreign_key in table.foreign_keys
+            if len(foreign_key.columns) == 1
+        }
+        composite = [fk for fk in table.foreign_keys if len(fk.columns) > 1]
+        if composite:
+            imports["sqlalchemy"].add("ForeignKeyConstraint")
+            constraints = [
+                _call(
+                    "ForeignKeyConstraint",
+                    [
+                        _py(fk.columns),
+                        _py([f"{fk.ref_table}.{c}" for c in fk.ref_columns]),
+                        *_actions(fk),
+                    ],
+                    indent=8,
+                ).strip()
+                for fk in composite
+            ]
+            lines.append(_call("    __table_args__ = ", constraints, tuple_=True))
+        lines.append("")
+
+        for column in table.columns:
+            python_type = _python_type(column)
+            if python_type.startswith("Literal"):
+                python_type = "str"
+            _add_import(imports, python_type)
+            annotation = f"{python_type} | None" if column.nullable else python_type
+
+            arguments = []
+            attribute = model.attributes[column.name]
+            if attribute != column.name:
+                arguments.append(_py(column.name))
+            arguments.append(_sqlalchemy_type(column, imports["sqlalchemy"]))
+            if column.name in single_column:
+                imports["sqlalchemy"].add("ForeignKey")
+                foreign_key = single_column[column.name]
+                target = f"{foreign_key.ref_table}.{foreign_key.ref_columns[0]}"
+                arguments.append(
+                    f"ForeignKey({', '.join([_py(target), *_actions(foreign_key)])})"
+                )
+            if column.primary_key:
+                arguments.append("primary_key=True")
+                if column.autoincrement:
+                    arguments.append("autoincrement=True")
+            if column.unique and not column.primary_key:
+                arguments.append("unique=True")
+            if column.default is not None:
+                imports["sqlalchemy"].add("text")
+                arguments.append(f"server_default=text({_py(column.default)})")
+            if column.on_update:
+                imports["sqlalchemy"].add("text")
+                arguments.append(f"server_onupdate=text({_py(column.on_update)})")
+            if column.comment:
+                arguments.append(f"comment={_py(column.comment)}")
+            lines.append(
+                _call(
+                    f"    {attribute}: Mapped[{annotation}] = mapped_column", arguments
+                )
+            )
+
+        if model.relationships:
+            imports["sqlalchemy.orm"].add("relationship")
+            lines.append("")
+        for relationship in model.relationships:
+            lines.append(_relationship(models, relationship))
+        classes.append("\n".join(lines))
+    return _module(imports, ["sqlalchemy", "sqlalchemy.orm"], classes)
+
+
+def _sqlalchemy_type(column: Column, names: set[str]) -> str:
+    python_type = _python_type(column)
+    sql_type = _TYPES.get(column.data_type, (None, "String"))[1]
+    if python_type == "bool":
+        sql_type = "Boolean"
+    names.add(sql_type)
+    if sql_type == "String" and column.length:
+        return f"String({column.length})"
+    if sql_type == "Numeric" and column.precision:
+        return f"Numeric({column.precision}, {column.scale or 0})"
+    if sql_type == "Enum" and column.values:
+        return f"Enum({', '.join(_py(value) for value in column.values)})"
+    return sql_type
+
+
+def _actions(foreign_key: ForeignKey) -> list[str]:
+    actions = []
+    if foreign_key.on_delete:
+        actions.append(f"ondelete={_py(foreign_key.on_delete.upper())}")
+    if foreign_key.on_update:
+        actions.append(f"onupdate={_py(foreign_key.on_update.upper())}")
+    return actions
+
+
+def _relationship(models: dict[str, _Model], relationship: _Relationship) -> str:
+    child = models[relationship.child_table]
+    columns = [child.attributes[column] for column in relationship.foreign_key.columns]
+    arguments = [f"back_populates={_py(relationship.back_populates)}"]
+    # disambiguate when a table has several foreign keys to the same table
+    ambiguous = (
+        sum(
+            fk.ref_table == relationship.foreign_key.ref_table
+            for fk in child.table.foreign_keys
+        )
+        > 1
+    )
+    if ambiguous or relationship.self_referential:
+        targets = ", ".join(f"{child.class_name}.{column}" for column in columns)
+        arguments.append(f'foreign_keys="[{targets}]"')
+    if relationship.self_referential and not relationship.collection:
+        parent = models[relationship.foreign_key.ref_table]
+        remote = ", ".join(
+            f"{parent.class_name}.{parent.attributes[column]}"
+            for column in relationship.foreign_key.ref_columns
+        )
+        arguments.append(f'remote_side="[{remote}]"')
+
+    if relationship.collection:
+        annotation = f'Mapped[list["{relationship.target}"]]'
+    else:
+        nullable = any(
+            child.table.column(column).nullable
+            for column in relationship.foreign_key.columns
+        )
+        target = f"{relationship.target} | None" if nullable else relationship.target
+        annotation = f'Mapped["{target}"]'
+    return _call(f"    {relationship.name}: {annotation} = relationship", arguments)
+
+
+# --- output ----------------------------------------------------------------------
+
+
+def _add_import(imports: dict[str, set[str]], name: str):
+    module = _PYTHON_IMPORTS.get(name)
+    if module:
+        imports.setdefault(module, set()).add(name)
+
+
+def _call(
+    prefix: str, arguments: list[str], indent: int = 4, tuple_: bool = False
+) -> str:
+    """Format a call (or a tuple) on one line, or one argument per line if too long."""
+    if tuple_:
+        one_line = f"{prefix}({', '.join(arguments)},)"
+    else:
+        one_line = f"{prefix}({', '.join(arguments)})"
+    if len(one_line) <= LINE_LENGTH:
+        return one_line
+    inner = " " * (indent + 4)
+    hugged = f"{inner}{', '.join(arguments)}"
+    if not tuple_ and len(hugged) <= LINE_LENGTH:
+        return f"{prefix}(\n{hugged}\n{' ' * indent})"
+    body = "".join(f"{inner}{argument},\n" for argument in arguments)
+    return f"{prefix}(\n{body}{' ' * indent})"
+
+
+def _import(module: str, names: set[str]) -> str:
+    if not names:
+        return ""
+    # constants, then classes, then functions, as isort orders them
+    names = sorted(
+        names, key=lambda name: (not name.isupper(), not name[0].isupper(), name)
+    )
+    line = f"from {module} import {', '.join(names)}"
+    if len(line) <= LINE_LENGTH:
+        return line
+    return _call(f"from {module} import ", names, indent=0)
+
+
+def _module(
+    imports: dict[str, set[str]], third_party: list[str], blocks: list[str]
+) -> str:
+    sections = []
+    for group in (
+        sorted(module for module in imports if module not in third_party),
+        third_party,
+    ):
+        lines = [_import(module, imports[module]) for module in group]
+        lines = [line for line in lines if line]
+        if lines:
+            sections.append("\n".join(lines))
+    return "\n" + "\n\n".join(sections) + "\n\n\n" + "\n\n\n".join(blocks) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("schema", help="JSON or DDL file with the GibsonAI schema")
+    parser.add_argument("--model-type", choices=MODEL_TYPES, default="pydantic")
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    with open(args.schema, encoding="utf-8") as f:
+        schema = f.read()
+    for path, content in generate_models(
+        schema, args.model_type, args.models_dir
+    ).items():
+        print(f"# {path}\n{content}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from io import BytesIO
+
+from agno.tools import Toolkit
+from agno.utils.log import logger
+from git import Repo
+from git.exc import GitCommandError
+from gitdb import IStream
+
+GITHUB_URL = os.getenv("GITHUB_URL", "https://github.com")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+# Bare clones the pull request commits are built in, one per repository
+GIT_CACHE_DIR = os.getenv("GIT_CACHE_DIR", "tmp/git")
+GIT_AUTHOR_NAME = os.getenv("GIT_AUTHOR_NAME", "Schema-to-PR Agent")
+GIT_AUTHOR_EMAIL = os.getenv(
+    "GIT_AUTHOR_EMAIL", "schema-to-pr-agent@users.noreply.github.com"
+)
+GITHUB_API_TIMEOUT = 30
+
+_repo_locks: dict[str, threading.Lock] = {}
+_repo_locks_lock = threading.Lock()
+
+
+def _repo_lock(path: str) -> threading.Lock:
+    with _repo_locks_lock:
+        return _repo_locks.setdefault(path, threading.Lock())
+
+
+class PullRequestBuilder:
+    """Opens a pull request that adds a set of files in a single commit.
+
+    The commit is built in a local bare clone with git plumbing: the base branch is
+    fetched (trees and commits only, no file contents), the files are written into
+    a temporary index on top of it, and the resulting commit is pushed once. No
+    working tree is checked out and the contents of the existing files are never
+    downloaded, so the cost does not depend on their size, and the number of
+    GitHub calls does not depend on the number of files: one fetch, one push and
+    one API request to open the pull request.
+    """
+
+    def __init__(
+        self,
+        owner: str,
+        repo: str,
+        token: str | None,
+        remote_url: str | None = None,
+        api_url: str = GITHUB_API_URL,
+        cache_dir: str = GIT_CACHE_DIR,
+    ):
+        self.owner = owner
+        self.repo = repo
+        self.token = token
+        self.remote_url = remote_url or f"{GITHUB_URL}/{owner}/{repo}.git"
+        self.api_url = api_url.rstrip("/")
+        self.path = os.path.join(cache_dir, owner, f"{repo}.git")
+
+    def create(
+        self,
+        files: dict[str, str],
+        branch: str,
+        title: str,
+        body: str = "",
+        base: str = "main",
+        commit_message: str | None = None,
+    ) -> dict[str, str]:
+        """Commit ``files`` ({path: content}) to a new branch and open the PR."""
+        if not files:
+            raise ValueError("No files to commit")
+        with _repo_lock(self.path):
+            repo = self._local_repo()
+            base_commit = self._fetch(repo, base)
+            commit = self._commit(repo, base_commit, files, commit_message or title)
+            self._git(repo, "push", "origin", f"{commit}:refs/heads/{branch}")
+        logger.info(f"Pushed {len(files)} files to {self.owner}/{self.repo}:{branch}")
+        pull_request = self._open_pull_request(branch, title, body, base)
+        return {
+            "url": pull_request["html_url"],
+            "number": pull_request["number"],
+            "branch": branch,
+            "commit": commit,
+        }
+
+    def _local_repo(self) -> Repo:
+        if os.path.isdir(self.path):
+            repo = Repo(self.path)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            repo = Repo.init(self.path, bare=True)
+        if "origin" in repo.remotes:
+            repo.remotes.origin.set_url(self.remote_url)
+        else:
+            repo.create_remote("origin", self.remote_url)
+        return repo
+
+    def _fetch(self, repo: Repo, base: str) -> str:
+        self._git(
+            repo,
+            "fetch",
+            "--filter=blob:none",
+            "--no-tags",
+            "origin",
+            f"+refs/heads/{base}:refs/remotes/origin/{base}",
+        )
+        return repo.commit(f"refs/remotes/origin/{base}").hexsha
+
+    def _commit(
+        self, repo: Repo, base_commit: str, files: dict[str, str], message: str
+    ) -> str:
+        with tempfile.TemporaryDirectory() as directory:
+            # a private index, so concurrent builds never share staging state
+            env = {
+                "GIT_INDEX_FILE": os.path.join(directory, "index"),
+                "GIT_AUTHOR_NAME": GIT_AUTHOR_NAME,
+                "GIT_AUTHOR_EMAIL": GIT_AUTHOR_EMAIL,
+                "GIT_COMMITTER_NAME": GIT_AUTHOR_NAME,
+                "GIT_COMMITTER_EMAIL": GIT_AUTHOR_EMAIL,
+            }
+            repo.git.read_tree(base_commit, env=env)
+            for path, content in sorted(files.items()):
+                data = content.encode("utf-8")
+                blob = repo.odb.store(IStream("blob", len(data), BytesIO(data)))
+                repo.git.update_index(
+                    "--add",
+                    "--cacheinfo",
+                    f"100644,{blob.hexsha.decode()},{path}",
+                    env=env,
+                )
+            # the base tree's blobs were never fetched; without --missing-ok git
+            # would download every one of them to check that they exist
+            tree = repo.git.write_tree("--missing-ok", env=env)
+            return repo.git.commit_tree(tree, "-p", base_commit, "-m", message, env=env)
+
+    def _git(self, repo: Repo, *args: str):
+        command = ["git"]
+        if self.token and self.remote_url.startswith("https://"):
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode())
+            command += [
+                "-c",
+                f"http.extraHeader=Authorization: Basic {credentials.decode()}",
+            ]
+        try:
+            repo.git.execute([*command, *args])
+        except GitCommandError as e:
+            # keep the token out of error messages that end up in the conversation
+            stderr = e.stderr.strip().removeprefix("stderr: ").strip("'")
+            message = f"git {args[0]} failed: {stderr or e}"
+            if self.token:
+                message = message.replace(self.token, "***")
+            raise RuntimeError(message) from None
+
+    def _open_pull_request(self, branch: str, title: str, body: str, base: str) -> dict:
+        request = urllib.request.Request(
+            f"{self.api_url}/repos/{self.owner}/{self.repo}/pulls",
+            data=json.dumps(
+                {"title": title, "head": branch, "base": base, "body": body}
+            ).encode(),
+            headers={
+                "Accept": "application/vnd.github+json",
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=GITHUB_API_TIMEOUT
+            ) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode(errors="replace")
+            raise RuntimeError(
+                f"Branch {branch} was pushed, but opening the pull request failed "
+                f"({e.code}): {detail}"
+            ) from None
+        except urllib.error.URLError as e:
+            raise RuntimeError(
+                f"Branch {branch} was pushed, but GitHub could not be reached: {e.reason}"
+            ) from None
+
+
+class PullRequestTools(Toolkit):
+    """Opens the pull request for the files generated in this run."""
+
+    def __init__(
+        self,
+        files: dict[str, str],
+        token: str | None,
+        repo_owner: str | None = None,
+        repo_name: str | None = None,
+        base_branch: str = "main",
+        **kwargs,
+    ):
+        # the generated files, shared with the tools that produce them
+        self.files = files
+        self.token = token
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.base_branch = base_branch
+        super().__init__(
+            name="pull_request_tools",
+            tools=[self.create_pull_request_with_files],
+            **kwargs,
+        )
+
+    async def create_pull_request_with_files(
+        self,
+        branch: str,
+        title: str,
+        body: str,
+        repo_owner: str = "",
+        repo_name: str = "",
+        base_branch: str = "",
+    ) -> str:
+        """Create a branch with all generated model files in one commit and open a pull request.
+
+        Call this once, after generate_models. It replaces create_branch,
+        create_or_update_file and create_pull_request for the generated files.
+
+        Args:
+            branch (str): Name of the new branch.
+            title (str): Pull request title, also used as the commit message.
+            body (str): Pull request description in markdown.
+            repo_owner (str): Repository owner. Defaults to the configured owner.
+            repo_name (str): Repository name. Defaults to the configured repository.
+            base_branch (str): Branch to merge into. Defaults to the configured base branch.
+
+        Returns:
+            str: JSON with the pull request URL and number, the branch and the commit.
+        """
+        owner = repo_owner or self.repo_owner
+        name = repo_name or self.repo_name
+        if not owner or not name:
+            return "Error: the repository owner and name are required"
+        if not self.files:
+            return "Error: no generated files yet, call generate_models first"
+
+        builder = PullRequestBuilder(owner, name, self.token)
+        try:
+            # git and the GitHub API block, keep them off the event loop
+            result = await asyncio.to_thread(
+                builder.create,
+                dict(self.files),
+                branch,
+                title,
+                body,
+                base_branch or self.base_branch,
+            )
+        except (RuntimeError, ValueError) as e:
+            return f"Error: {e}"
+        return json.dumps({**result, "files": sorted(self.files)})
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from agno.agent import RunResponse
+from agno.utils.log import logger
+
+from schema_cache import get_schema_cache
+
+REQUEST_INDEX_FILE = os.getenv("REQUEST_INDEX_FILE", "tmp/request_index.json")
+# How long an applied request answers its repeats
+REQUEST_INDEX_TTL_HOURS = float(os.getenv("REQUEST_INDEX_TTL_HOURS", "168"))
+REQUEST_INDEX_MAX_ENTRIES = 200  # per project
+
+# Words that do not change what a request asks for
+_FILLER_WORDS = {"a", "an", "the", "please", "pls", "kindly", "can", "you", "could"}
+
+# Tools whose result holds the URL of the pull request
+_PR_TOOLS = {"create_pull_request_with_files", "create_pull_request"}
+
+
+def normalize_request(request: str) -> str:
+    """Lower-cased words of a request, without punctuation and filler words."""
+    words = re.findall(r"[a-z0-9_]+", request.lower())
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def request_hash(normalized: str, context: dict[str, str]) -> str:
+    payload = json.dumps([normalized, context], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class IndexedRequest:
+    request: str  # normalized
+    request_hash: str
+    context: dict[str, str]  # model type, models dir, repository
+    schema_hash: str | None
+    pr_url: str | None
+    response: str
+    applied_at: float = field(default_factory=time.time)
+
+
+class RequestIndex:
+    """JSON file of the schema change requests applied to each GibsonAI project.
+
+    Entries look like::
+
+        {"projects": {"<project id>": [{"request": ..., "request_hash": ...,
+                                         "schema_hash": ..., "pr_url": ..., ...}]}}
+
+    A request whose normalized text and context hash to those of a request
+    applied to the same project within ``REQUEST_INDEX_TTL_HOURS``, against the
+    schema that is current now, is answered from the index without starting the
+    agent.
+    """
+
+    def __init__(self, path: str = REQUEST_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"projects": {}}
+
+    def _write(self, data: dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # write to a temporary file first so readers never see a torn file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def find(
+        self,
+        project_id: str,
+        request: str,
+        context: dict[str, str],
+        read_schema_hash: Callable[[str], str | None] | None = None,
+    ) -> IndexedRequest | None:
+        """The applied request that ``request`` repeats, if any.
+
+        The schema must still be the one the request produced. When the schema
+        cache has no fresh copy, ``read_schema_hash`` is called to read it;
+        without it, or if the read fails, the request counts as new.
+        """
+        normalized = normalize_request(request)
+        wanted_hash = request_hash(normalized, context)
+        cutoff = time.time() - REQUEST_INDEX_TTL_HOURS * 3600
+        entries = self._read().get("projects", {}).get(project_id, [])
+        entry = next(
+            (
+                IndexedRequest(**data)
+                for data in reversed(entries)
+                if data["request_hash"] == wanted_hash and data["applied_at"] >= cutoff
+            ),
+            None,
+        )
+        if entry is None:
+            return None
+        # a schema that moved on since (e.g. the change was reverted) or that
+        # cannot be confirmed means the request has to run again
+        current = get_schema_cache().get(project_id)
+        if current is not None:
+            schema_hash = current[0]
+        elif read_schema_hash is not None:
+            schema_hash = read_schema_hash(project_id)
+        else:
+            schema_hash = None
+        if schema_hash is None or entry.schema_hash != schema_hash:
+            return None
+        logger.info(
+            f"Request for {project_id} repeats one applied at "
+            f"{time.ctime(entry.applied_at)}"
+        )
+        return entry
+
+    def add(
+        self,
+        project_id: str,
+        request: str,
+        context: dict[str, str],
+        response: RunResponse,
+    ) -> IndexedRequest | None:
+        """Record a request the agent applied; only runs that opened a PR count."""
+        pr_url = pull_request_url(response)
+        if pr_url is None:
+            return None
+        current = get_schema_cache().get(project_id)
+        normalized = normalize_request(request)
+        entry = IndexedRequest(
+            request=normalized,
+            request_hash=request_hash(normalized, context),
+            context=context,
+            schema_hash=current[0] if current else None,
+            pr_url=pr_url,
+            response=response.content if isinstance(response.content, str) else "",
+        )
+        with self._lock:
+            data = self._read()
+            entries = data.setdefault("projects", {}).setdefault(project_id, [])
+            entries[:] = [
+                e for e in entries if e["request_hash"] != entry.request_hash
+            ][-(REQUEST_INDEX_MAX_ENTRIES - 1) :]
+            entries.append(asdict(entry))
+            self._write(data)
+        return entry
+
+
+def pull_request_url(response: RunResponse) -> str | None:
+    """URL of the last pull request the run opened."""
+    url = None
+    for tool in response.tools or []:
+        if tool.tool_name not in _PR_TOOLS or tool.tool_call_error:
+            continue
+        try:
+            result = json.loads(tool.result)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(result, dict):
+            url = result.get("url") or result.get("html_url") or url
+    return url
+
+
+_index: RequestIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_request_index() -> RequestIndex:
+    """Return the process-wide request index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RequestIndex()
+        return _index
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from agno.utils.log import logger
+
+from gibson_schema import SchemaParseError, parse_schema
+from schema_diff import schema_context
+
+# Upper bound on how long a schema is served from the cache. Changes made through
+# the agent invalidate it right away; this only covers edits made elsewhere.
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+SCHEMA_CACHE_MAX_ENTRIES = 32
+
+# GibsonAI MCP tools that read a schema, and the tools that change it
+SCHEMA_READ_TOOLS = {"get_project_schema", "get_deployed_schema"}
+SCHEMA_WRITE_TOOLS = {"submit_data_modeling_request", "deploy_project"}
+
+
+@dataclass
+class _Version:
+    hash: str
+    fetched_at: float
+
+
+class SchemaCache:
+    """Process-wide cache of GibsonAI schemas.
+
+    Each project (and deployed database) points at the hash of its current schema,
+    and the schemas themselves are stored by hash, so two reads of an unchanged
+    schema resolve to the same entry. The version from before the last change is
+    remembered so the change can be shown as a diff.
+    """
+
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._versions: dict[tuple[str, str | None], _Version] = {}
+        self._previous: dict[tuple[str, str | None], str] = {}
+        self._schemas: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, project_id: str, database: str | None = None
+    ) -> tuple[str, str] | None:
+        """Return ``(hash, schema)`` if a fresh copy is cached."""
+        with self._lock:
+            version = self._versions.get((project_id, database))
+            if version is None or time.monotonic() - version.fetched_at > self.ttl:
+                return None
+            schema = self._schemas.get(version.hash)
+            if schema is None:
+                return None
+            self._schemas.move_to_end(version.hash)
+            return version.hash, schema
+
+    def put(self, project_id: str, database: str | None, schema: str) -> str:
+        schema_hash = hashlib.sha256(schema.encode()).hexdigest()
+        with self._lock:
+            self._versions[(project_id, database)] = _Version(
+                schema_hash, time.monotonic()
+            )
+            self._schemas[schema_hash] = schema
+            self._schemas.move_to_end(schema_hash)
+            while len(self._schemas) > SCHEMA_CACHE_MAX_ENTRIES:
+                self._schemas.popitem(last=False)
+        return schema_hash
+
+    def schema(self, schema_hash: str) -> str | None:
+        with self._lock:
+            return self._schemas.get(schema_hash)
+
+    def previous(self, project_id: str, database: str | None = None) -> str | None:
+        """Hash of the schema from before the last change, if it is still cached."""
+        with self._lock:
+            return self._previous.get((project_id, database))
+
+    def invalidate(self, project_id: str):
+        """Forget the current schema versions of a project after a change."""
+        with self._lock:
+            for key in [key for key in self._versions if key[0] == project_id]:
+                self._previous[key] = self._versions.pop(key).hash
+
+
+_cache: SchemaCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """Return the process-wide schema cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SchemaCache()
+        return _cache
+
+
+class SchemaCacheHook:
+    """Serves GibsonAI schema reads from the ``SchemaCache`` during one agent run.
+
+    ``tool_hook`` is passed to the agent as a tool hook. Schema reads are answered
+    from the cache when possible, and a successful write invalidates the project.
+    The model gets a compact view of the schema rather than the raw payload: the
+    diff since a change made earlier in this run with the affected tables in full,
+    and a one-line summary of the rest (see ``schema_diff``). A schema the model has already seen
+    in this run is not repeated, the model gets a short note pointing to the
+    earlier result instead. Every hit, miss and invalidation is recorded in
+    ``trace``.
+    """
+
+    def __init__(self, cache: SchemaCache | None = None):
+        self.cache = cache or get_schema_cache()
+        self.trace: list[dict[str, Any]] = []
+        self._returned: set[str] = set()
+        self._invalidated: set[str] = set()
+
+    async def fetch(
+        self,
+        tool: str,
+        project_id: str,
+        database: str | None,
+        read: Callable[[], Awaitable[str]],
+    ) -> tuple[str | None, str]:
+        """Return ``(hash, schema)``, calling ``read`` on a miss.
+
+        The hash is ``None`` when ``read`` returned an error, which is not cached.
+        """
+        cached = self.cache.get(project_id, database)
+        if cached is not None:
+            self._record("hit", tool, project_id, cached[0])
+            return cached
+        schema = await read()
+        if _is_error(schema):
+            return None, schema
+        schema_hash = self.cache.put(project_id, database, schema)
+        self._record("miss", tool, project_id, schema_hash)
+        return schema_hash, schema
+
+    async def tool_hook(
+        self, function_name: str, function_call: Callable, arguments: dict[str, Any]
+    ) -> Any:
+        project_id = arguments.get("uuid")
+        if function_name in SCHEMA_READ_TOOLS and project_id:
+            schema_hash, schema = await self.fetch(
+                function_name,
+                project_id,
+                arguments.get("database"),
+                lambda: function_call(**arguments),
+            )
+            if schema_hash is None:
+                return schema
+            if schema_hash in self._returned:
+                return (
+                    f"The schema has not changed since it was returned earlier in this "
+                    f"run (schema hash {schema_hash[:12]}). Use that result."
+                )
+            self._returned.add(schema_hash)
+            return self._context(
+                project_id, arguments.get("database"), schema_hash, schema
+            )
+
+        result = await function_call(**arguments)
+        if function_name in SCHEMA_WRITE_TOOLS and project_id and not _is_error(result):
+            self.cache.invalidate(project_id)
+            self._invalidated.add(project_id)
+            self._record("invalidate", function_name, project_id)
+        return result
+
+    def _context(
+        self, project_id: str, database: str | None, schema_hash: str, schema: str
+    ) -> str:
+        try:
+            tables = parse_schema(schema)
+        except SchemaParseError:
+            return schema  # not a format we understand, pass it through as is
+        before = None
+        # only a change made in this run is news to the model; the version before
+        # an older change would show the same diff on every later read
+        previous = None
+        if project_id in self._invalidated:
+            previous = self.cache.previous(project_id, database)
+        if previous is not None and previous != schema_hash:
+            old_schema = self.cache.schema(previous)
+            if old_schema is not None:
+                try:
+                    before = parse_schema(old_schema)
+                except SchemaParseError:
+                    pass
+        return schema_context(tables, before, schema_hash)
+
+    def summary(self) -> dict[str, int]:
+        counts = {"hits": 0, "misses": 0, "invalidations": 0}
+        key = {"hit": "hits", "miss": "misses", "invalidate": "invalidations"}
+        for event in self.trace:
+            counts[key[event["event"]]] += 1
+        return counts
+
+    def _record(
+        self, event: str, tool: str, project_id: str, schema_hash: str | None = None
+    ):
+        self.trace.append(
+            {
+                "event": event,
+                "tool": tool,
+                "project_id": project_id,
+                "schema_hash": schema_hash[:12] if schema_hash else None,
+                "at": time.time(),
+            }
+        )
+        logger.info(
+            f"Schema cache {event}: {tool} for {project_id}"
+            + (f" ({schema_hash[:12]})" if schema_hash else "")
+        )
+
+
+def _is_error(result: Any) -> bool:
+    """Whether a GibsonAI MCP result is an error rather than data."""
+    if not isinstance(result, str):
+        return True
+    if result.startswith("Error"):
+        return True  # agno reports failed MCP calls as "Error: ..."
+    try:
+        payload = json.loads(result)
+    except ValueError:
+        return False
+    # the GibsonAI MCP server returns API errors as {"status_code": ..., "error": ...}
+    return isinstance(payload, dict) and "status_code" in payload and "error" in payload
@@ -0,0 +1,178 @@
+"""Compact views of a GibsonAI schema for the model.
+
+Instead of the whole schema, the model gets the tables a change touched (and
+their foreign key neighbours) in full, and a one-line summary of every other
+table. The size of that context depends on the change, not on the schema.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from gibson_schema import Column, ForeignKey, Table
+
+# Above this many unaffected tables, only their names are listed
+SCHEMA_SUMMARY_MAX_TABLES = int(os.getenv("SCHEMA_SUMMARY_MAX_TABLES", "100"))
+
+
+@dataclass
+class SchemaDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: dict[str, list[str]] = field(default_factory=dict)  # table -> changes
+
+    @property
+    def affected(self) -> list[str]:
+        return [*self.added, *self.changed]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_schemas(before: list[Table], after: list[Table]) -> SchemaDiff:
+    old = {table.name: table for table in before}
+    new = {table.name: table for table in after}
+    diff = SchemaDiff(
+        added=[name for name in new if name not in old],
+        removed=[name for name in old if name not in new],
+    )
+    for name, table in new.items():
+        if name in old:
+            changes = _table_changes(old[name], table)
+            if changes:
+                diff.changed[name] = changes
+    return diff
+
+
+def _table_changes(before: Table, after: Table) -> list[str]:
+    old = {column.name: column for column in before.columns}
+    new = {column.name: column for column in after.columns}
+    changes = []
+    for name, column in new.items():
+        if name not in old:
+            changes.append(f"added column {describe_column(column)}")
+        elif describe_column(old[name]) != describe_column(column):
+            changes.append(
+                f"changed column {describe_column(old[name])} -> {describe_column(column)}"
+            )
+    for name in old:
+        if name not in new:
+            changes.append(f"removed column {name}")
+    old_keys = {describe_foreign_key(fk) for fk in before.foreign_keys}
+    new_keys = {describe_foreign_key(fk) for fk in after.foreign_keys}
+    changes += [f"added foreign key {key}" for key in sorted(new_keys - old_keys)]
+    changes += [f"removed foreign key {key}" for key in sorted(old_keys - new_keys)]
+    return changes
+
+
+def describe_column(column: Column) -> str:
+    data_type = column.data_type
+    if column.values:
+        data_type += "(" + ",".join(repr(value) for value in column.values) + ")"
+    elif column.precision:
+        data_type += f"({column.precision},{column.scale or 0})"
+    elif column.length:
+        data_type += f"({column.length})"
+    parts = [column.name, data_type]
+    if column.unsigned:
+        parts.append("unsigned")
+    if column.primary_key:
+        parts.append("pk")
+    if column.autoincrement:
+        parts.append("auto_increment")
+    if not column.nullable and not column.primary_key:
+        parts.append("not null")
+    if column.unique:
+        parts.append("unique")
+    if column.default is not None:
+        parts.append(f"default {column.default}")
+    if column.on_update:
+        parts.append(f"on update {column.on_update}")
+    return " ".join(parts)
+
+
+def describe_foreign_key(foreign_key: ForeignKey) -> str:
+    description = (
+        f"({', '.join(foreign_key.columns)}) -> "
+        f"{foreign_key.ref_table}({', '.join(foreign_key.ref_columns)})"
+    )
+    if foreign_key.on_delete:
+        description += f" on delete {foreign_key.on_delete.lower()}"
+    if foreign_key.on_update:
+        description += f" on update {foreign_key.on_update.lower()}"
+    return description
+
+
+def describe_table(table: Table) -> str:
+    """Every column and foreign key of a table, one per line."""
+    lines = [f"{table.name}:"]
+    lines += [f"  {describe_column(column)}" for column in table.columns]
+    lines += [f"  fk {describe_foreign_key(fk)}" for fk in table.foreign_keys]
+    return "\n".join(lines)
+
+
+def summarize_table(table: Table) -> str:
+    """One line per table: its name, column count and the tables it references."""
+    summary = f"{table.name} ({len(table.columns)} columns)"
+    references = sorted({fk.ref_table for fk in table.foreign_keys})
+    if references:
+        summary += f" -> {', '.join(references)}"
+    return summary
+
+
+def neighbours(tables: list[Table], names: list[str]) -> list[str]:
+    """Tables linked to ``names`` by a foreign key in either direction."""
+    wanted = set(names)
+    found = []
+    for table in tables:
+        if table.name in wanted:
+            found += [fk.ref_table for fk in table.foreign_keys]
+        elif any(fk.ref_table in wanted for fk in table.foreign_keys):
+            found.append(table.name)
+    by_name = {table.name for table in tables}
+    return [
+        name for name in dict.fromkeys(found) if name in by_name and name not in wanted
+    ]
+
+
+def schema_context(
+    tables: list[Table], before: list[Table] | None = None, schema_hash: str = ""
+) -> str:
+    """What the model sees of a schema: the change, if any, and a compact summary.
+
+    With ``before``, the tables the change touched and their foreign key
+    neighbours are described in full. Every other table gets a one-line summary,
+    or just its name when there are more than ``SCHEMA_SUMMARY_MAX_TABLES``.
+    """
+    by_name = {table.name: table for table in tables}
+    header = f"Schema with {len(tables)} tables"
+    if schema_hash:
+        header += f" (schema hash {schema_hash[:12]})"
+    sections = [header + "."]
+
+    detailed: list[str] = []
+    diff = diff_schemas(before, tables) if before is not None else None
+    if diff:
+        lines = ["Changes:"]
+        lines += [f"- added table {name}" for name in diff.added]
+        lines += [f"- removed table {name}" for name in diff.removed]
+        for name, changes in diff.changed.items():
+            lines += [f"- {name}: {change}" for change in changes]
+        sections.append("\n".join(lines))
+        detailed = diff.affected + neighbours(tables, diff.affected)
+        sections.append(
+            "Affected tables and their foreign key neighbours:\n"
+            + "\n".join(describe_table(by_name[name]) for name in detailed)
+        )
+    elif diff is not None:
+        sections.append("No changes since the previous version.")
+
+    others = [table for table in tables if table.name not in detailed]
+    if others:
+        title = "Other tables" if detailed else "Tables"
+        if len(others) > SCHEMA_SUMMARY_MAX_TABLES:
+            body = ", ".join(table.name for table in others)
+        else:
+            body = "\n".join(summarize_table(table) for table in others)
+        sections.append(f"{title}:\n{body}")
+    sections.append("Call get_table_details for the full columns of any table.")
+    return "\n\n".join(sections)
@@ -0,0 +1,115 @@
+import json
+
+from agno.tools import Toolkit
+from agno.tools.mcp import MCPTools
+from agno.utils.log import logger
+from mcp.types import TextContent
+
+from gibson_schema import SchemaParseError, Table, parse_schema
+from model_generator import MODEL_TYPES, generate_models
+from schema_cache import SchemaCacheHook
+from schema_diff import describe_table
+
+
+async def fetch_project_schema(gibson: MCPTools, project_id: str) -> str:
+    """Fetch the current schema of a GibsonAI project over the pooled MCP session."""
+    result = await gibson.session.call_tool("get_project_schema", {"uuid": project_id})
+    text = "\n".join(
+        content.text for content in result.content if isinstance(content, TextContent)
+    )
+    if result.isError:
+        return f"Error from GibsonAI: {text}"
+    return text
+
+
+class SchemaTools(Toolkit):
+    """Tools that work on the GibsonAI schema locally instead of through the LLM."""
+
+    def __init__(
+        self, gibson: MCPTools, schema_cache: SchemaCacheHook | None = None, **kwargs
+    ):
+        self.gibson = gibson
+        self.schema_cache = schema_cache or SchemaCacheHook()
+        # files generated during this run, {path: content}
+        self.generated_files: dict[str, str] = {}
+        super().__init__(
+            name="schema_tools",
+            tools=[self.generate_models, self.get_table_details],
+            **kwargs,
+        )
+
+    async def _tables(self, project_id: str) -> list[Table] | str:
+        """The tables of the project's current schema, or an error message."""
+        schema_hash, schema = await self.schema_cache.fetch(
+            "get_project_schema",
+            project_id,
+            None,
+            lambda: fetch_project_schema(self.gibson, project_id),
+        )
+        if schema_hash is None:
+            return schema  # the error reported by GibsonAI
+        try:
+            return parse_schema(schema)
+        except SchemaParseError as e:
+            return f"Error: {e}"
+
+    async def generate_models(
+        self, project_id: str, model_type: str = "Pydantic", models_dir: str = "models"
+    ) -> str:
+        """Generate the Python model files for the current schema of a GibsonAI project.
+
+        The schema is fetched from GibsonAI and the files are generated locally, so do
+        not write model code yourself. The files are kept for
+        create_pull_request_with_files, which commits them as they are.
+
+        Args:
+            project_id (str): The GibsonAI project ID.
+            model_type (str): "Pydantic", "SQLAlchemy" or "Both".
+            models_dir (str): Directory of the model files in the repository.
+
+        Returns:
+            str: JSON with the tables and the generated files as {path: size in bytes}.
+        """
+        if model_type.lower() not in MODEL_TYPES:
+            return f"Error: model_type must be one of Pydantic, SQLAlchemy or Both, not {model_type!r}"
+        tables = await self._tables(project_id)
+        if isinstance(tables, str):
+            return tables
+
+        files = generate_models(
+            tables, model_type, models_dir, source=f"GibsonAI project {project_id}"
+        )
+        self.generated_files.update(files)
+        logger.info(
+            f"Generated {', '.join(files)} for {len(tables)} tables of {project_id}"
+        )
+        return json.dumps(
+            {
+                "tables": [table.name for table in tables],
+                "files": {path: len(content) for path, content in files.items()},
+            },
+            indent=2,
+        )
+
+    async def get_table_details(self, project_id: str, tables: list[str]) -> str:
+        """Get every column and foreign key of some tables of a GibsonAI project.
+
+        Use this instead of reading the whole schema when you need the exact
+        definition of a few tables.
+
+        Args:
+            project_id (str): The GibsonAI project ID.
+            tables (list[str]): Names of the tables to describe.
+
+        Returns:
+            str: One block per table with its columns and foreign keys.
+        """
+        schema_tables = await self._tables(project_id)
+        if isinstance(schema_tables, str):
+            return schema_tables
+        by_name = {table.name: table for table in schema_tables}
+        blocks = [describe_table(by_name[name]) for name in tables if name in by_name]
+        missing = [name for name in tables if name not in by_name]
+        if missing:
+            blocks.append(f"Unknown tables: {', '.join(missing)}")
+        return "\n\n".join(blocks)
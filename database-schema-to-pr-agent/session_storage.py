@@ -0,0 +1,175 @@
+"""Bounded session storage for the agent.
+
+Sessions are stored in SQLite through agno's ``SqliteStorage``, with three
+additions that keep both the prompt and the database from growing with use:
+
+- one storage and engine per process, in WAL mode, instead of one per request
+- runs are compacted when they are saved: tool outputs (schemas, generated files)
+  are truncated, the history copies agno stores with every run are dropped, and
+  only the last ``SESSION_MAX_RUNS`` runs of a session are kept
+- sessions idle for longer than ``SESSION_RETENTION_DAYS`` are deleted and the
+  file vacuumed, at most once every ``SESSION_PRUNE_INTERVAL_HOURS``
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from agno.storage.session import Session
+from agno.storage.sqlite import SqliteStorage
+from agno.utils.log import logger
+from sqlalchemy import delete, event, text
+
+SESSION_DB_FILE = os.getenv("SESSION_DB_FILE", "tmp/schema_pr_agent.db")
+SESSION_TABLE = "schema_pr_agent_sessions"
+# Tool outputs longer than this are cut before the run is stored. Only the start
+# is kept, which is enough for the model to know what the call returned.
+SESSION_TOOL_OUTPUT_MAX_CHARS = int(os.getenv("SESSION_TOOL_OUTPUT_MAX_CHARS", "2000"))
+# Runs kept per session; the agent replays the last 3 as history
+SESSION_MAX_RUNS = int(os.getenv("SESSION_MAX_RUNS", "10"))
+SESSION_RETENTION_DAYS = float(os.getenv("SESSION_RETENTION_DAYS", "30"))
+SESSION_PRUNE_INTERVAL_HOURS = float(os.getenv("SESSION_PRUNE_INTERVAL_HOURS", "24"))
+
+
+def _configure_connection(connection, _):
+    # WAL lets reads go on while a run is being saved
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+
+def _truncate(value: Any, limit: int) -> Any:
+    if not isinstance(value, str) or len(value) <= limit:
+        return value
+    return f"{value[:limit]}\n[... {len(value) - limit} characters of tool output truncated]"
+
+
+def _compact_message(message: dict[str, Any], limit: int) -> dict[str, Any]:
+    """A message with the tool results it carries truncated.
+
+    OpenAI-style models store each result as a ``role="tool"`` message; Claude
+    stores them as one user message with a list of ``tool_result`` blocks.
+    """
+    if message.get("role") == "tool":
+        return {**message, "content": _truncate(message.get("content"), limit)}
+    content = message.get("content")
+    if message.get("role") != "user" or not isinstance(content, list):
+        return message
+    return {
+        **message,
+        "content": [
+            {**block, "content": _truncate(block.get("content"), limit)}
+            if isinstance(block, dict) and block.get("type") == "tool_result"
+            else block
+            for block in content
+        ],
+    }
+
+
+def compact_run(
+    run: dict[str, Any], limit: int = SESSION_TOOL_OUTPUT_MAX_CHARS
+) -> dict:
+    """A stored run without the parts that only inflate later prompts."""
+    run = {key: value for key, value in run.items() if key != "events"}
+    if run.get("messages"):
+        run["messages"] = [
+            _compact_message(message, limit)
+            for message in run["messages"]
+            # copies of earlier runs, which agno never replays again
+            if not message.get("from_history")
+        ]
+    if run.get("tools"):
+        run["tools"] = [
+            {**tool, "result": _truncate(tool.get("result"), limit)}
+            for tool in run["tools"]
+        ]
+    return run
+
+
+def compact_memory(
+    memory: dict[str, Any] | None, max_runs: int = SESSION_MAX_RUNS
+) -> dict[str, Any] | None:
+    if not memory or not memory.get("runs"):
+        return memory
+    return {**memory, "runs": [compact_run(run) for run in memory["runs"][-max_runs:]]}
+
+
+class CompactingSqliteStorage(SqliteStorage):
+    """``SqliteStorage`` that compacts runs on write and prunes stale sessions.
+
+    Pruning runs on a background thread after a write, at most once every
+    ``prune_interval`` seconds, so it never delays a request.
+    """
+
+    def __init__(
+        self,
+        table_name: str = SESSION_TABLE,
+        db_file: str = SESSION_DB_FILE,
+        retention_days: float = SESSION_RETENTION_DAYS,
+        prune_interval: float = SESSION_PRUNE_INTERVAL_HOURS * 3600,
+        **kwargs,
+    ):
+        path = Path(db_file).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(table_name=table_name, db_url=f"sqlite:///{path}", **kwargs)
+        event.listen(self.db_engine, "connect", _configure_connection)
+        # drop the connection opened while inspecting, so every connection is set up
+        self.db_engine.dispose()
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def upsert(self, session: Session, create_and_retry: bool = True) -> Session | None:
+        session.memory = compact_memory(session.memory)
+        result = super().upsert(session, create_and_retry)
+        self._schedule_prune()
+        return result
+
+    def _schedule_prune(self):
+        with self._prune_lock:
+            if time.monotonic() - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = time.monotonic()
+        threading.Thread(target=self.prune, name="session-prune", daemon=True).start()
+
+    def prune(self) -> int:
+        """Delete sessions idle for longer than the retention and reclaim the space."""
+        cutoff = int(time.time() - self.retention_days * 86400)
+        try:
+            with self.SqlSession() as sess, sess.begin():
+                updated = self.table.c.updated_at
+                deleted = sess.execute(
+                    delete(self.table).where(
+                        (updated < cutoff)
+                        | (updated.is_(None) & (self.table.c.created_at < cutoff))
+                    )
+                ).rowcount
+            with self.db_engine.connect() as connection:
+                # VACUUM cannot run inside a transaction
+                connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+                if deleted:
+                    connection.execute(text("VACUUM"))
+                connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        except Exception as e:
+            logger.warning(f"Pruning sessions failed: {e}")
+            return 0
+        logger.info(f"Pruned {deleted} sessions older than {self.retention_days} days")
+        return deleted
+
+
+_storage: CompactingSqliteStorage | None = None
+_storage_lock = threading.Lock()
+
+
+def get_session_storage() -> CompactingSqliteStorage:
+    """Return the process-wide session storage."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = CompactingSqliteStorage()
+        return _storage
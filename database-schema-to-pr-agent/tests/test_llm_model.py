@@ -0,0 +1,279 @@
+"""RoutedModel against fake provider models: routing, fallbacks, latency budget."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+from agno.exceptions import ModelProviderError
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+import llm_model
+from llm_model import RoutedModel, get_model_stats, route_step
+
+
+@dataclass
+class FakeModel(Model):
+    """Answers with ``chunks`` after ``delay`` seconds, or fails with ``status``.
+
+    ``fail_after`` makes a stream fail once that many chunks were sent.
+    """
+
+    id: str = "fake"
+    name: str = "Fake"
+    provider: str = "Fake"
+    chunks: list[str] = field(default_factory=lambda: ["Hello", " world"])
+    delay: float = 0.0
+    status: int | None = None
+    fail_after: int | None = None
+    calls: int = 0
+
+    def _fail(self):
+        raise ModelProviderError("fake failure", status_code=self.status)
+
+    async def ainvoke(self, messages, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.status:
+            self._fail()
+        return "".join(self.chunks)
+
+    async def ainvoke_stream(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for index, chunk in enumerate(self.chunks):
+            if self.status and index == (self.fail_after or 0):
+                self._fail()
+            yield chunk
+
+    def invoke(self, messages, **kwargs) -> str:
+        self.calls += 1
+        if self.status:
+            self._fail()
+        return "".join(self.chunks)
+
+    def invoke_stream(self, messages, **kwargs):
+        self.calls += 1
+        yield from self.chunks
+
+    def parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return ModelResponse(role="assistant", content=f"{self.id}: {response}")
+
+    def parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return ModelResponse(role="assistant", content=response)
+
+
+def user(content: str = "Add a phone column to users") -> list[Message]:
+    return [Message(role="user", content=content)]
+
+
+def after(*tools: str) -> list[Message]:
+    messages = [*user(), Message(role="assistant", content="")]
+    for tool in tools:
+        messages.append(Message(role="tool", tool_name=tool, content="{}"))
+    return messages
+
+
+def after_claude(*tools: str) -> list[Message]:
+    """The same turn as ``after``, in the format agno's Claude model sends."""
+    calls = [
+        {"id": f"toolu_{n}", "type": "function", "function": {"name": tool}}
+        for n, tool in enumerate(tools)
+    ]
+    results = [
+        {"type": "tool_result", "tool_use_id": call["id"], "content": "{}"}
+        for call in calls
+    ]
+    return [
+        *user(),
+        Message(role="assistant", content="", tool_calls=calls),
+        Message(role="user", content=results),
+    ]
+
+
+def router(**tiers: list[FakeModel]) -> RoutedModel:
+    return RoutedModel(tiers=tiers, latency_budget=0.2)
+
+
+def collect(model: RoutedModel, messages: list[Message]) -> list[tuple]:
+    async def run():
+        return [item async for item in model.ainvoke_stream(messages)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    ("messages", "tier"),
+    [
+        (user(), "strong"),
+        (after("get_projects"), "fast"),
+        (after("generate_models"), "fast"),
+        (after("create_pull_request_with_files"), "fast"),
+        (after("submit_data_modeling_request"), "strong"),
+        (after("get_project_schema"), "strong"),
+        # parallel calls go to the fast model only when all of them are cheap
+        (after("get_projects", "get_project_schema"), "strong"),
+        (after("get_projects", "list_branches"), "fast"),
+    ],
+)
+def test_route_step(messages, tier):
+    assert route_step(messages)[0] == tier
+
+
+@pytest.mark.parametrize(
+    ("tools", "tier"),
+    [
+        (("get_projects",), "fast"),
+        (("get_projects", "list_branches"), "fast"),
+        (("get_projects", "get_project_schema"), "strong"),
+        (("submit_data_modeling_request",), "strong"),
+    ],
+)
+def test_route_step_with_claude_tool_results(tools, tier):
+    assert route_step(after_claude(*tools)) == (tier, f"after {', '.join(tools)}")
+
+
+def test_claude_tool_results_use_the_fast_tier():
+    strong, fast = FakeModel(id="strong-claude"), FakeModel(id="fast-claude")
+    model = router(strong=[strong], fast=[fast, strong])
+    picked, _ = asyncio.run(model.ainvoke(after_claude("get_projects")))
+    assert picked is fast
+    # a plain user message after the results is a new request
+    turn = [*after_claude("get_projects"), *user("Also add an index")]
+    picked, _ = asyncio.run(model.ainvoke(turn))
+    assert picked is strong
+
+
+def test_tier_selection():
+    strong, fast = FakeModel(id="strong"), FakeModel(id="fast")
+    model = router(strong=[strong], fast=[fast, strong])
+
+    picked, response = asyncio.run(model.ainvoke(user()))
+    assert picked is strong and response == "Hello world"
+    picked, _ = asyncio.run(model.ainvoke(after("get_projects")))
+    assert picked is fast
+    assert (strong.calls, fast.calls) == (1, 1)
+
+
+def test_fast_steps_use_the_strong_model_without_a_fast_tier():
+    strong = FakeModel(id="strong")
+    picked, _ = asyncio.run(router(strong=[strong]).ainvoke(after("get_projects")))
+    assert picked is strong
+
+
+def test_rate_limited_model_falls_back():
+    limited = FakeModel(id="limited-429", status=429)
+    backup = FakeModel(id="backup-429")
+    model = router(strong=[limited, backup])
+
+    picked, response = asyncio.run(model.ainvoke(user()))
+    assert picked is backup and response == "Hello world"
+    assert limited.calls == 1
+    assert get_model_stats()["limited-429"]["fallbacks"] == 1
+    assert get_model_stats()["backup-429"]["calls"] == 1
+
+    # the same fallback when streaming
+    chunks = collect(model, user())
+    assert [chunk for _, chunk in chunks] == ["Hello", " world"]
+    assert all(picked is backup for picked, _ in chunks)
+
+
+def test_other_provider_errors_are_raised():
+    broken = FakeModel(id="broken", status=400)
+    backup = FakeModel(id="backup-400")
+    with pytest.raises(ModelProviderError):
+        asyncio.run(router(strong=[broken, backup]).ainvoke(user()))
+    assert backup.calls == 0
+
+
+def test_last_error_is_raised_when_every_model_fails():
+    models = [FakeModel(id=f"down-{n}", status=503) for n in range(2)]
+    with pytest.raises(ModelProviderError):
+        asyncio.run(router(strong=models).ainvoke(user()))
+    assert [model.calls for model in models] == [1, 1]
+
+
+def test_slow_model_falls_back():
+    slow = FakeModel(id="slow", delay=1.0)
+    quick = FakeModel(id="quick")
+    model = router(strong=[slow, quick])
+
+    picked, _ = asyncio.run(model.ainvoke(user()))
+    assert picked is quick
+    assert get_model_stats()["slow"]["fallbacks"] == 1
+
+    # streaming: the budget covers the wait for the first chunk
+    chunks = collect(model, user())
+    assert {picked.id for picked, _ in chunks} == {"quick"}
+
+
+def test_no_switch_after_the_first_streamed_chunk():
+    # fails after its first chunk; the reply has started, so no other model
+    # may take over and repeat it
+    flaky = FakeModel(id="flaky", status=429, fail_after=1)
+    backup = FakeModel(id="backup-stream")
+    model = router(strong=[flaky, backup])
+
+    received = []
+
+    async def run():
+        async for picked, chunk in model.ainvoke_stream(user()):
+            received.append((picked.id, chunk))
+
+    with pytest.raises(ModelProviderError):
+        asyncio.run(run())
+    assert received == [("flaky", "Hello")]
+    assert backup.calls == 0
+
+
+def test_slow_chunks_after_the_first_do_not_switch():
+    @dataclass
+    class SlowTail(FakeModel):
+        async def ainvoke_stream(self, messages, **kwargs):
+            self.calls += 1
+            yield "Hello"
+            await asyncio.sleep(0.4)  # longer than the budget
+            yield " world"
+
+    tail, backup = SlowTail(id="slow-tail"), FakeModel(id="backup-tail")
+    chunks = collect(router(strong=[tail, backup]), user())
+    assert [(picked.id, chunk) for picked, chunk in chunks] == [
+        ("slow-tail", "Hello"),
+        ("slow-tail", " world"),
+    ]
+    assert backup.calls == 0
+
+
+def test_responses_are_parsed_by_the_model_that_produced_them():
+    limited = FakeModel(id="limited-parse", status=429)
+    backup = FakeModel(id="backup-parse")
+    model = router(strong=[limited, backup])
+
+    response = asyncio.run(model.aresponse(messages=user()))
+    assert response.content == "backup-parse: Hello world"
+
+
+def test_get_model_tiers(monkeypatch):
+    monkeypatch.setattr(llm_model, "MODEL_FAST_ID", "groq:llama-3.1-8b-instant")
+    monkeypatch.setattr(
+        llm_model,
+        "MODEL_FALLBACK_IDS",
+        # Claude cannot continue an OpenAI-format conversation and is dropped
+        ["claude-3-5-haiku-latest", "groq:qwen/qwen3-32b", "llama-3.3-70b-versatile"],
+    )
+    model = llm_model.get_model("llama-3.3-70b-versatile", "key")
+
+    assert [m.id for m in model.tiers["strong"]] == [
+        "llama-3.3-70b-versatile",
+        "qwen/qwen3-32b",
+    ]
+    assert [m.id for m in model.tiers["fast"]] == [
+        "llama-3.1-8b-instant",
+        "llama-3.3-70b-versatile",
+        "qwen/qwen3-32b",
+    ]
+    # provider models and their HTTP clients are created once and reused
+    again = llm_model.get_model("llama-3.3-70b-versatile", "key")
+    assert again.tiers["strong"][0] is model.tiers["strong"][0]
@@ -0,0 +1,284 @@
+"""Generated models for fixture schemas: they compile, validate and map."""
+
+import sys
+import types
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session, configure_mappers
+
+from gibson_schema import parse_schema
+from model_generator import generate_models
+
+# users, a self-referencing category tree, orders with two foreign keys to
+# users, a composite foreign key and columns whose names need an alias
+SHOP_DDL = """
+CREATE TABLE `users` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `email` varchar(255) NOT NULL,
+  `name` varchar(100) DEFAULT NULL,
+  `is_active` tinyint(1) NOT NULL DEFAULT '1',
+  `class` varchar(20) DEFAULT 'standard',
+  `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `email` (`email`)
+);
+CREATE TABLE `categories` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `parent_id` int DEFAULT NULL,
+  `name` varchar(50) NOT NULL,
+  PRIMARY KEY (`id`),
+  CONSTRAINT `fk_parent` FOREIGN KEY (`parent_id`) REFERENCES `categories` (`id`)
+);
+CREATE TABLE `orders` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `buyer_id` bigint NOT NULL,
+  `seller_id` bigint DEFAULT NULL,
+  `category_id` int DEFAULT NULL,
+  `status` enum('new','paid','shipped') NOT NULL DEFAULT 'new',
+  `total` decimal(10,2) unsigned NOT NULL DEFAULT '0.00',
+  `metadata` json DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  FOREIGN KEY (`buyer_id`) REFERENCES `users` (`id`) ON DELETE CASCADE,
+  FOREIGN KEY (`seller_id`) REFERENCES `users` (`id`) ON DELETE SET NULL,
+  FOREIGN KEY (`category_id`) REFERENCES `categories` (`id`)
+);
+CREATE TABLE `order_lines` (
+  `order_id` bigint NOT NULL,
+  `line_no` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '1',
+  PRIMARY KEY (`order_id`, `line_no`),
+  FOREIGN KEY (`order_id`) REFERENCES `orders` (`id`)
+);
+CREATE TABLE `shipments` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `order_id` bigint NOT NULL,
+  `line_no` int NOT NULL,
+  PRIMARY KEY (`id`),
+  FOREIGN KEY (`order_id`, `line_no`) REFERENCES `order_lines` (`order_id`, `line_no`)
+);
+"""
+
+# the same kind of schema as GibsonAI entities
+ENTITIES = {
+    "entities": [
+        {
+            "name": "author",
+            "struct": {
+                "attributes": [
+                    {
+                        "name": "id",
+                        "data_type": {"raw": "bigint"},
+                        "nullable": False,
+                        "datastore": {
+                            "specifics": {"extra": {"increment": {"auto": True}}}
+                        },
+                    },
+                    {"name": "name", "data_type": {"raw": "varchar"}, "length": 64},
+                ],
+                "keys": {"primary": {"attributes": ["id"]}},
+            },
+        },
+        {
+            "name": "book",
+            "struct": {
+                "attributes": [
+                    {"name": "id", "data_type": {"raw": "bigint"}, "nullable": False},
+                    {
+                        "name": "author_id",
+                        "data_type": {"raw": "bigint"},
+                        "nullable": False,
+                        "datastore": {
+                            "specifics": {
+                                "reference": {
+                                    "entity": {"name": "author"},
+                                    "attributes": ["id"],
+                                    "on": {"delete": "cascade"},
+                                }
+                            }
+                        },
+                    },
+                    {
+                        "name": "pages",
+                        "data_type": {"raw": "int"},
+                        "default": "100",
+                    },
+                ],
+                "keys": {"primary": {"attributes": ["id"]}},
+            },
+        },
+    ]
+}
+
+
+def load(files: dict[str, str], filename: str) -> types.ModuleType:
+    """Compile and import one generated file as a throwaway module."""
+    path = next(path for path in files if path.endswith(filename))
+    name = f"generated_{filename[:-3]}_{id(files)}"
+    module = types.ModuleType(name)
+    sys.modules[name] = module  # dataclass-style annotations look the module up
+    try:
+        exec(compile(files[path], path, "exec"), module.__dict__)
+    finally:
+        del sys.modules[name]
+    return module
+
+
+@pytest.fixture(scope="module")
+def shop():
+    files = generate_models(SHOP_DDL, "both", "models")
+    assert sorted(files) == [
+        "models/pydantic_models.py",
+        "models/sqlalchemy_models.py",
+    ]
+    return files
+
+
+def test_parse_ddl_keys_defaults_and_nullability():
+    tables = {table.name: table for table in parse_schema(SHOP_DDL)}
+    assert list(tables) == [
+        "users",
+        "categories",
+        "orders",
+        "order_lines",
+        "shipments",
+    ]
+
+    users = tables["users"]
+    assert users.primary_key == ["id"]
+    assert users.column("id").autoincrement and not users.column("id").nullable
+    assert users.column("email").unique and not users.column("email").nullable
+    assert users.column("name").nullable and users.column("name").default is None
+    assert users.column("class").default == "'standard'"
+    assert users.column("created_at").default == "CURRENT_TIMESTAMP"
+
+    orders = tables["orders"]
+    assert orders.column("status").values == ["new", "paid", "shipped"]
+    total = orders.column("total")
+    assert (total.precision, total.scale, total.unsigned) == (10, 2, True)
+    buyer, seller, category = orders.foreign_keys
+    assert (buyer.columns, buyer.ref_table, buyer.on_delete) == (
+        ["buyer_id"],
+        "users",
+        "CASCADE",
+    )
+    assert seller.on_delete == "SET NULL"
+    assert category.ref_table == "categories"
+
+    assert tables["order_lines"].primary_key == ["order_id", "line_no"]
+    (composite,) = tables["shipments"].foreign_keys
+    assert composite.columns == composite.ref_columns == ["order_id", "line_no"]
+
+
+def test_parse_entities():
+    author, book = parse_schema(ENTITIES)
+    assert author.primary_key == ["id"] and author.column("id").autoincrement
+    assert author.column("name").length == 64 and author.column("name").nullable
+    (reference,) = book.foreign_keys
+    assert (reference.columns, reference.ref_table, reference.ref_columns) == (
+        ["author_id"],
+        "author",
+        ["id"],
+    )
+    assert reference.on_delete == "cascade"
+    assert book.column("pages").default == "100"
+
+
+def test_output_is_deterministic(shop):
+    assert generate_models(SHOP_DDL, "both", "models") == shop
+
+
+def test_pydantic_models(shop):
+    models = load(shop, "pydantic_models.py")
+
+    # server-generated and nullable columns are optional, literals become defaults
+    user = models.User(email="a@example.com")
+    assert user.id is None and user.name is None and user.created_at is None
+    assert user.is_active is True
+    assert user.class_ == "standard"
+    # columns named like keywords are exposed under an alias
+    assert models.User(email="b@example.com", **{"class": "gold"}).class_ == "gold"
+    with pytest.raises(ValidationError):
+        models.User()  # email is NOT NULL without a default
+    with pytest.raises(ValidationError):
+        models.User(email="x" * 256)  # varchar(255)
+
+    order = models.Order(buyer_id=1)
+    assert order.status == "new" and order.total == Decimal("0.00")
+    with pytest.raises(ValidationError):
+        models.Order(buyer_id=1, status="lost")  # not an enum member
+    with pytest.raises(ValidationError):
+        models.Order(buyer_id=1, total=Decimal("-1"))  # unsigned
+    assert models.Order.model_fields["buyer_id"].description == "References users.id"
+
+    line = models.OrderLine(order_id=1, line_no=1)
+    assert line.quantity == 1
+
+
+def test_sqlalchemy_models_configure_and_persist(shop):
+    models = load(shop, "sqlalchemy_models.py")
+    configure_mappers()
+
+    users = inspect(models.User)
+    # two foreign keys to users: one relationship per key, each with its own
+    # back reference
+    orders = inspect(models.Order).relationships
+    assert orders["buyer"].mapper.class_ is models.User
+    assert orders["seller"].mapper.class_ is models.User
+    assert {rel.key for rel in users.relationships} == {
+        orders["buyer"].back_populates,
+        orders["seller"].back_populates,
+    }
+    assert {col.name for col in orders["buyer"].local_columns} == {"buyer_id"}
+
+    # self reference: a parent and its children
+    categories = inspect(models.Category).relationships
+    assert categories["parent"].mapper.class_ is models.Category
+    assert categories["parent"].direction.name == "MANYTOONE"
+    assert categories[categories["parent"].back_populates].uselist
+
+    # composite foreign key: named after its first column and the parent table
+    shipment = inspect(models.Shipment).relationships["order_order_line"]
+    assert shipment.mapper.class_ is models.OrderLine
+    assert {col.name for col in shipment.local_columns} == {"order_id", "line_no"}
+
+    # reserved attribute names keep their column name
+    assert models.User.__table__.c["class"] is not None
+    assert models.Order.__table__.c["metadata"] is not None
+
+    # SQLite only generates ids for INTEGER primary keys, so BIGINT ones are set
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        buyer = models.User(id=1, email="buyer@example.com", is_active=True)
+        root = models.Category(name="root")
+        child = models.Category(name="child", parent=root)
+        order = models.Order(
+            id=1, buyer=buyer, category=child, status="new", total=Decimal("9.99")
+        )
+        session.add(order)
+        session.flush()
+        assert order.buyer_id == buyer.id
+        assert child.parent_id == root.id
+        assert getattr(buyer, orders["buyer"].back_populates) == [order]
+        assert getattr(buyer, orders["seller"].back_populates) == []
+
+
+def test_entity_schema_generates_both(tmp_path):
+    files = generate_models(ENTITIES, "Both", "")
+    assert sorted(files) == ["pydantic_models.py", "sqlalchemy_models.py"]
+    pydantic_models = load(files, "pydantic_models.py")
+    assert pydantic_models.Book(id=1, author_id=2).pages == 100
+
+    sqlalchemy_models = load(files, "sqlalchemy_models.py")
+    configure_mappers()
+    (foreign_key,) = sqlalchemy_models.Book.__table__.c.author_id.foreign_keys
+    assert foreign_key.ondelete == "CASCADE"
+    assert inspect(sqlalchemy_models.Author).relationships["books"].uselist
+
+
+def test_unknown_model_type():
+    with pytest.raises(ValueError):
+        generate_models(SHOP_DDL, "dataclasses")
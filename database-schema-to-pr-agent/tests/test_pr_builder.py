@@ -0,0 +1,153 @@
+"""PullRequestBuilder against a local bare repository and a fake GitHub API."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from git import Repo
+
+from pr_builder import PullRequestBuilder
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """A bare "GitHub" repository with a main branch holding two files."""
+    work = Repo.init(tmp_path / "work", initial_branch="main")
+    (tmp_path / "work" / "README.md").write_text("# Shop\n")
+    (tmp_path / "work" / "models").mkdir()
+    (tmp_path / "work" / "models" / "legacy.py").write_text("LEGACY = True\n")
+    work.index.add(["README.md", "models/legacy.py"])
+    work.index.commit("Initial commit")
+    bare = tmp_path / "remote.git"
+    work.clone(bare, bare=True)
+    remote = Repo(bare)
+    # like GitHub, serve partial clones
+    remote.git.config("uploadpack.allowFilter", "true")
+    return remote
+
+
+@pytest.fixture
+def github():
+    """Fake pull request endpoint; records the requests it receives."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests.append({"path": self.path, **body})
+            number = len(requests)
+            payload = json.dumps(
+                {"html_url": f"https://github.test/pull/{number}", "number": number}
+            ).encode()
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.requests = requests
+    yield server
+    server.shutdown()
+
+
+def builder(remote: Repo, github, tmp_path) -> PullRequestBuilder:
+    return PullRequestBuilder(
+        "acme",
+        "shop",
+        token=None,
+        remote_url=f"file://{remote.git_dir}",
+        api_url=f"http://127.0.0.1:{github.server_port}",
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+
+FILES = {
+    "models/pydantic_models.py": "class User: ...\n",
+    "models/sqlalchemy_models.py": "class Base: ...\n",
+}
+
+
+def test_one_commit_on_base_keeps_existing_files(remote, github, tmp_path):
+    base = remote.commit("main")
+    result = builder(remote, github, tmp_path).create(
+        FILES, "add-user-models", "Add user models", "Body", base="main"
+    )
+
+    assert result["url"] == "https://github.test/pull/1"
+    assert result["number"] == 1
+    assert result["branch"] == "add-user-models"
+    commit = remote.commit("add-user-models")
+    assert commit.hexsha == result["commit"]
+    assert commit.parents == (base,) and commit.message.strip() == "Add user models"
+    assert commit.author.name == "Schema-to-PR Agent"
+
+    tree = {
+        blob.path: blob.data_stream.read().decode()
+        for blob in commit.tree.traverse()
+        if blob.type == "blob"
+    }
+    assert tree == {
+        "README.md": "# Shop\n",
+        "models/legacy.py": "LEGACY = True\n",
+        **FILES,
+    }
+    # the base branch is left alone
+    assert remote.commit("main") == base
+    # the local clone never downloaded the contents of the existing files
+    local = Repo(tmp_path / "cache" / "acme" / "shop.git")
+    objects = local.git.cat_file("--batch-check", "--batch-all-objects")
+    blobs = {line.split()[0] for line in objects.splitlines() if " blob " in line}
+    assert blobs == {(commit.tree / path).hexsha for path in FILES}
+
+    (request,) = github.requests
+    assert request == {
+        "path": "/repos/acme/shop/pulls",
+        "title": "Add user models",
+        "head": "add-user-models",
+        "base": "main",
+        "body": "Body",
+    }
+
+
+def test_later_pull_requests_reuse_the_local_clone(remote, github, tmp_path):
+    pr_builder = builder(remote, github, tmp_path)
+    first = pr_builder.create(FILES, "first", "First")
+    changed = {**FILES, "models/pydantic_models.py": "class User2: ...\n"}
+    second = pr_builder.create(changed, "second", "Second")
+
+    assert second["number"] == 2
+    # both branches start from main, not from each other
+    main = remote.commit("main")
+    assert remote.commit(first["commit"]).parents == (main,)
+    assert remote.commit(second["commit"]).parents == (main,)
+    blob = remote.commit("second").tree / "models" / "pydantic_models.py"
+    assert blob.data_stream.read().decode() == "class User2: ...\n"
+
+
+def test_existing_branch_is_not_overwritten(remote, github, tmp_path):
+    pr_builder = builder(remote, github, tmp_path)
+    existing = pr_builder.create(FILES, "add-user-models", "Add user models")
+
+    changed = {"models/pydantic_models.py": "class Other: ...\n"}
+    with pytest.raises(RuntimeError, match="git push failed"):
+        pr_builder.create(changed, "add-user-models", "Again")
+
+    assert remote.commit("add-user-models").hexsha == existing["commit"]
+    assert len(github.requests) == 1  # no second pull request was opened
+
+
+def test_unknown_base_branch(remote, github, tmp_path):
+    with pytest.raises(RuntimeError, match="git fetch failed"):
+        builder(remote, github, tmp_path).create(FILES, "x", "X", base="develop")
+    assert github.requests == []
+
+
+def test_no_files():
+    with pytest.raises(ValueError):
+        PullRequestBuilder("acme", "shop", None).create({}, "x", "X")
@@ -0,0 +1,117 @@
+"""RequestIndex: exact repeats, schema confirmation and expiry."""
+
+import json
+
+import pytest
+from agno.agent import RunResponse
+from agno.models.response import ToolExecution
+
+import request_index
+from request_index import RequestIndex
+from schema_cache import SchemaCache
+
+CONTEXT = {"repository": "acme/app", "models_dir": "models", "model_type": "Pydantic"}
+PR_URL = "https://github.com/acme/app/pull/7"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SchemaCache()
+    monkeypatch.setattr(request_index, "get_schema_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def index(tmp_path, cache):
+    index = RequestIndex(str(tmp_path / "index.json"))
+    cache.put("p1", None, "schema after the change")
+    response = RunResponse(
+        content="Opened the pull request.",
+        tools=[
+            ToolExecution(
+                tool_name="create_pull_request_with_files",
+                result=json.dumps({"url": PR_URL}),
+            )
+        ],
+    )
+    assert index.add("p1", "Add an index on users.email", CONTEXT, response)
+    return index
+
+
+class SchemaReads:
+    """Stands in for the one schema read through the MCP pool."""
+
+    def __init__(self, cache: SchemaCache, schema: str | None):
+        self.cache, self.schema, self.calls = cache, schema, 0
+
+    def __call__(self, project_id: str) -> str | None:
+        self.calls += 1
+        if self.schema is None:
+            return None  # GibsonAI could not be reached
+        return self.cache.put(project_id, None, self.schema)
+
+
+def test_exact_repeat_is_a_hit(index):
+    entry = index.find("p1", "please add an index on users email!", CONTEXT)
+    assert entry is not None and entry.pr_url == PR_URL
+
+
+@pytest.mark.parametrize(
+    ("project_id", "request_text", "context"),
+    [
+        ("p1", "Drop an index on users.email", CONTEXT),
+        ("p1", "Add an index on users.email", {**CONTEXT, "model_type": "Both"}),
+        ("p2", "Add an index on users.email", CONTEXT),
+    ],
+)
+def test_other_requests_are_misses(index, project_id, request_text, context):
+    assert index.find(project_id, request_text, context) is None
+
+
+def test_miss_after_a_schema_change(index, cache):
+    cache.put("p1", None, "schema changed outside the agent")
+    assert index.find("p1", "Add an index on users.email", CONTEXT) is None
+
+
+def test_retry_after_the_schema_cache_expired(index, cache):
+    cache.ttl = 0  # the schema read during the run is no longer fresh
+    reads = SchemaReads(cache, "schema after the change")
+    entry = index.find(
+        "p1", "Add an index on users.email", CONTEXT, read_schema_hash=reads
+    )
+    assert entry is not None and reads.calls == 1
+    # without a way to confirm the schema, a stale entry is not trusted
+    assert index.find("p1", "Add an index on users.email", CONTEXT) is None
+
+
+def test_retry_after_the_schema_cache_expired_and_the_schema_changed(index, cache):
+    cache.ttl = 0
+    reads = SchemaReads(cache, "schema after a revert")
+    assert (
+        index.find("p1", "Add an index on users.email", CONTEXT, read_schema_hash=reads)
+        is None
+    )
+
+
+def test_unreachable_schema_is_a_miss(index, cache):
+    cache.ttl = 0
+    reads = SchemaReads(cache, None)
+    assert (
+        index.find("p1", "Add an index on users.email", CONTEXT, read_schema_hash=reads)
+        is None
+    )
+    assert reads.calls == 1
+
+
+def test_new_requests_do_not_read_the_schema(index, cache):
+    cache.ttl = 0
+    reads = SchemaReads(cache, "schema after the change")
+    assert (
+        index.find("p1", "Add a phone column", CONTEXT, read_schema_hash=reads) is None
+    )
+    assert reads.calls == 0
+
+
+def test_expired_entries_are_misses(index, monkeypatch):
+    monkeypatch.setattr(request_index, "REQUEST_INDEX_TTL_HOURS", 0)
+    assert index.find("p1", "Add an index on users.email", CONTEXT) is None
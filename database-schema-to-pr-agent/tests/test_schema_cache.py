@@ -0,0 +1,110 @@
+"""SchemaCacheHook on a fake GibsonAI server: cache hits, invalidation and diffs."""
+
+import asyncio
+
+import pytest
+
+from schema_cache import SchemaCache, SchemaCacheHook
+
+BEFORE = """
+CREATE TABLE `users` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `email` varchar(255) NOT NULL,
+  PRIMARY KEY (`id`)
+);
+"""
+
+AFTER = (
+    BEFORE
+    + """
+CREATE TABLE `orders` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `user_id` bigint NOT NULL,
+  PRIMARY KEY (`id`),
+  FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
+);
+"""
+)
+
+
+class FakeGibson:
+    """Serves one project's schema; a modeling request moves it to ``AFTER``."""
+
+    def __init__(self):
+        self.schema = BEFORE
+        self.reads = 0
+
+    async def get_project_schema(self, uuid: str) -> str:
+        self.reads += 1
+        return self.schema
+
+    async def submit_data_modeling_request(self, uuid: str, modelingRequest: str):
+        self.schema = AFTER
+        return '{"status": "ok"}'
+
+
+@pytest.fixture
+def gibson():
+    return FakeGibson()
+
+
+def call(hook: SchemaCacheHook, gibson: FakeGibson, tool: str, **arguments) -> str:
+    return asyncio.run(
+        hook.tool_hook(tool, getattr(gibson, tool), {"uuid": "p1", **arguments})
+    )
+
+
+def change(hook: SchemaCacheHook, gibson: FakeGibson):
+    call(hook, gibson, "submit_data_modeling_request", modelingRequest="add orders")
+
+
+def test_reads_are_cached_until_a_change(gibson):
+    hook = SchemaCacheHook(SchemaCache())
+    first = call(hook, gibson, "get_project_schema")
+    assert "Schema with 1 tables" in first
+    assert "has not changed" in call(hook, gibson, "get_project_schema")
+    assert gibson.reads == 1
+
+    change(hook, gibson)
+    after = call(hook, gibson, "get_project_schema")
+    assert gibson.reads == 2
+    assert "- added table orders" in after
+    assert hook.summary() == {"hits": 1, "misses": 2, "invalidations": 1}
+
+
+def test_diff_is_only_shown_in_the_run_that_made_the_change(gibson):
+    cache = SchemaCache()
+    first_run = SchemaCacheHook(cache)
+    call(first_run, gibson, "get_project_schema")
+    change(first_run, gibson)
+    assert "Changes:" in call(first_run, gibson, "get_project_schema")
+
+    # a later run reads the cached schema: no stale diff
+    second_run = SchemaCacheHook(cache)
+    result = call(second_run, gibson, "get_project_schema")
+    assert "Schema with 2 tables" in result
+    assert "Changes:" not in result
+    assert second_run.summary()["hits"] == 1
+
+
+def test_no_stale_diff_after_the_cache_expires(gibson):
+    cache = SchemaCache(ttl=0)
+    first_run = SchemaCacheHook(cache)
+    call(first_run, gibson, "get_project_schema")
+    change(first_run, gibson)
+
+    second_run = SchemaCacheHook(cache)
+    result = call(second_run, gibson, "get_project_schema")
+    assert second_run.summary()["misses"] == 1
+    assert "Changes:" not in result
+
+
+def test_failed_writes_keep_the_cache(gibson):
+    async def failing(**arguments):
+        return "Error: modeling request rejected"
+
+    hook = SchemaCacheHook(SchemaCache())
+    call(hook, gibson, "get_project_schema")
+    asyncio.run(hook.tool_hook("submit_data_modeling_request", failing, {"uuid": "p1"}))
+    assert "has not changed" in call(hook, gibson, "get_project_schema")
+    assert hook.summary()["invalidations"] == 0
@@ -0,0 +1,64 @@
+"""Run compaction before sessions are stored."""
+
+from session_storage import compact_memory, compact_run
+
+SCHEMA = "CREATE TABLE `users` (...);\n" * 500
+
+
+def test_openai_tool_results_are_truncated():
+    run = {
+        "messages": [
+            {"role": "user", "content": "Add a phone column"},
+            {"role": "tool", "tool_call_id": "call_1", "content": SCHEMA},
+        ],
+        "tools": [{"tool_name": "get_project_schema", "result": SCHEMA}],
+        "events": [{"event": "RunStarted"}],
+    }
+    compacted = compact_run(run, limit=100)
+
+    user, tool = compacted["messages"]
+    assert user == run["messages"][0]
+    assert tool["content"].startswith(SCHEMA[:100])
+    assert tool["content"].endswith(
+        f"[... {len(SCHEMA) - 100} characters of tool output truncated]"
+    )
+    assert len(compacted["tools"][0]["result"]) < 200
+    assert "events" not in compacted
+
+
+def test_claude_tool_result_blocks_are_truncated():
+    results = [
+        {"type": "tool_result", "tool_use_id": "toolu_1", "content": SCHEMA},
+        {"type": "tool_result", "tool_use_id": "toolu_2", "content": "ok"},
+    ]
+    run = {
+        "messages": [
+            {"role": "user", "content": "Add a phone column"},
+            {"role": "assistant", "content": "", "tool_calls": [{"id": "toolu_1"}]},
+            {"role": "user", "content": results},
+        ]
+    }
+    compacted = compact_run(run, limit=100)
+
+    assert compacted["messages"][:2] == run["messages"][:2]
+    schema, ok = compacted["messages"][2]["content"]
+    assert schema["tool_use_id"] == "toolu_1" and len(schema["content"]) < 200
+    assert ok == results[1]
+    # the stored run is a copy; the live one keeps its full results
+    assert run["messages"][2]["content"][0]["content"] == SCHEMA
+
+
+def test_history_copies_are_dropped_and_old_runs_trimmed():
+    runs = [
+        {
+            "run_id": str(n),
+            "messages": [
+                {"role": "user", "content": "earlier", "from_history": True},
+                {"role": "user", "content": f"request {n}"},
+            ],
+        }
+        for n in range(5)
+    ]
+    memory = compact_memory({"runs": runs}, max_runs=2)
+    assert [run["run_id"] for run in memory["runs"]] == ["3", "4"]
+    assert memory["runs"][1]["messages"] == [{"role": "user", "content": "request 4"}]
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""Benchmark ContactStorageTool against a local stand-in for the GibsonAI API.
+
+Run from the project root:
+
+    python benchmarks/bench_contact_storage.py --sizes 1 10 100 1000 --latency-ms 50
+    python benchmarks/bench_contact_storage.py --compare benchmarks/results/<earlier>.json
+
+Each run is saved as JSON under ``benchmarks/results`` so later runs can be
+compared against it.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from bench_utils import PROJECT_ROOT, compare, new_report, percentile, save_report
+
+sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_SIZES = [1, 10, 100, 1000]
+
+
+class FakeGibsonAI:
+    """Threaded HTTP server answering ``/sales-company`` and ``/sales-contact``.
+
+    Every request sleeps ``latency_ms`` and fails with a 500 with probability
+    ``error_rate``, so both slow and flaky APIs can be simulated. Tests can also
+    queue the statuses of the next requests in ``statuses`` and reject contacts
+    by name with ``rejected`` ({name: status}); stored contacts land in
+    ``contacts``.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.statuses: List[int] = []
+        self.rejected: Dict[str, int] = {}
+        self.contacts: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        # a short poll interval lets stop() return quickly
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                path = self.path.rsplit("/", 1)[-1]
+                with fake._lock:
+                    fake.requests[path] = fake.requests.get(path, 0) + 1
+                    failed = fake._random.random() < fake.error_rate
+                    fake.errors += failed
+                    row_id = next(fake._ids)
+                    status = fake.statuses.pop(0) if fake.statuses else None
+                    if path == "sales-contact":
+                        status = status or fake.rejected.get(body.get("name"))
+                time.sleep(fake.latency)
+
+                if path not in ("sales-company", "sales-contact"):
+                    self._reply(404, {"detail": "Not found"})
+                elif failed:
+                    self._reply(500, {"detail": "Injected failure"})
+                elif status:
+                    self._reply(status, {"detail": "Scripted failure"})
+                else:
+                    if path == "sales-contact":
+                        with fake._lock:
+                            fake.contacts.append(body)
+                    self._reply(201, {"id": row_id, **body})
+
+            def _reply(self, status: int, payload: Dict[str, Any]):
+                out = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_payload(size: int, run: int) -> str:
+    company_name = f"Bench Company {size}-{run}"
+    contacts = [
+        {
+            "name": f"Contact {i}",
+            "title": "VP Engineering",
+            "linkedin_url": f"https://www.linkedin.com/in/bench-{size}-{run}-{i}",
+            "phone": "N/A",
+            "email": f"contact{i}@bench-{size}-{run}.example.com",
+        }
+        for i in range(size)
+    ]
+    return json.dumps({"company_name": company_name, "contacts": contacts})
+
+
+def bench_size(tool, server: FakeGibsonAI, size: int, repeats: int) -> Dict[str, Any]:
+    latencies = []
+    requests_before = server.request_count()
+    for run in range(repeats):
+        payload = make_payload(size, run)
+        started = time.perf_counter()
+        tool._run(payload)
+        latencies.append(time.perf_counter() - started)
+    total = sum(latencies)
+    return {
+        "contacts": size,
+        "repeats": repeats,
+        "requests": server.request_count() - requests_before,
+        "throughput_contacts_per_s": round(size * repeats / total, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "total_s": round(total, 3),
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeGibsonAI(args.latency_ms, args.error_rate, args.seed)
+    server.start()
+
+    # the synchronous path, without the outbox or the dedupe index in the way
+    os.environ.update(
+        GIBSONAI_API_KEY="benchmark",
+        GIBSONAI_API_BASE_URL=server.base_url,
+        GIBSONAI_WRITE_BEHIND="false",
+        GIBSONAI_DEDUPE="false",
+        TRACING="false",
+    )
+    if args.max_concurrency:
+        os.environ["GIBSONAI_MAX_CONCURRENCY"] = str(args.max_concurrency)
+
+    from src.tools.contact_storage_tool import ContactStorageTool
+
+    tool = ContactStorageTool()
+    try:
+        results = []
+        for size in args.sizes:
+            result = bench_size(tool, server, size, args.repeats)
+            results.append(result)
+            print(
+                f"{size:>5} contacts: {result['throughput_contacts_per_s']:>8} contacts/s, "
+                f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+                f"{result['requests']} requests"
+            )
+    finally:
+        tool._client.close()
+        server.stop()
+
+    report = new_report(
+        "contact_storage",
+        {
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "max_concurrency": tool.max_concurrency,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+    )
+    report.update(injected_errors=server.errors, results=results)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Contacts per payload",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="Payloads stored per size"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=50.0, help="Latency of every fake request"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Share of fake requests answered with a 500",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Overrides GIBSONAI_MAX_CONCURRENCY for the run",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected errors")
+    parser.add_argument(
+        "--output", help="Result file; defaults to a timestamped file in benchmarks/results"
+    )
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    save_report(report, args.output)
+    if args.compare:
+        compare(
+            report,
+            args.compare,
+            "contacts",
+            ["throughput_contacts_per_s", "p50_ms", "p99_ms", "requests"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""Measure how long each main.py command takes to start.
+
+Every sample spawns a fresh ``python main.py <command>`` process, as a batch
+worker would, and stops it the moment the command hands the crew over to crewai
+(``kickoff``, ``train``, ``test`` or ``replay``). The time up to that point is the
+startup cost that no amount of LLM speed can win back. Run from the project root:
+
+    python benchmarks/bench_startup.py --repeats 5
+    python benchmarks/bench_startup.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import importlib.abc
+import importlib.util
+import os
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_utils import PROJECT_ROOT, compare, new_report, percentile, save_report
+
+# arguments that get each command past its own parsing up to the crew call
+COMMANDS = {
+    "run": ([], "Acme Corp\nAnalytics platform\n"),
+    "train": (["1", os.path.join("tmp", "bench_startup_training.pkl")], None),
+    "test": (["1", "gpt-4o-mini"], None),
+    "replay": (["00000000-0000-0000-0000-000000000000"], None),
+}
+CREW_ENTRY_POINTS = ("kickoff", "train", "test", "replay")
+READY_MARKER = "BENCH_STARTUP_READY"
+
+
+class _StopAtCrewEntry(importlib.abc.MetaPathFinder):
+    """Patches ``crewai.crew.Crew`` on import so its entry points end the process."""
+
+    def find_spec(self, name, path, target=None):
+        if name != "crewai.crew":
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(name)
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            for entry_point in CREW_ENTRY_POINTS:
+                setattr(module.Crew, entry_point, _ready)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def _ready(crew, *args, **kwargs):
+    print(f"\n{READY_MARKER} {len(sys.modules)}", flush=True)
+    os._exit(0)
+
+
+def _child(command: str, args):
+    """Run ``main.py <command>`` in this process until it reaches the crew."""
+    sys.meta_path.insert(0, _StopAtCrewEntry())
+    sys.path.insert(0, PROJECT_ROOT)
+    sys.argv = ["main.py", command, *args]
+    runpy.run_path(os.path.join(PROJECT_ROOT, "main.py"), run_name="__main__")
+    # a command that returns without touching the crew never became ready
+    sys.exit(f"{command} finished without starting the crew")
+
+
+def sample(command: str) -> dict:
+    args, stdin = COMMANDS[command]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", command, *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+    )
+    elapsed = time.perf_counter() - started
+    for line in completed.stdout.splitlines():
+        if line.startswith(READY_MARKER):
+            return {"seconds": elapsed, "modules": int(line.split()[1])}
+    raise RuntimeError(
+        f"{command} did not reach the crew:\n{completed.stderr[-2000:]}"
+    )
+
+
+def interpreter_startup(repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3:])
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--commands",
+        nargs="+",
+        choices=sorted(COMMANDS),
+        default=list(COMMANDS),
+        help="Commands to measure",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="Fresh processes started per command"
+    )
+    parser.add_argument(
+        "--output", help="Result file; defaults to a timestamped file in benchmarks/results"
+    )
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    baseline = interpreter_startup(args.repeats)
+    print(f"python startup: {baseline * 1000:.0f} ms")
+
+    results = []
+    for command in args.commands:
+        samples = [sample(command) for _ in range(args.repeats)]
+        seconds = [s["seconds"] for s in samples]
+        result = {
+            "command": command,
+            "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+            "max_ms": round(max(seconds) * 1000, 1),
+            "modules": samples[-1]["modules"],
+        }
+        results.append(result)
+        print(
+            f"{command:>7}: p50 {result['p50_ms']} ms, max {result['max_ms']} ms, "
+            f"{result['modules']} modules loaded"
+        )
+
+    report = new_report(
+        "startup", {"repeats": args.repeats, "commands": args.commands}
+    )
+    report.update(
+        python_startup_ms=round(baseline * 1000, 1),
+        results=results,
+    )
+    save_report(report, args.output)
+    if args.compare:
+        compare(report, args.compare, "command", ["p50_ms", "max_ms", "modules"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_report(benchmark: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "benchmark": benchmark,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": config,
+    }
+
+
+def save_report(report: Dict[str, Any], output: Optional[str] = None) -> str:
+    """Write ``report`` to ``output`` or a timestamped file in benchmarks/results."""
+    output = output or os.path.join(
+        DEFAULT_RESULTS_DIR,
+        f"{report['benchmark']}-{time.strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return output
+
+
+def compare(
+    current: Dict[str, Any], baseline_path: str, key: str, metrics: List[str]
+):
+    """Print the relative change of ``metrics`` for results matched on ``key``."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != current["config"]:
+        print("Warning: the baseline was recorded with a different config")
+
+    print(f"\nCompared to {baseline_path} ({baseline.get('git_revision')}):")
+    previous = {result[key]: result for result in baseline["results"]}
+    for result in current["results"]:
+        before = previous.get(result[key])
+        if before is None:
+            continue
+        changes = ", ".join(
+            f"{metric} {(result[metric] - before[metric]) / before[metric]:+.0%}"
+            for metric in metrics
+            if before.get(metric)
+        )
+        print(f"{result[key]:>7}: {changes}")
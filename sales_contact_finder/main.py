@@ -1,12 +1,22 @@
 #!/usr/bin/env python
 import sys
 
-from src.crew import SalesContactFinderCrew
+# crewai, crewai_tools and the storage clients take seconds to import, so each
+# command imports what it needs once it has been chosen
+
+
+def _build_crew():
+    from src.crew import SalesContactFinderCrew
+
+    return SalesContactFinderCrew()
 
 
 def run():
+    from src.tools.contact_outbox import drain_outboxes
+    from src.tools.tool_cache import get_tool_cache
+
     # Create an instance of the crew
-    crew = SalesContactFinderCrew()
+    crew = _build_crew()
 
     # Define your inputs
     target_company = input("Enter Target Company: ")
@@ -21,6 +31,21 @@ def run():
     print("\nResults:")
     print(result)
 
+    # Give queued contacts a chance to reach the API before exiting
+    drain_outboxes()
+    print(get_tool_cache().report())
+    print(crew.content_reducer.report())
+    write_trace_metrics()
+
+
+def write_trace_metrics():
+    from src.tracing import get_tracer
+
+    tracer = get_tracer()
+    if tracer.enabled:
+        tracer.write_metrics()
+        print(f"Trace written to {tracer.trace_file}, metrics to {tracer.metrics_file}")
+
 
 def train():
     """
@@ -28,8 +53,8 @@ def train():
     """
     inputs = {"topic": "AI LLMs"}
     try:
-        SalesContactFinderCrew().crew().train(
-            n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs
+        _build_crew().crew().train(
+            n_iterations=int(sys.argv[2]), filename=sys.argv[3], inputs=inputs
         )
 
     except Exception as e:
@@ -41,7 +66,7 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        SalesContactFinderCrew().crew().replay(task_id=sys.argv[1])
+        _build_crew().crew().replay(task_id=sys.argv[2])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -53,21 +78,67 @@ def test():
     """
     inputs = {"topic": "AI LLMs"}
     try:
-        SalesContactFinderCrew().crew().test(
-            n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs
+        _build_crew().crew().test(
+            n_iterations=int(sys.argv[2]), openai_model_name=sys.argv[3], inputs=inputs
         )
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
 
+def batch():
+    """
+    Run the crew for every target company listed in a CSV or JSONL file.
+    """
+    import argparse
+
+    from src.batch import DEFAULT_OUTPUT_DIR, DEFAULT_WORKERS, BatchRunner, read_targets
+    from src.tools.contact_outbox import drain_outboxes
+    from src.tools.tool_cache import get_tool_cache
+
+    parser = argparse.ArgumentParser(prog="main.py batch")
+    parser.add_argument(
+        "input_file", help="CSV or JSONL file with target_company and our_product"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of crews to run concurrently",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory for per-target results and summary.jsonl",
+    )
+    args = parser.parse_args(sys.argv[2:])
+
+    runner = BatchRunner(output_dir=args.output_dir, workers=args.workers)
+    records = runner.run(read_targets(args.input_file))
+
+    # Give queued contacts a chance to reach the API before exiting
+    drain_outboxes()
+    print(get_tool_cache().report())
+    write_trace_metrics()
+
+    failed = [record for record in records if record["status"] != "ok"]
+    print(f"\nBatch finished: {len(records) - len(failed)} ok, {len(failed)} failed")
+    print(f"Summary written to {runner.summary_path}")
+    if failed:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Please specify a command: run, train, test, or replay")
+        print("Please specify a command: run, train, test, replay, or batch")
         sys.exit(1)
 
     command = sys.argv[1]
 
+    from dotenv import load_dotenv
+
+    load_dotenv()  # Load environment variables from .env, once per process
+
     if command == "run":
         run()
     elif command == "train":
@@ -76,3 +147,5 @@ if __name__ == "__main__":
         test()
     elif command == "replay":
         replay()
+    elif command == "batch":
+        batch()
@@ -0,0 +1,144 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from src.crew import SalesContactFinderCrew
+from src.tracing import get_tracer
+
+DEFAULT_OUTPUT_DIR = "output/batch"
+DEFAULT_WORKERS = 4
+
+
+def read_targets(path: str) -> List[Dict[str, str]]:
+    """Read (target_company, our_product) rows from a CSV or JSONL file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    targets = []
+    for number, row in enumerate(rows, start=1):
+        target_company = (row.get("target_company") or "").strip()
+        our_product = (row.get("our_product") or "").strip()
+        if not target_company or not our_product:
+            raise ValueError(
+                f"{path}: row {number} needs both target_company and our_product"
+            )
+        targets.append({"target_company": target_company, "our_product": our_product})
+    return targets
+
+
+def target_key(target: Dict[str, str]) -> str:
+    """Stable id for a row, used to name its output and to resume a batch."""
+    normalized = "\n".join(
+        " ".join(target[field].casefold().split())
+        for field in ("target_company", "our_product")
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def _completed_keys(summary_path: str) -> set:
+    if not os.path.exists(summary_path):
+        return set()
+    completed = set()
+    with open(summary_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a torn last line from an interrupted run
+            if record.get("status") == "ok":
+                completed.add(record["key"])
+    return completed
+
+
+class BatchRunner:
+    """Runs one SalesContactFinderCrew per target on a bounded worker pool.
+
+    Each finished crew is written to its own markdown file and appended to
+    ``summary.jsonl`` in the output directory. Targets already recorded as ``ok``
+    in the summary are skipped, so an interrupted batch resumes where it stopped.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR, workers: int = DEFAULT_WORKERS):
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.summary_path = os.path.join(output_dir, "summary.jsonl")
+        self._summary_lock = threading.Lock()
+
+    def _output_path(self, target: Dict[str, str], key: str) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", target["target_company"].lower()).strip("-")
+        return os.path.join(self.output_dir, f"{slug or 'company'}-{key}.md")
+
+    def _record(self, record: Dict):
+        with self._summary_lock, open(self.summary_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _run_one(self, target: Dict[str, str], key: str) -> Dict:
+        started = time.time()
+        record = {"key": key, **target}
+        try:
+            # each target's result goes to its own file below, so the shared
+            # output/buyer_contact.md is not written by concurrent crews
+            crew = SalesContactFinderCrew(output_file=None)
+            sales_crew = crew.crew()
+            with get_tracer().span(
+                "crew", "batch_target", trace_id=str(sales_crew.id), target_key=key
+            ):
+                result = sales_crew.kickoff(inputs=dict(target))
+            output_file = self._output_path(target, key)
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(result.raw)
+            record.update(
+                status="ok",
+                output_file=output_file,
+                error=None,
+                scraped_tokens=crew.content_reducer.stats(),
+            )
+        except Exception as e:
+            record.update(status="error", output_file=None, error=str(e))
+        record["duration_s"] = round(time.time() - started, 2)
+        record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self._record(record)
+        return record
+
+    def run(self, targets: List[Dict[str, str]]) -> List[Dict]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        completed = _completed_keys(self.summary_path)
+
+        pending = {}
+        for target in targets:
+            key = target_key(target)
+            if key not in completed:
+                pending.setdefault(key, target)
+        print(
+            f"Batch: {len(targets)} targets, {len(targets) - len(pending)} already done, "
+            f"{len(pending)} to run with {self.workers} workers"
+        )
+
+        records = []
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="crew"
+        ) as executor:
+            futures = [
+                executor.submit(self._run_one, target, key)
+                for key, target in pending.items()
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                print(
+                    f"[{len(records)}/{len(futures)}] {record['target_company']} / "
+                    f"{record['our_product']}: {record['status']} "
+                    f"in {record['duration_s']}s"
+                )
+        return records
@@ -0,0 +1,203 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from pydantic import Field
+
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import TaskCompletedEvent, TaskStartedEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from src.tracing import annotate, estimate_tokens, get_tracer
+
+DEFAULT_CHECKPOINT_PATH = "tmp/task_checkpoints.db"
+
+# name of the task executing in the current thread, for tools that report per task
+current_task_name: ContextVar[Optional[str]] = ContextVar(
+    "current_task_name", default=None
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_checkpoint (
+    key TEXT PRIMARY KEY,
+    task_name TEXT,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class CheckpointStore:
+    """SQLite store of task outputs keyed by the hash of everything that produced them."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, key: str, max_age: Optional[float] = None) -> Optional[TaskOutput]:
+        """Return the checkpoint for ``key`` unless it is older than ``max_age`` seconds."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT output, created_at FROM task_checkpoint WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return TaskOutput.model_validate_json(row[0])
+
+    def save(self, key: str, output: TaskOutput):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_checkpoint VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    output.name,
+                    output.model_dump_json(exclude={"pydantic"}),
+                    time.time(),
+                ),
+            )
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Return the process-wide checkpoint store, or None when checkpoints are off."""
+    global _store
+    if os.getenv("TASK_CHECKPOINTS", "true").lower() in ("0", "false", "no"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore(
+                os.getenv("TASK_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH)
+            )
+        return _store
+
+
+class CheckpointedTask(Task):
+    """Task whose output is checkpointed and served again while its key is unchanged.
+
+    The key hashes the interpolated task and agent config (which embed the crew
+    inputs they reference) together with the upstream outputs passed as context.
+    Editing one task's prompt therefore re-runs that task and, through their
+    context, the tasks after it, while everything upstream comes from checkpoints.
+    ``checkpoint_ttl_hours`` bounds how old a reusable checkpoint may be.
+    """
+
+    checkpoint_ttl_hours: Optional[float] = Field(
+        default=None,
+        description="Maximum age of a reusable checkpoint; unlimited when unset",
+    )
+
+    def checkpoint_key(self, agent: BaseAgent, context: Optional[str]) -> str:
+        tools: List[Any] = agent.tools or []
+        payload = {
+            "task": {
+                "name": self.name,
+                "description": self.description,
+                "expected_output": self.expected_output,
+            },
+            "agent": {
+                "role": agent.role,
+                "goal": agent.goal,
+                "backstory": agent.backstory,
+                "llm": getattr(getattr(agent, "llm", None), "model", None),
+                "tools": sorted(tool.name for tool in tools),
+            },
+            "context": context or "",
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _execute_core(
+        self,
+        agent: Optional[BaseAgent],
+        context: Optional[str],
+        tools: Optional[List[Any]],
+    ) -> TaskOutput:
+        agent = agent or self.agent
+        crew = getattr(agent, "crew", None)
+        token = current_task_name.set(self.name)
+        try:
+            with get_tracer().span(
+                "task",
+                self.name or "task",
+                trace_id=str(crew.id) if crew is not None else None,
+                agent=agent.role if agent is not None else None,
+                context_tokens=estimate_tokens(context or ""),
+            ) as span:
+                output = self._execute_checkpointed(agent, context, tools)
+                span.set(output_tokens=estimate_tokens(output.raw))
+            return output
+        finally:
+            current_task_name.reset(token)
+
+    def _execute_checkpointed(
+        self,
+        agent: Optional[BaseAgent],
+        context: Optional[str],
+        tools: Optional[List[Any]],
+    ) -> TaskOutput:
+        store = get_checkpoint_store()
+        if store is None or agent is None:
+            return super()._execute_core(agent, context, tools)
+
+        key = self.checkpoint_key(agent, context)
+        max_age = (
+            None
+            if self.checkpoint_ttl_hours is None
+            else self.checkpoint_ttl_hours * 3600
+        )
+        output = store.load(key, max_age)
+        if output is not None:
+            print(f"Reusing checkpointed output for task {self.name}")
+            annotate(checkpoint_hit=True)
+            return self._reuse(output, agent, context)
+
+        output = super()._execute_core(agent, context, tools)
+        store.save(key, output)
+        return output
+
+    def _reuse(
+        self, output: TaskOutput, agent: BaseAgent, context: Optional[str]
+    ) -> TaskOutput:
+        """Complete the task with a checkpointed output, as a real run would.
+
+        Callbacks and task events fire just like in ``Task._execute_core``, so
+        observers see reused tasks too.
+        """
+        self.agent = agent
+        self.start_time = datetime.datetime.now()
+        self.prompt_context = context
+        self.processed_by_agents.add(agent.role)
+        crewai_event_bus.emit(self, TaskStartedEvent(context=context))
+
+        self.output = output
+        self.end_time = datetime.datetime.now()
+        if self.callback:
+            self.callback(output)
+        crew = agent.crew
+        if crew and crew.task_callback and crew.task_callback != self.callback:
+            crew.task_callback(output)
+        if self.output_file:
+            self._save_file(output.raw)
+        crewai_event_bus.emit(self, TaskCompletedEvent(output=output))
+        return output
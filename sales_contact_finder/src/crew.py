@@ -1,8 +1,15 @@
-from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+from typing import Optional
+
+from src.checkpoints import CheckpointedTask
+from src.tools.cached_tools import CachedScrapeWebsiteTool, CachedSerperDevTool
 from src.tools.contact_storage_tool import ContactStorageTool
+from src.tools.content_reducer import ContentReducer
+from src.tracing import instrument_llm_calls
 
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
+
+DEFAULT_OUTPUT_FILE = "output/buyer_contact.md"
 
 
 @CrewBase
@@ -12,11 +19,43 @@ class SalesContactFinderCrew:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
+    def __init__(self, output_file: Optional[str] = DEFAULT_OUTPUT_FILE):
+        # where the strategy task writes its report; None when the caller keeps
+        # the result itself, like the batch runner does per target
+        self.output_file = output_file
+        # shared by every scrape tool in this crew, so blocks repeated across pages
+        # only reach the agents once; the company profile is reused for every
+        # product, so its pages are ranked without the product
+        self.content_reducer = ContentReducer(
+            product_neutral_tasks=["profile_company_task"]
+        )
+        # tools are built once per crew and shared by the agents that use them
+        self.search_tool = CachedSerperDevTool()
+        self.scrape_tool = CachedScrapeWebsiteTool(content_reducer=self.content_reducer)
+        self.contact_storage_tool = ContactStorageTool()
+        instrument_llm_calls()
+
+    @before_kickoff
+    def focus_content_reducer(self, inputs):
+        self.content_reducer.set_focus(
+            inputs.get("target_company", ""), product=inputs.get("our_product", "")
+        )
+        return inputs
+
     @agent
     def company_researcher(self) -> Agent:
         return Agent(
             config=self.agents_config["company_researcher"],
-            tools=[SerperDevTool(), ScrapeWebsiteTool()],
+            tools=[self.search_tool, self.scrape_tool],
+            allow_delegation=False,
+            verbose=True,
+        )
+
+    @agent
+    def product_fit_analyst(self) -> Agent:
+        return Agent(
+            config=self.agents_config["product_fit_analyst"],
+            tools=[],
             allow_delegation=False,
             verbose=True,
         )
@@ -25,7 +64,7 @@ class SalesContactFinderCrew:
     def org_structure_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config["org_structure_analyst"],
-            tools=[SerperDevTool(), ScrapeWebsiteTool()],
+            tools=[self.search_tool, self.scrape_tool],
             allow_delegation=False,
             verbose=True,
         )
@@ -34,11 +73,7 @@ class SalesContactFinderCrew:
     def contact_finder(self) -> Agent:
         return Agent(
             config=self.agents_config["contact_finder"],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                ContactStorageTool(),
-            ],
+            tools=[self.search_tool, self.scrape_tool, self.contact_storage_tool],
             allow_delegation=False,
             verbose=True,
         )
@@ -53,32 +88,39 @@ class SalesContactFinderCrew:
         )
 
     @task
-    def research_company_task(self) -> Task:
-        return Task(
-            config=self.tasks_config["research_company_task"],
+    def profile_company_task(self) -> Task:
+        return CheckpointedTask(
+            config=self.tasks_config["profile_company_task"],
             agent=self.company_researcher(),
         )
 
     @task
     def analyze_org_structure_task(self) -> Task:
-        return Task(
+        return CheckpointedTask(
             config=self.tasks_config["analyze_org_structure_task"],
             agent=self.org_structure_analyst(),
         )
 
+    @task
+    def assess_product_fit_task(self) -> Task:
+        return CheckpointedTask(
+            config=self.tasks_config["assess_product_fit_task"],
+            agent=self.product_fit_analyst(),
+        )
+
     @task
     def find_key_contacts_task(self) -> Task:
-        return Task(
+        return CheckpointedTask(
             config=self.tasks_config["find_key_contacts_task"],
             agent=self.contact_finder(),
         )
 
     @task
     def develop_approach_strategy_task(self) -> Task:
-        return Task(
+        return CheckpointedTask(
             config=self.tasks_config["develop_approach_strategy_task"],
             agent=self.sales_strategist(),
-            output_file="output/buyer_contact.md",
+            output_file=self.output_file,
         )
 
     @crew
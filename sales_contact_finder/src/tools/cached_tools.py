@@ -0,0 +1,88 @@
+import json
+import re
+from typing import Any, Optional
+
+import requests
+from bs4 import BeautifulSoup
+from pydantic import ConfigDict
+
+from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+from src.checkpoints import current_task_name
+from src.tools.content_reducer import ContentReducer
+from src.tools.tool_cache import get_tool_cache, normalize_query, normalize_url
+from src.tracing import get_tracer
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that serves repeated searches from the shared tool cache."""
+
+    def _run(self, **kwargs: Any) -> Any:
+        search_query = kwargs.get("search_query") or kwargs.get("query") or ""
+        args = {
+            "search_query": normalize_query(search_query),
+            "search_type": kwargs.get("search_type", self.search_type),
+            "n_results": self.n_results,
+        }
+        with get_tracer().span("tool", self.name, query=args["search_query"]) as span:
+            results = get_tool_cache().get_or_run(
+                "serper", args, lambda: super(CachedSerperDevTool, self)._run(**kwargs)
+            )
+            span.set(output_bytes=len(json.dumps(results, default=str)))
+        return results
+
+
+class ScrapeFailed(Exception):
+    """A page answered with a non-2xx status, so its body is an error page."""
+
+    def __init__(self, website_url: str, status_code: int, reason: str):
+        super().__init__(
+            f"Failed to scrape {website_url}: HTTP {status_code} {reason}".rstrip()
+        )
+        self.status_code = status_code
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that serves pages scraped before from the shared tool cache.
+
+    Raw pages are cached; when a ``content_reducer`` is set, each page is reduced
+    to its relevant passages before it is handed to the agent. Only 2xx responses
+    are cached: for 403, 404 or 5xx the agent gets a short error instead of the
+    error page, and the next call tries again.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    content_reducer: Optional[ContentReducer] = None
+
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url) or ""
+        args = {"website_url": normalize_url(website_url)}
+        with get_tracer().span("tool", self.name, url=args["website_url"]) as span:
+            try:
+                content = get_tool_cache().get_or_run(
+                    "scrape", args, lambda: self._scrape(website_url)
+                )
+            except ScrapeFailed as e:
+                span.set(status_code=e.status_code)
+                return str(e)
+            if self.content_reducer is not None and isinstance(content, str):
+                content = self.content_reducer.reduce(
+                    content, task=current_task_name.get()
+                )
+            span.set(output_bytes=len(str(content or "")))
+        return content
+
+    def _scrape(self, website_url: str) -> str:
+        """Fetch and flatten a page the way ScrapeWebsiteTool does, checking the status."""
+        page = requests.get(
+            website_url,
+            timeout=15,
+            headers=self.headers,
+            cookies=self.cookies if self.cookies else {},
+        )
+        if not 200 <= page.status_code < 300:
+            raise ScrapeFailed(website_url, page.status_code, page.reason or "")
+        page.encoding = page.apparent_encoding
+        text = BeautifulSoup(page.text, "html.parser").get_text(" ")
+        text = re.sub("[ \t]+", " ", text)
+        return re.sub("\\s+\n\\s+", "\n", text)
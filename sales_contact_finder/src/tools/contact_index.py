@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from contextlib import closing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+DEFAULT_INDEX_PATH = "tmp/contact_index.db"
+
+_LEGAL_SUFFIXES = {
+    "inc",
+    "incorporated",
+    "llc",
+    "ltd",
+    "limited",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "gmbh",
+    "plc",
+    "sa",
+    "ag",
+}
+_MISSING_VALUES = {"", "n/a", "na", "none", "null", "unknown", "-"}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS company (
+        company_key TEXT PRIMARY KEY,
+        company_name TEXT NOT NULL,
+        company_id TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contact_key (
+        contact_key TEXT PRIMARY KEY,
+        company_key TEXT NOT NULL
+    )
+    """,
+)
+
+
+def normalize_company_name(company_name: str) -> str:
+    words = re.sub(r"[^\w\s]", " ", company_name.casefold()).split()
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _present(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return None if value.casefold() in _MISSING_VALUES else value
+
+
+def contact_keys(company_key: str, contact: Dict[str, Any]) -> List[str]:
+    """Identity keys for a contact: email, LinkedIn profile and name+title."""
+    keys = []
+    email = _present(contact.get("email"))
+    if email and "@" in email:
+        keys.append(f"email:{email.casefold()}")
+    linkedin_url = _present(contact.get("linkedin_url"))
+    if linkedin_url:
+        url = re.sub(r"^https?://(www\.)?", "", linkedin_url.casefold())
+        keys.append(f"linkedin:{url.split('?')[0].rstrip('/')}")
+    name = _present(contact.get("name"))
+    if name:
+        title = _present(contact.get("title")) or ""
+        keys.append(f"name:{company_key}|{name.casefold()}|{title.casefold()}")
+    return keys
+
+
+class ContactIndex:
+    """Persistent index of stored companies and contacts.
+
+    Maps normalized company names to their GibsonAI ``company_id`` and keeps the
+    identity keys of every contact already written, so reruns against the same
+    accounts skip known companies and duplicate contacts before any network call.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._company_lock = threading.Lock()
+        self._async_locks_lock = threading.Lock()
+        self._async_locks: "weakref.WeakKeyDictionary[Any, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def company_id(self, company_name: str) -> Optional[Any]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT company_id FROM company WHERE company_key = ?",
+                (normalize_company_name(company_name),),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def resolve_company_id(
+        self, company_name: str, create: Callable[[str], Any]
+    ) -> Any:
+        """Return the known id for ``company_name``, creating the company only once."""
+        with self._company_lock:
+            company_id = self.company_id(company_name)
+            if company_id is None:
+                company_id = create(company_name)
+                self._remember_company(company_name, company_id)
+            return company_id
+
+    async def aresolve_company_id(
+        self, company_name: str, create: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """Async variant of ``resolve_company_id`` for a coroutine ``create``.
+
+        The SQLite reads and writes run in worker threads. Creation is guarded by
+        the same lock as the sync path, so a sync and an async caller never both
+        create a company; only one coroutine per loop waits for it in a thread.
+        """
+        company_id = await asyncio.to_thread(self.company_id, company_name)
+        if company_id is not None:
+            return company_id
+        async with self._async_company_lock():
+            await self._acquire_company_lock()
+            try:
+                company_id = await asyncio.to_thread(self.company_id, company_name)
+                if company_id is None:
+                    company_id = await create(company_name)
+                    await asyncio.to_thread(
+                        self._remember_company, company_name, company_id
+                    )
+                return company_id
+            finally:
+                self._company_lock.release()
+
+    async def _acquire_company_lock(self):
+        acquire = asyncio.ensure_future(asyncio.to_thread(self._company_lock.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # the thread still takes the lock; give it back once it has
+            acquire.add_done_callback(lambda _: self._company_lock.release())
+            raise
+
+    def _async_company_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._async_locks_lock:
+            lock = self._async_locks.get(loop)
+            if lock is None:
+                lock = self._async_locks[loop] = asyncio.Lock()
+            return lock
+
+    def _remember_company(self, company_name: str, company_id: Any):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO company VALUES (?, ?, ?)",
+                (
+                    normalize_company_name(company_name),
+                    company_name,
+                    json.dumps(company_id),
+                ),
+            )
+
+    def new_contacts(
+        self, company_name: str, contacts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Drop contacts that were already stored or repeat within ``contacts``."""
+        company_key = normalize_company_name(company_name)
+        seen = set()
+        fresh = []
+        with closing(self._connect()) as conn:
+            for contact in contacts:
+                keys = contact_keys(company_key, contact)
+                if seen.intersection(keys):
+                    continue
+                seen.update(keys)
+                known = keys and conn.execute(
+                    f"SELECT 1 FROM contact_key WHERE contact_key IN ({','.join('?' * len(keys))})",
+                    keys,
+                ).fetchone()
+                if not known:
+                    fresh.append(contact)
+        return fresh
+
+    def remember_contacts(self, company_name: str, contacts: List[Dict[str, Any]]):
+        company_key = normalize_company_name(company_name)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO contact_key VALUES (?, ?)",
+                [
+                    (key, company_key)
+                    for contact in contacts
+                    for key in contact_keys(company_key, contact)
+                ],
+            )
+
+
+_indexes: Dict[str, ContactIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_contact_index(path: str) -> ContactIndex:
+    """Return the process-wide contact index stored at ``path``."""
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = ContactIndex(path)
+        return _indexes[path]
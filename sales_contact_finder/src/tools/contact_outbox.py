@@ -0,0 +1,341 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+
+from src.tools.contact_index import ContactIndex
+from src.tools.gibson_client import GibsonAIClient
+
+DEFAULT_OUTBOX_PATH = "tmp/contact_outbox.db"
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_BACKOFF = 300.0
+DEFAULT_MAX_ATTEMPTS = 10
+
+# client errors that a retry cannot fix; 408 and 429 are worth retrying
+_RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT NOT NULL,
+    company_id TEXT,
+    contacts TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending'
+)
+"""
+
+
+def _is_permanent(status_code: Optional[int]) -> bool:
+    return (
+        status_code is not None
+        and 400 <= status_code < 500
+        and status_code not in _RETRYABLE_CLIENT_ERRORS
+    )
+
+
+class ContactOutbox:
+    """Durable write-behind queue between ContactStorageTool and the GibsonAI API.
+
+    Payloads are appended to a SQLite file in WAL mode and drained by a background
+    flusher thread. A row is only deleted once the company and every contact in it
+    have been stored, so a crashed or interrupted run resumes from whatever is left
+    in the file. Delivery is at-least-once: a crash between a successful POST and
+    the row update can replay that POST.
+
+    Contacts rejected with a client error (4xx other than 408 and 429), and rows
+    still failing after ``max_attempts`` tries, are not retried again: they are
+    kept in the file with status ``failed`` and reported in the logs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client: GibsonAIClient,
+        index: Optional[ContactIndex] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.client = client
+        self.index = index
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max(1, max_attempts)
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            columns = {
+                column["name"]
+                for column in conn.execute("PRAGMA table_info(contact_outbox)")
+            }
+            if "status" not in columns:
+                # outbox files written before failed rows were kept apart
+                conn.execute(
+                    "ALTER TABLE contact_outbox"
+                    " ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'"
+                )
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def append(self, company_name: str, contacts: List[Dict[str, Any]]) -> int:
+        """Queue a company and its contacts; returns the outbox entry id."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO contact_outbox (company_name, contacts, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (company_name, json.dumps(contacts), now, now),
+            )
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def pending(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM contact_outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def failed(self) -> List[Dict[str, Any]]:
+        """Entries that will not be retried, with the error that stopped them."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, company_name, contacts, attempts, last_error"
+                " FROM contact_outbox WHERE status = 'failed' ORDER BY id"
+            ).fetchall()
+        return [
+            {**dict(row), "contacts": json.loads(row["contacts"])} for row in rows
+        ]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.poll_interval * (2**attempts))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _deliver(self, row: sqlite3.Row):
+        company_id = None if row["company_id"] is None else json.loads(row["company_id"])
+        contacts = json.loads(row["contacts"])
+        # contacts to try again later and contacts no retry will store
+        retry: List[Dict[str, Any]] = []
+        dead: List[Dict[str, Any]] = []
+        retry_error = dead_error = None
+        try:
+            if company_id is None and self.index is not None:
+                company_id = self.index.resolve_company_id(
+                    row["company_name"], self.client.create_company
+                )
+            elif company_id is None:
+                company_id = self.client.create_company(row["company_name"])
+            results = self.client.create_contacts(company_id, contacts)
+            if self.index is not None:
+                # only now are these contacts stored; later calls may skip them
+                self.index.remember_contacts(
+                    row["company_name"],
+                    [
+                        contact
+                        for contact, result in zip(contacts, results)
+                        if result["stored"]
+                    ],
+                )
+            for contact, result in zip(contacts, results):
+                if result["stored"]:
+                    continue
+                if _is_permanent(result["status_code"]):
+                    dead.append(contact)
+                    dead_error = dead_error or result["error"]
+                else:
+                    retry.append(contact)
+                    retry_error = retry_error or result["error"]
+        except Exception as e:
+            status_code = getattr(getattr(e, "response", None), "status_code", None)
+            if _is_permanent(status_code):
+                dead, dead_error = contacts, str(e)
+            else:
+                retry, retry_error = contacts, str(e)
+
+        attempts = row["attempts"] + 1
+        if retry and attempts >= self.max_attempts:
+            dead, retry = dead + retry, []
+            dead_error = dead_error or retry_error
+
+        with closing(self._connect()) as conn, conn:
+            company = None if company_id is None else json.dumps(company_id)
+            if retry:
+                # keep only what still has to be written, remembering the company id
+                conn.execute(
+                    "UPDATE contact_outbox SET company_id = ?, contacts = ?, attempts = ?,"
+                    " next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (
+                        company,
+                        json.dumps(retry),
+                        attempts,
+                        time.time() + self._backoff(attempts),
+                        retry_error,
+                        row["id"],
+                    ),
+                )
+            if dead and retry:
+                # the rejected contacts move to a failed row of their own
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO contact_outbox (company_name, company_id, contacts,"
+                    " attempts, next_attempt_at, last_error, created_at, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, 'failed')",
+                    (
+                        row["company_name"],
+                        company,
+                        json.dumps(dead),
+                        attempts,
+                        now,
+                        dead_error,
+                        now,
+                    ),
+                )
+            elif dead:
+                conn.execute(
+                    "UPDATE contact_outbox SET company_id = ?, contacts = ?, attempts = ?,"
+                    " last_error = ?, status = 'failed' WHERE id = ?",
+                    (company, json.dumps(dead), attempts, dead_error, row["id"]),
+                )
+            elif not retry:
+                conn.execute("DELETE FROM contact_outbox WHERE id = ?", (row["id"],))
+                print(
+                    f"Flushed company {row['company_name']} with "
+                    f"{len(contacts)} contacts to API"
+                )
+                return
+        if dead:
+            print(
+                f"Gave up on {len(dead)} contacts of company {row['company_name']} "
+                f"after {attempts} attempts, kept as failed in {self.path}: {dead_error}"
+            )
+        if retry:
+            print(
+                f"Failed to flush company {row['company_name']} "
+                f"(attempt {attempts}), retrying later: {retry_error}"
+            )
+
+    def flush_once(self) -> int:
+        """Deliver one batch of due entries and return how many were attempted."""
+        with self._lock:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT * FROM contact_outbox WHERE status = 'pending'"
+                    " AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (time.time(), self.batch_size),
+                ).fetchall()
+            for row in rows:
+                self._deliver(row)
+            return len(rows)
+
+    def _flush_loop(self):
+        while not self._stopping.is_set():
+            try:
+                if self.flush_once():
+                    continue
+            except Exception as e:
+                print(f"Contact outbox flusher error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        """Start the background flusher; pending entries from earlier runs resume."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="contact-outbox-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def drain(self, timeout: float) -> int:
+        """Keep delivering for up to ``timeout`` seconds; returns entries left pending."""
+        deadline = time.time() + timeout
+        while self.pending() and time.time() < deadline:
+            if not self.flush_once():
+                time.sleep(min(self.poll_interval, max(0.0, deadline - time.time())))
+        return self.pending()
+
+
+_outboxes: Dict[str, ContactOutbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(
+    path: str,
+    client_factory: Callable[[], GibsonAIClient],
+    index: Optional[ContactIndex] = None,
+) -> ContactOutbox:
+    """Return the process-wide outbox for ``path``, starting its flusher on first use."""
+    path = os.path.abspath(path)
+    with _outboxes_lock:
+        outbox = _outboxes.get(path)
+        if outbox is None:
+            outbox = ContactOutbox(
+                path,
+                client_factory(),
+                index=index,
+                batch_size=int(
+                    os.getenv("GIBSONAI_OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+                ),
+                max_attempts=int(
+                    os.getenv("GIBSONAI_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+                ),
+            )
+            outbox.start()
+            _outboxes[path] = outbox
+        return outbox
+
+
+def drain_outboxes(timeout: Optional[float] = None):
+    """Give every open outbox up to ``timeout`` seconds to deliver what is due.
+
+    Anything still pending afterwards stays on disk and is picked up by the next run.
+    Entries that failed for good are listed so they do not go unnoticed.
+    """
+    if timeout is None:
+        timeout = float(os.getenv("GIBSONAI_OUTBOX_DRAIN_TIMEOUT", 30))
+    with _outboxes_lock:
+        outboxes = list(_outboxes.values())
+    for outbox in outboxes:
+        left = outbox.drain(timeout)
+        if left:
+            print(f"{left} contact outbox entries still pending in {outbox.path}")
+        failed = outbox.failed()
+        if failed:
+            print(f"{len(failed)} contact outbox entries failed in {outbox.path}:")
+            for entry in failed:
+                print(
+                    f"- {entry['company_name']}: {len(entry['contacts'])} contacts, "
+                    f"{entry['attempts']} attempts, last error: {entry['last_error']}"
+                )
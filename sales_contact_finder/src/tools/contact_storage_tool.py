@@ -1,13 +1,25 @@
+import asyncio
 import json
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
-from dotenv import load_dotenv
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from crewai.tools import BaseTool
-
-load_dotenv()  # Load environment variables from .env
+from src.tools.contact_index import (
+    DEFAULT_INDEX_PATH,
+    ContactIndex,
+    get_contact_index,
+)
+from src.tools.contact_outbox import DEFAULT_OUTBOX_PATH, get_outbox
+from src.tools.gibson_client import (
+    DEFAULT_API_BASE_URL,
+    DEFAULT_MAX_CONCURRENCY,
+    GibsonAIClient,
+    format_store_result,
+    get_async_client,
+)
+from src.tracing import get_tracer
 
 
 class ContactStorageTool(BaseTool):
@@ -22,59 +34,198 @@ class ContactStorageTool(BaseTool):
     api_key: str = Field(
         description="The API key associated with your GibsonAI project"
     )
+    max_concurrency: int = Field(
+        default=DEFAULT_MAX_CONCURRENCY,
+        description="Maximum number of contacts inserted concurrently",
+    )
+    write_behind: bool = Field(
+        default=True,
+        description="Queue payloads in a local outbox instead of waiting on the API",
+    )
+    outbox_path: str = Field(
+        default=DEFAULT_OUTBOX_PATH,
+        description="SQLite file backing the write-behind outbox",
+    )
+    dedupe: bool = Field(
+        default=True,
+        description="Skip known companies and already stored contacts",
+    )
+    index_path: str = Field(
+        default=DEFAULT_INDEX_PATH,
+        description="SQLite file holding the company id cache and contact index",
+    )
+
+    _client: GibsonAIClient = PrivateAttr()
 
     def __init__(self):
-        self.api_base_url = "https://api.gibsonai.com/v1/-"
-        self.api_key = os.getenv("GIBSONAI_API_KEY")
+        api_key = os.getenv("GIBSONAI_API_KEY")
 
-        if not self.api_key:
+        if not api_key:
             raise ValueError("Missing GIBSONAI_API_KEY environment variable")
 
-        super().__init__()
+        super().__init__(
+            api_base_url=os.getenv("GIBSONAI_API_BASE_URL", DEFAULT_API_BASE_URL),
+            api_key=api_key,
+            max_concurrency=int(
+                os.getenv("GIBSONAI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+            ),
+            write_behind=os.getenv("GIBSONAI_WRITE_BEHIND", "true").lower()
+            not in ("0", "false", "no"),
+            outbox_path=os.getenv("GIBSONAI_OUTBOX_PATH", DEFAULT_OUTBOX_PATH),
+            dedupe=os.getenv("GIBSONAI_DEDUPE", "true").lower()
+            not in ("0", "false", "no"),
+            index_path=os.getenv("GIBSONAI_INDEX_PATH", DEFAULT_INDEX_PATH),
+        )
+        if not self.write_behind:
+            self._client = self._new_client()
+
+    def _new_client(self) -> GibsonAIClient:
+        return GibsonAIClient(
+            api_key=self.api_key,
+            api_base_url=self.api_base_url,
+            max_concurrency=self.max_concurrency,
+        )
+
+    def _index(self) -> Optional[ContactIndex]:
+        return get_contact_index(self.index_path) if self.dedupe else None
 
     def _run(self, contact_info: str) -> str:
+        with get_tracer().span(
+            "tool", self.name, input_bytes=len(str(contact_info).encode("utf-8"))
+        ) as span:
+            result = self._store(contact_info)
+            span.set(output_bytes=len(result.encode("utf-8")))
+        return result
+
+    async def _arun(self, contact_info: str) -> str:
+        """Store contacts without blocking the event loop on the GibsonAI API.
+
+        The async HTTP client is only used when ``GIBSONAI_WRITE_BEHIND=false``;
+        with write-behind on, the payload is handed to the outbox and its flusher
+        thread talks to the API. The SQLite work for the dedupe index and the
+        outbox runs in a worker thread either way.
+        """
+        with get_tracer().span(
+            "tool", self.name, input_bytes=len(str(contact_info).encode("utf-8"))
+        ) as span:
+            result = await self._astore(contact_info)
+            span.set(output_bytes=len(result.encode("utf-8")))
+        return result
+
+    def _store(self, contact_info: str) -> str:
         try:
-            # Parse the contact info if it's a string
-            if isinstance(contact_info, str):
-                contact_data = json.loads(contact_info)
-            else:
-                contact_data = contact_info
-
-            company_name = contact_data["company_name"]
-            contacts = contact_data["contacts"]
-
-            # insert company name to the database
-            company_payload = {"name": company_name}
-            response = requests.post(
-                f"{self.api_base_url}/sales-company",
-                json=company_payload,
-                headers={"X-Gibson-API-Key": self.api_key},
-            )
-            response.raise_for_status()
-            print(f"Successfully posted company to API: {response.status_code}")
-
-            company_id = response.json()["id"]
-
-            # now insert contacts to the database
-            for contact in contacts:
-                contact_payload = {
-                    "company_id": company_id,
-                    "name": contact["name"],
-                    "title": contact["title"],
-                    "linkedin_url": contact["linkedin_url"],
-                    "phone": contact["phone"],
-                    "email": contact["email"],
-                }
-                response = requests.post(
-                    f"{self.api_base_url}/sales-contact",
-                    json=contact_payload,
-                    headers={"X-Gibson-API-Key": self.api_key},
+            company_name, contacts, index, message = self._prepare(contact_info)
+            if message is not None:
+                return message
+
+            # insert the company unless its id is cached, then fan the contacts
+            # out over the pooled session
+            company_id = None
+            if index is not None:
+                company_id = index.resolve_company_id(
+                    company_name, self._client.create_company
                 )
-                print(
-                    f"Successfully posted contact {contact['name']} to API: {response.status_code}"
+            result = self._client.store(company_name, contacts, company_id)
+            return self._report(contacts, index, result)
+
+        except json.JSONDecodeError:
+            return "Failed to parse contact information. Please ensure it's in valid JSON format."
+        except Exception as e:
+            return f"Failed to post contact to API: {str(e)}"
+
+    async def _astore(self, contact_info: str) -> str:
+        try:
+            # the index lookups and the outbox append may wait on SQLite locks
+            company_name, contacts, index, message = await asyncio.to_thread(
+                self._prepare, contact_info
+            )
+            if message is not None:
+                return message
+
+            # same flow as _store, with the contact inserts gathered on the
+            # shared async client instead of a thread pool
+            client = get_async_client(
+                self.api_key, self.api_base_url, self.max_concurrency
+            )
+            company_id = None
+            if index is not None:
+                company_id = await index.aresolve_company_id(
+                    company_name, client.create_company
                 )
+            result = await client.store(company_name, contacts, company_id)
+            return await asyncio.to_thread(self._report, contacts, index, result)
 
         except json.JSONDecodeError:
             return "Failed to parse contact information. Please ensure it's in valid JSON format."
         except Exception as e:
             return f"Failed to post contact to API: {str(e)}"
+
+    def _prepare(
+        self, contact_info: str
+    ) -> Tuple[str, List[Dict[str, Any]], Optional[ContactIndex], Optional[str]]:
+        """Parse and dedupe a payload, queueing it when write-behind is on.
+
+        Returns the company name, the contacts still to be written, the index and,
+        when nothing is left for the caller to send, the message to return.
+        """
+        # Parse the contact info if it's a string
+        if isinstance(contact_info, str):
+            contact_data = json.loads(contact_info)
+        else:
+            contact_data = contact_info
+
+        company_name = contact_data["company_name"]
+        contacts = contact_data["contacts"]
+
+        # drop contacts that an earlier call or run already stored
+        index = self._index()
+        if index is not None:
+            skipped = len(contacts)
+            contacts = index.new_contacts(company_name, contacts)
+            skipped -= len(contacts)
+            if not contacts:
+                return (
+                    company_name,
+                    contacts,
+                    index,
+                    f"All {skipped} contacts for '{company_name}' are already "
+                    "stored; nothing to write.",
+                )
+            if skipped:
+                print(f"Skipping {skipped} duplicate contacts")
+
+        if self.write_behind:
+            # hand the payload to the outbox; its flusher talks to the API
+            outbox = get_outbox(self.outbox_path, self._new_client, index)
+            # the flusher records the contacts in the index once they are stored
+            entry_id = outbox.append(company_name, contacts)
+            return (
+                company_name,
+                contacts,
+                index,
+                f"Queued company '{company_name}' with {len(contacts)} contacts "
+                f"for storage (outbox entry {entry_id}).",
+            )
+
+        return company_name, contacts, index, None
+
+    def _report(
+        self,
+        contacts: List[Dict[str, Any]],
+        index: Optional[ContactIndex],
+        result: Dict[str, Any],
+    ) -> str:
+        if index is not None:
+            index.remember_contacts(
+                result["company_name"],
+                [
+                    contact
+                    for contact, outcome in zip(contacts, result["contacts"])
+                    if outcome["stored"]
+                ],
+            )
+        print(
+            f"Posted company {result['company_name']} and "
+            f"{len(result['contacts'])} contacts to API"
+        )
+        return format_store_result(result)
@@ -0,0 +1,197 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.tracing import CHARS_PER_TOKEN, annotate, estimate_tokens
+
+DEFAULT_TOKEN_BUDGET = 2000
+PASSAGE_WORDS = 60
+MIN_LINE_WORDS = 4
+MIN_PARTIAL_CHARS = 200
+
+# sales-relevant vocabulary that is always worth keeping next to the crew inputs
+DEFAULT_FOCUS_TERMS = (
+    "ceo",
+    "cto",
+    "cio",
+    "cfo",
+    "coo",
+    "vp",
+    "vice president",
+    "head of",
+    "director",
+    "founder",
+    "leadership",
+    "team",
+    "customers",
+    "revenue",
+    "employees",
+    "funding",
+    "acquisition",
+    "launch",
+    "partnership",
+    "technology",
+    "platform",
+    "digital transformation",
+)
+
+_BOILERPLATE = re.compile(
+    r"\b(?:cookies?|privacy policy|terms of (?:use|service)|all rights reserved"
+    r"|copyright|subscribe to|newsletters?|sign (?:in|up)|log ?in"
+    r"|skip to (?:main )?content|accept all|javascript|follow us|back to top)\b|©",
+    re.IGNORECASE,
+)
+# ends of sentences, and the separators of flattened menus and footers
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\s+[|·•]\s+")
+
+
+def _content_lines(text: str) -> Iterator[str]:
+    """Yield lines with the sentences that look like navigation or boilerplate removed.
+
+    Short lines (menu entries, buttons) are dropped whole. Longer lines are
+    filtered sentence by sentence, so a page flattened into a single line keeps
+    its content when only its cookie banner or footer is boilerplate.
+    """
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if len(line.split()) < MIN_LINE_WORDS:
+            continue
+        sentences = [
+            sentence
+            for sentence in _SENTENCE_BREAK.split(line)
+            if not _BOILERPLATE.search(sentence)
+        ]
+        if sentences:
+            yield " ".join(sentences)
+
+
+def _passages(lines: Iterable[str]) -> Iterator[str]:
+    """Group consecutive content lines into passages of roughly PASSAGE_WORDS words."""
+    passage: List[str] = []
+    words = 0
+    for line in lines:
+        passage.append(line)
+        words += len(line.split())
+        if words >= PASSAGE_WORDS:
+            yield " ".join(passage)
+            passage, words = [], 0
+    if passage:
+        yield " ".join(passage)
+
+
+class ContentReducer:
+    """Shrinks scraped pages before they reach an agent's context.
+
+    Pages are streamed line by line through a sentence-level boilerplate filter,
+    grouped into passages, deduplicated against the passages already returned to
+    the same task, ranked by overlap with the focus terms and cut to
+    ``token_budget`` tokens. A page the filter would empty completely is passed
+    on as plain text cut to the budget instead.
+    The product is left out of the focus of ``product_neutral_tasks``, whose
+    outputs are reused across products.
+    Tokens in and out are tracked per task so the savings can be reported.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        product_neutral_tasks: Iterable[str] = (),
+    ):
+        self.token_budget = token_budget or int(
+            os.getenv("SCRAPE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)
+        )
+        self.product_neutral_tasks = frozenset(product_neutral_tasks)
+        self.focus_terms = list(DEFAULT_FOCUS_TERMS)
+        self.product_terms: List[str] = []
+        self._seen: Dict[str, set] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def set_focus(self, *texts: str, product: str = ""):
+        """Rank passages mentioning any of ``texts`` (e.g. the crew inputs) first.
+
+        ``product`` counts as a focus term too, except for product-neutral tasks.
+        """
+        terms = [" ".join(text.casefold().split()) for text in texts if text]
+        self.focus_terms = terms + list(DEFAULT_FOCUS_TERMS)
+        self.product_terms = [" ".join(product.casefold().split())] if product else []
+
+    def _score(self, passage: str, task: str) -> float:
+        terms = self.focus_terms
+        if task not in self.product_neutral_tasks:
+            terms = terms + self.product_terms
+        lowered = passage.casefold()
+        hits = sum(lowered.count(term) for term in terms)
+        facts = len(re.findall(r"\d", passage)) > 0
+        return (hits + 0.5 * facts) / math.sqrt(len(passage.split()))
+
+    def reduce(self, text: str, task: Optional[str] = None) -> str:
+        task = task or "unknown"
+        with self._lock:
+            seen = self._seen.setdefault(task, set())
+            passages = []
+            repeated = 0
+            for passage in _passages(_content_lines(text)):
+                digest = hashlib.sha1(passage.casefold().encode("utf-8")).digest()
+                if digest in seen:
+                    repeated += 1
+                else:
+                    passages.append((digest, passage))
+
+            # keep the best scoring passages that fit the budget, in page order
+            budget = self.token_budget * CHARS_PER_TOKEN
+            kept: Dict[int, str] = {}
+            for index in sorted(
+                range(len(passages)),
+                key=lambda i: self._score(passages[i][1], task),
+                reverse=True,
+            ):
+                # every passage after the first also costs its "\n\n" separator
+                room = budget - (2 if kept else 0)
+                if room <= 0:
+                    break
+                passage = passages[index][1]
+                if len(passage) > room:
+                    # cut the passage at a word boundary if a useful part still fits
+                    passage = passage[:room].rsplit(" ", 1)[0]
+                    if len(passage) < MIN_PARTIAL_CHARS:
+                        continue
+                kept[index] = passage
+                budget = room - len(passage)
+            seen.update(passages[i][0] for i in kept)
+            reduced = "\n\n".join(kept[i] for i in sorted(kept))
+            if not reduced and repeated:
+                reduced = "This page only repeats content that was already returned."
+            elif not reduced:
+                # nothing looked like content; the raw text beats an empty page
+                budget = self.token_budget * CHARS_PER_TOKEN
+                reduced = " ".join(text.split())
+                if len(reduced) > budget:
+                    reduced = reduced[:budget].rsplit(" ", 1)[0]
+
+            stats = self._stats.setdefault(
+                task, {"pages": 0, "tokens_in": 0, "tokens_out": 0}
+            )
+            tokens_in, tokens_out = estimate_tokens(text), estimate_tokens(reduced)
+            stats["pages"] += 1
+            stats["tokens_in"] += tokens_in
+            stats["tokens_out"] += tokens_out
+        annotate(scraped_tokens=tokens_in, reduced_tokens=tokens_out)
+        return reduced
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {task: dict(stats) for task, stats in self._stats.items()}
+
+    def report(self) -> str:
+        lines = []
+        for task, stats in self.stats().items():
+            saved = 1 - stats["tokens_out"] / max(stats["tokens_in"], 1)
+            lines.append(
+                f"{task}: {stats['pages']} pages, {stats['tokens_in']} tokens in, "
+                f"{stats['tokens_out']} tokens out ({saved:.0%} saved)"
+            )
+        return "\n".join(lines) or "No pages scraped"
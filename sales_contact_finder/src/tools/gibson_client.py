@@ -0,0 +1,278 @@
+import asyncio
+import contextvars
+import json
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.tracing import get_tracer
+
+DEFAULT_API_BASE_URL = "https://api.gibsonai.com/v1/-"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30
+
+CONTACT_FIELDS = ("name", "title", "linkedin_url", "phone", "email")
+
+
+class GibsonAIClient:
+    """Client for the GibsonAI hosted data API.
+
+    A single pooled ``requests.Session`` is kept for the lifetime of the client, so
+    connections and headers are reused across calls, and contact inserts are fanned
+    out over a bounded thread pool.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base_url: str = DEFAULT_API_BASE_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.api_base_url = api_base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({"X-Gibson-API-Key": api_key})
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_concurrency, pool_block=True
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="gibson-insert"
+        )
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> requests.Response:
+        body = json.dumps(payload)
+        with get_tracer().span(
+            "http", f"POST {path}", request_bytes=len(body.encode("utf-8"))
+        ) as span:
+            response = self.session.post(
+                f"{self.api_base_url}/{path}",
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            span.set(
+                status_code=response.status_code,
+                response_bytes=len(response.content),
+            )
+            response.raise_for_status()
+        return response
+
+    def create_company(self, company_name: str) -> Any:
+        """Insert a ``sales-company`` row and return its id."""
+        response = self._post("sales-company", {"name": company_name})
+        return response.json()["id"]
+
+    def create_contact(self, company_id: Any, contact: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a single ``sales-contact`` row and report its outcome."""
+        payload = {"company_id": company_id}
+        payload.update({field: contact.get(field) for field in CONTACT_FIELDS})
+        try:
+            response = self._post("sales-contact", payload)
+        except requests.RequestException as e:
+            return {
+                "name": contact.get("name"),
+                "stored": False,
+                "status_code": getattr(e.response, "status_code", None),
+                "error": str(e),
+            }
+        return {
+            "name": contact.get("name"),
+            "stored": True,
+            "status_code": response.status_code,
+            "error": None,
+        }
+
+    def create_contacts(
+        self, company_id: Any, contacts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Insert contacts concurrently; results keep the order of ``contacts``."""
+        # each insert runs in a copy of the caller's context so its HTTP span nests
+        # under the tool call that made it
+        futures = [
+            self._executor.submit(
+                contextvars.copy_context().run, self.create_contact, company_id, contact
+            )
+            for contact in contacts
+        ]
+        return [future.result() for future in futures]
+
+    def store(
+        self,
+        company_name: str,
+        contacts: List[Dict[str, Any]],
+        company_id: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """Insert a company, unless its ``company_id`` is known, then its contacts."""
+        if company_id is None:
+            company_id = self.create_company(company_name)
+        return {
+            "company_name": company_name,
+            "company_id": company_id,
+            "contacts": self.create_contacts(company_id, contacts),
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+
+class AsyncGibsonAIClient:
+    """Asyncio counterpart of GibsonAIClient built on a shared ``httpx.AsyncClient``.
+
+    Connections are capped at ``max_concurrency`` by the client's pool limits, and
+    contact inserts are gathered as coroutines instead of occupying threads. Results
+    and error reporting match the synchronous client.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base_url: str = DEFAULT_API_BASE_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.api_base_url = api_base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.client = httpx.AsyncClient(
+            headers={"X-Gibson-API-Key": api_key},
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            # requests wait for a free connection as long as they need to, like
+            # the blocking pool of the sync client
+            timeout=httpx.Timeout(timeout, pool=None),
+        )
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        body = json.dumps(payload)
+        with get_tracer().span(
+            "http", f"POST {path}", request_bytes=len(body.encode("utf-8"))
+        ) as span:
+            response = await self.client.post(
+                f"{self.api_base_url}/{path}",
+                content=body,
+                headers={"Content-Type": "application/json"},
+            )
+            span.set(
+                status_code=response.status_code,
+                response_bytes=len(response.content),
+            )
+            response.raise_for_status()
+        return response
+
+    async def create_company(self, company_name: str) -> Any:
+        """Insert a ``sales-company`` row and return its id."""
+        response = await self._post("sales-company", {"name": company_name})
+        return response.json()["id"]
+
+    async def create_contact(
+        self, company_id: Any, contact: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Insert a single ``sales-contact`` row and report its outcome."""
+        payload = {"company_id": company_id}
+        payload.update({field: contact.get(field) for field in CONTACT_FIELDS})
+        try:
+            response = await self._post("sales-contact", payload)
+        except httpx.HTTPStatusError as e:
+            response = e.response
+            # word it like requests' HTTPError so both paths report failures alike
+            kind = "Client" if response.status_code < 500 else "Server"
+            return {
+                "name": contact.get("name"),
+                "stored": False,
+                "status_code": response.status_code,
+                "error": f"{response.status_code} {kind} Error: "
+                f"{response.reason_phrase} for url: {response.url}",
+            }
+        except httpx.HTTPError as e:
+            return {
+                "name": contact.get("name"),
+                "stored": False,
+                "status_code": None,
+                "error": str(e),
+            }
+        return {
+            "name": contact.get("name"),
+            "stored": True,
+            "status_code": response.status_code,
+            "error": None,
+        }
+
+    async def create_contacts(
+        self, company_id: Any, contacts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Insert contacts concurrently; results keep the order of ``contacts``."""
+        return list(
+            await asyncio.gather(
+                *(self.create_contact(company_id, contact) for contact in contacts)
+            )
+        )
+
+    async def store(
+        self,
+        company_name: str,
+        contacts: List[Dict[str, Any]],
+        company_id: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """Insert a company, unless its ``company_id`` is known, then its contacts."""
+        if company_id is None:
+            company_id = await self.create_company(company_name)
+        return {
+            "company_name": company_name,
+            "company_id": company_id,
+            "contacts": await self.create_contacts(company_id, contacts),
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# httpx connections belong to the event loop that opened them, so the shared
+# clients are kept per loop and dropped with it
+_async_clients: "weakref.WeakKeyDictionary[Any, Dict[Tuple, AsyncGibsonAIClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_async_clients_lock = threading.Lock()
+
+
+def get_async_client(
+    api_key: str,
+    api_base_url: str = DEFAULT_API_BASE_URL,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> AsyncGibsonAIClient:
+    """Return the async client shared by every caller on the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = (api_key, api_base_url, max_concurrency)
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        if key not in clients:
+            clients[key] = AsyncGibsonAIClient(api_key, api_base_url, max_concurrency)
+        return clients[key]
+
+
+def format_store_result(result: Dict[str, Any]) -> str:
+    """Render a store result as a per-contact report for the agent."""
+    contacts = result.get("contacts", [])
+    stored = sum(1 for contact in contacts if contact["stored"])
+    lines = [
+        f"Stored company '{result['company_name']}' (id {result['company_id']}).",
+        f"Stored {stored} of {len(contacts)} contacts:",
+    ]
+    for contact in contacts:
+        if contact["stored"]:
+            lines.append(f"- {contact['name']}: stored ({contact['status_code']})")
+        else:
+            lines.append(f"- {contact['name']}: failed ({contact['error']})")
+    return "\n".join(lines)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.tracing import annotate
+
+DEFAULT_CACHE_PATH = "tmp/tool_cache.db"
+DEFAULT_TTL_HOURS = 24.0
+DEFAULT_MAX_MB = 256.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tool_cache (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    args TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: lowercase host, no fragment, tracking params or trailing slash."""
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[len("www.") :]
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_")
+        )
+    )
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            netloc,
+            parts.path.rstrip("/") or "/",
+            query,
+            "",
+        )
+    )
+
+
+class ToolResultCache:
+    """Content-addressed on-disk cache for tool results.
+
+    Entries are keyed by a hash of the tool name and its normalized arguments,
+    expire after ``ttl_seconds`` and are evicted least-recently-used first once
+    the cache grows past ``max_bytes``. The cache is a SQLite file in WAL mode, so
+    it can be shared by every agent in a crew, every crew in a batch, and
+    concurrent processes.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS tool_cache_accessed_at ON tool_cache (accessed_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(tool: str, args: Dict[str, Any]) -> str:
+        payload = json.dumps([tool, args], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, tool: str, args: Dict[str, Any]) -> Optional[Any]:
+        key = self.key(tool, args)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value FROM tool_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE tool_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        with self._stats_lock:
+            (self.misses if row is None else self.hits)[tool] += 1
+        return None if row is None else json.loads(row[0])
+
+    def put(self, tool: str, args: Dict[str, Any], value: Any):
+        value = json.dumps(value, default=str)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(tool, args),
+                    tool,
+                    json.dumps(args, sort_keys=True, default=str),
+                    value,
+                    len(value),
+                    now,
+                    now,
+                ),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM tool_cache WHERE created_at <= ?", (now - self.ttl_seconds,)
+        )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used entries until we are back under the budget
+        excess = total - self.max_bytes
+        for key, size in conn.execute(
+            "SELECT key, size FROM tool_cache ORDER BY accessed_at"
+        ).fetchall():
+            conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+    def get_or_run(self, tool: str, args: Dict[str, Any], run: Callable[[], Any]) -> Any:
+        cached = self.get(tool, args)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+        value = run()
+        if value:  # never cache empty results or failures reported as None
+            self.put(tool, args, value)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            return {
+                tool: {"hits": self.hits[tool], "misses": self.misses[tool]}
+                for tool in sorted(set(self.hits) | set(self.misses))
+            }
+
+    def report(self) -> str:
+        lines = []
+        for tool, counts in self.stats().items():
+            total = counts["hits"] + counts["misses"]
+            lines.append(
+                f"{tool}: {counts['hits']}/{total} cache hits "
+                f"({counts['hits'] / total:.0%})"
+            )
+        return "\n".join(lines) or "Tool cache unused"
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache configured from the environment."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolResultCache(
+                os.getenv("TOOL_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(os.getenv("TOOL_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS))
+                * 3600,
+                max_bytes=int(
+                    float(os.getenv("TOOL_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+                ),
+            )
+        return _cache
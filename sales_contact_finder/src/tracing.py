@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_TRACE_FILE = "tmp/trace.jsonl"
+DEFAULT_METRICS_FILE = "tmp/metrics.prom"
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: Any) -> int:
+    """Rough token count (4 characters per token) for strings and message lists."""
+    if not isinstance(text, str):
+        text = json.dumps(text, default=str)
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class Span:
+    """A timed unit of work: a task, an LLM call, a tool call or an HTTP request."""
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.kind = kind
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            **self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Records spans to a JSONL trace file and aggregates them into metrics.
+
+    Spans nest through a context variable, so tool, LLM and HTTP spans opened while
+    a task runs become its children. Metrics are written in the Prometheus text
+    format: span counts and durations per kind and name, plus totals of every
+    ``*_tokens`` and ``*_bytes`` attribute.
+    """
+
+    def __init__(self, trace_file: str, metrics_file: str, enabled: bool = True):
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._totals: Dict[Tuple[str, str, str], float] = defaultdict(float)
+
+        for path in (trace_file, metrics_file):
+            directory = os.path.dirname(path)
+            if enabled and directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def start_span(
+        self, kind: str, name: str, trace_id: Optional[str] = None, **attributes: Any
+    ) -> Tuple[Span, Any]:
+        parent = _current_span.get()
+        span = Span(
+            kind,
+            name,
+            trace_id or (parent.trace_id if parent else uuid.uuid4().hex),
+            parent.span_id if parent else None,
+            attributes,
+        )
+        return span, _current_span.set(span)
+
+    def end_span(self, span: Span, token: Any, error: Optional[BaseException] = None):
+        _current_span.reset(token)
+        span.duration_ms = round((time.perf_counter() - span._started) * 1000, 2)
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        if not self.enabled:
+            return
+
+        record = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+            key = (span.kind, span.name)
+            self._counts[key + ("error" if span.error else "ok",)] += 1
+            self._seconds[key] += span.duration_ms / 1000
+            for attribute, value in span.attributes.items():
+                if attribute.endswith(("_tokens", "_bytes")) and isinstance(
+                    value, (int, float)
+                ):
+                    self._totals[key + (attribute,)] += value
+
+    @contextmanager
+    def span(
+        self, kind: str, name: str, trace_id: Optional[str] = None, **attributes: Any
+    ) -> Iterator[Span]:
+        span, token = self.start_span(kind, name, trace_id, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, token, e)
+            raise
+        self.end_span(span, token)
+
+    def metrics(self) -> str:
+        def labels(kind: str, name: str) -> str:
+            return f'kind="{kind}",name="{name}"'
+
+        lines: List[str] = ["# TYPE sales_finder_spans_total counter"]
+        with self._lock:
+            for (kind, name, status), count in sorted(self._counts.items()):
+                lines.append(
+                    f'sales_finder_spans_total{{{labels(kind, name)},status="{status}"}} {count}'
+                )
+            lines.append("# TYPE sales_finder_span_seconds_total counter")
+            for (kind, name), seconds in sorted(self._seconds.items()):
+                lines.append(
+                    f"sales_finder_span_seconds_total{{{labels(kind, name)}}} {seconds:.3f}"
+                )
+            typed = set()
+            for (kind, name, attribute), total in sorted(
+                self._totals.items(), key=lambda item: (item[0][2], item[0][:2])
+            ):
+                metric = f"sales_finder_{attribute}_total"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{{{labels(kind, name)}}} {total:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self):
+        if not self.enabled:
+            return
+        with open(self.metrics_file, "w", encoding="utf-8") as f:
+            f.write(self.metrics())
+
+
+def annotate(**attributes: Any):
+    """Add attributes to the span that is currently open, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer configured from the environment."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE),
+                os.getenv("METRICS_FILE", DEFAULT_METRICS_FILE),
+                enabled=os.getenv("TRACING", "true").lower()
+                not in ("0", "false", "no"),
+            )
+        return _tracer
+
+
+_llm_spans = threading.local()
+_llm_instrumented = False
+
+
+def instrument_llm_calls():
+    """Open a span around every LLM call the crew makes, via crewai's event bus."""
+    global _llm_instrumented
+    with _tracer_lock:
+        if _llm_instrumented:
+            return
+        _llm_instrumented = True
+
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.llm_events import (
+        LLMCallCompletedEvent,
+        LLMCallFailedEvent,
+        LLMCallStartedEvent,
+    )
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_call_started(source, event):
+        stack = getattr(_llm_spans, "stack", None)
+        if stack is None:
+            stack = _llm_spans.stack = []
+        stack.append(
+            get_tracer().start_span(
+                "llm",
+                getattr(source, "model", "llm"),
+                prompt_tokens=estimate_tokens(event.messages),
+                prompt_bytes=len(json.dumps(event.messages, default=str)),
+            )
+        )
+
+    def finish(error: Optional[Exception] = None, response: Any = None):
+        stack = getattr(_llm_spans, "stack", None)
+        if not stack:
+            return
+        span, token = stack.pop()
+        if response is not None:
+            span.set(
+                completion_tokens=estimate_tokens(response),
+                completion_bytes=len(str(response)),
+            )
+        get_tracer().end_span(span, token, error)
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_call_completed(source, event):
+        finish(response=event.response)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_call_failed(source, event):
+        finish(error=RuntimeError(event.error))
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+sys.path.insert(0, BENCHMARKS_DIR)
+# keep test runs out of the trace and metrics files
+os.environ.setdefault("TRACING", "false")
+
+from bench_contact_storage import FakeGibsonAI  # noqa: E402
+
+
+@pytest.fixture
+def gibson():
+    """Local stand-in for the GibsonAI data API."""
+    server = FakeGibsonAI()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,75 @@
+"""Task checkpoints: the SQLite store and what goes into a checkpoint key."""
+
+import time
+from types import SimpleNamespace
+
+from src.checkpoints import CheckpointedTask, CheckpointStore
+
+from crewai.tasks.task_output import TaskOutput
+
+
+def output(raw: str) -> TaskOutput:
+    return TaskOutput(
+        description="Profile", agent="Researcher", raw=raw, name="profile"
+    )
+
+
+def task(description: str = "Profile Acme") -> CheckpointedTask:
+    return CheckpointedTask(
+        name="profile", description=description, expected_output="A profile"
+    )
+
+
+def agent(**overrides) -> SimpleNamespace:
+    fields = dict(
+        role="Researcher",
+        goal="Research companies",
+        backstory="Analyst",
+        llm=SimpleNamespace(model="gpt-4o"),
+        tools=[SimpleNamespace(name="scrape"), SimpleNamespace(name="search")],
+    )
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+def test_store_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints" / "tasks.db"))
+    assert store.load("key") is None
+    store.save("key", output("Acme makes billing software."))
+    assert store.load("key").raw == "Acme makes billing software."
+    store.save("key", output("Acme makes invoicing software."))
+    assert store.load("key").raw == "Acme makes invoicing software."
+
+
+def test_store_skips_checkpoints_older_than_max_age(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "tasks.db"))
+    store.save("key", output("Acme"))
+    assert store.load("key", max_age=3600) is not None
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert store.load("key", max_age=3600) is None
+    assert store.load("key") is not None
+
+
+def test_key_is_stable_for_the_same_inputs():
+    assert task().checkpoint_key(agent(), "upstream") == task().checkpoint_key(
+        agent(), "upstream"
+    )
+    # tool order does not matter
+    tools = list(reversed(agent().tools))
+    assert task().checkpoint_key(agent(tools=tools), None) == task().checkpoint_key(
+        agent(), None
+    )
+
+
+def test_key_changes_with_the_prompt_agent_and_context():
+    key = task().checkpoint_key(agent(), "upstream")
+    assert task("Profile Globex").checkpoint_key(agent(), "upstream") != key
+    assert task().checkpoint_key(agent(goal="Sell"), "upstream") != key
+    assert (
+        task().checkpoint_key(
+            agent(llm=SimpleNamespace(model="gpt-4o-mini")), "upstream"
+        )
+        != key
+    )
+    assert task().checkpoint_key(agent(tools=[]), "upstream") != key
+    assert task().checkpoint_key(agent(), "other upstream") != key
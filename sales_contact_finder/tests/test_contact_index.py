@@ -0,0 +1,132 @@
+"""ContactIndex: company id cache, contact dedupe and the sync/async create guard."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.tools.contact_index import ContactIndex, normalize_company_name
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ContactIndex(str(tmp_path / "index.db"))
+
+
+def test_company_names_are_normalized():
+    assert normalize_company_name("Acme, Inc.") == "acme"
+    assert normalize_company_name("ACME Corp") == "acme"
+    assert normalize_company_name("Company") == "company"  # never emptied
+
+
+def test_company_is_created_once(index):
+    created = []
+
+    def create(name):
+        created.append(name)
+        return len(created)
+
+    assert index.resolve_company_id("Acme, Inc.", create) == 1
+    assert index.resolve_company_id("acme", create) == 1
+    assert created == ["Acme, Inc."]
+    # the index survives a restart
+    assert ContactIndex(index.path).company_id("ACME LLC") == 1
+
+
+def test_known_contacts_are_dropped(index):
+    index.remember_contacts(
+        "Acme", [{"name": "Ann Lee", "title": "CTO", "email": "ann@acme.com"}]
+    )
+    contacts = [
+        {"name": "Ann Lee", "email": "ANN@acme.com"},  # same email
+        {"name": "Ann Lee", "title": "CTO"},  # same name and title
+        {"name": "Bo Chen", "linkedin_url": "https://www.linkedin.com/in/bo/"},
+        {"name": "Bo Chen", "linkedin_url": "linkedin.com/in/bo?trk=x"},  # repeat
+        {"name": "N/A", "email": "unknown"},  # nothing to identify it by
+    ]
+    assert index.new_contacts("Acme Inc", contacts) == [contacts[2], contacts[4]]
+
+
+def test_sync_and_async_callers_create_a_company_once(index):
+    created = []
+
+    def create(name):
+        time.sleep(0.2)
+        created.append("sync")
+        return "sync-id"
+
+    async def acreate(name):
+        await asyncio.sleep(0.2)
+        created.append("async")
+        return "async-id"
+
+    async def run():
+        thread = threading.Thread(
+            target=index.resolve_company_id, args=("Acme", create)
+        )
+        thread.start()
+        time.sleep(0.05)  # the sync caller holds the lock
+        ids = await asyncio.gather(
+            *(index.aresolve_company_id("Acme", acreate) for _ in range(3))
+        )
+        await asyncio.to_thread(thread.join)
+        return ids
+
+    assert asyncio.run(run()) == ["sync-id"] * 3
+    assert created == ["sync"]
+
+
+def test_waiting_for_the_create_lock_does_not_block_the_loop(index):
+    release = threading.Event()
+
+    def create(name):
+        release.wait(5)
+        return "sync-id"
+
+    async def run():
+        thread = threading.Thread(
+            target=index.resolve_company_id, args=("Acme", create)
+        )
+        thread.start()
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(index.aresolve_company_id("Acme", None))
+        # the loop keeps running while the waiter is blocked on the sync lock
+        started = time.monotonic()
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+        ticking = time.monotonic() - started
+        release.set()
+        company_id = await waiter
+        await asyncio.to_thread(thread.join)
+        return ticking, company_id
+
+    ticking, company_id = asyncio.run(run())
+    assert ticking < 1
+    assert company_id == "sync-id"
+
+
+def test_a_cancelled_waiter_gives_the_lock_back(index):
+    release = threading.Event()
+
+    async def run():
+        thread = threading.Thread(
+            target=index.resolve_company_id,
+            args=("Acme", lambda name: release.wait(5) and "sync-id"),
+        )
+        thread.start()
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(index.aresolve_company_id("Globex", None))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.to_thread(thread.join)
+
+        async def acreate(name):
+            return "globex-id"
+
+        return await asyncio.wait_for(index.aresolve_company_id("Globex", acreate), 2)
+
+    assert asyncio.run(run()) == "globex-id"
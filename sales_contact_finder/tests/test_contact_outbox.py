@@ -0,0 +1,212 @@
+"""ContactOutbox and the write-behind tool path against the local GibsonAI stand-in."""
+
+import asyncio
+import json
+import sqlite3
+import time
+
+import pytest
+
+from src.tools.contact_index import ContactIndex
+from src.tools.contact_outbox import ContactOutbox
+from src.tools.contact_storage_tool import ContactStorageTool
+from src.tools.gibson_client import GibsonAIClient
+
+CONTACTS = [
+    {"name": "Ann Lee", "title": "CTO", "email": "ann@acme.com"},
+    {"name": "Bo Chen", "title": "VP Sales", "email": "bo@acme.com"},
+]
+
+
+@pytest.fixture
+def client(gibson):
+    client = GibsonAIClient("test", gibson.base_url, max_concurrency=2)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def outbox(tmp_path, client):
+    return ContactOutbox(
+        str(tmp_path / "outbox.db"), client, poll_interval=0.05, max_attempts=3
+    )
+
+
+def rows(outbox: ContactOutbox):
+    with sqlite3.connect(outbox.path) as conn:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute("SELECT * FROM contact_outbox")]
+
+
+def stored_names(gibson):
+    return sorted(contact["name"] for contact in gibson.contacts)
+
+
+def test_flush_delivers_and_removes_the_entry(outbox, gibson):
+    outbox.append("Acme", CONTACTS)
+    assert outbox.pending() == 1
+    assert outbox.flush_once() == 1
+    assert outbox.pending() == 0 and rows(outbox) == []
+    assert gibson.requests == {"sales-company": 1, "sales-contact": 2}
+    assert stored_names(gibson) == ["Ann Lee", "Bo Chen"]
+
+
+def test_stored_contacts_are_indexed(tmp_path, client, gibson):
+    index = ContactIndex(str(tmp_path / "index.db"))
+    outbox = ContactOutbox(str(tmp_path / "outbox.db"), client, index=index)
+    outbox.append("Acme", CONTACTS)
+    # queued, but not stored yet: a later call still writes them
+    assert index.new_contacts("Acme", CONTACTS) == CONTACTS
+    outbox.flush_once()
+    assert index.new_contacts("Acme", CONTACTS) == []
+    assert index.company_id("Acme Inc") is not None
+
+
+def test_server_errors_are_retried_with_backoff(outbox, gibson):
+    gibson.statuses = [503]  # the company insert fails once
+    outbox.append("Acme", CONTACTS)
+    before = time.time()
+    outbox.flush_once()
+
+    (row,) = rows(outbox)
+    assert row["status"] == "pending" and row["attempts"] == 1
+    assert "503" in row["last_error"]
+    # the first retry waits poll_interval * 2, with jitter
+    assert before + 0.05 <= row["next_attempt_at"] <= time.time() + 0.1
+    assert outbox.flush_once() == 0  # not due yet
+
+    assert outbox.drain(timeout=2) == 0
+    assert rows(outbox) == []
+    assert stored_names(gibson) == ["Ann Lee", "Bo Chen"]
+
+
+def test_only_failed_contacts_are_retried(outbox, gibson):
+    gibson.statuses = [None, 500]  # company ok, first contact insert fails
+    outbox.append("Acme", CONTACTS)
+    outbox.flush_once()
+    (row,) = rows(outbox)
+    assert len(json.loads(row["contacts"])) == 1
+    # the retry reuses the company id instead of inserting the company again
+    assert row["company_id"] is not None
+    assert outbox.drain(timeout=2) == 0
+    assert gibson.requests["sales-company"] == 1
+    assert stored_names(gibson) == ["Ann Lee", "Bo Chen"]
+
+
+def test_rejected_contacts_are_marked_failed(outbox, gibson):
+    gibson.rejected = {"Bo Chen": 422}
+    outbox.append("Acme", CONTACTS)
+    outbox.flush_once()
+
+    assert outbox.pending() == 0
+    (failed,) = outbox.failed()
+    assert [contact["name"] for contact in failed["contacts"]] == ["Bo Chen"]
+    assert failed["attempts"] == 1 and "422" in failed["last_error"]
+    assert stored_names(gibson) == ["Ann Lee"]
+    # failed entries are not picked up again
+    assert outbox.flush_once() == 0
+
+
+@pytest.mark.parametrize("status", [408, 429, 500])
+def test_retryable_statuses_are_not_failed(outbox, gibson, status):
+    gibson.rejected = {"Bo Chen": status}
+    outbox.append("Acme", CONTACTS)
+    outbox.flush_once()
+    assert outbox.pending() == 1 and outbox.failed() == []
+
+
+def test_entries_fail_after_max_attempts(outbox, gibson):
+    gibson.statuses = [503] * 10
+    outbox.append("Acme", CONTACTS)
+    outbox.drain(timeout=3)
+
+    assert outbox.pending() == 0
+    (failed,) = outbox.failed()
+    assert failed["attempts"] == 3 and len(failed["contacts"]) == 2
+    assert gibson.requests == {"sales-company": 3}
+
+
+def test_entries_resume_after_a_restart(tmp_path, client, gibson):
+    path = str(tmp_path / "outbox.db")
+    down = GibsonAIClient("test", "http://127.0.0.1:9", max_concurrency=1)
+    crashed = ContactOutbox(path, down, poll_interval=0.05)
+    crashed.append("Acme", CONTACTS)
+    crashed.append("Globex", CONTACTS[:1])
+    crashed.flush_once()  # the API is unreachable; both entries stay queued
+    down.close()
+    assert crashed.pending() == 2
+
+    restarted = ContactOutbox(path, client, poll_interval=0.05)
+    restarted.start()
+    try:
+        deadline = time.time() + 3
+        while restarted.pending() and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        restarted.stop()
+    assert restarted.pending() == 0
+    assert stored_names(gibson) == ["Ann Lee", "Ann Lee", "Bo Chen"]
+
+
+def test_old_outbox_files_are_migrated(tmp_path, client):
+    path = str(tmp_path / "outbox.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE contact_outbox (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " company_name TEXT NOT NULL, company_id TEXT, contacts TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL,"
+            " last_error TEXT, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO contact_outbox (company_name, contacts, next_attempt_at,"
+            " created_at) VALUES ('Acme', '[]', 0, 0)"
+        )
+    assert ContactOutbox(path, client).pending() == 1
+
+
+@pytest.fixture
+def tool_env(tmp_path, gibson, monkeypatch):
+    monkeypatch.setenv("GIBSONAI_API_KEY", "test")
+    monkeypatch.setenv("GIBSONAI_API_BASE_URL", gibson.base_url)
+    monkeypatch.setenv("GIBSONAI_OUTBOX_PATH", str(tmp_path / "outbox.db"))
+    monkeypatch.setenv("GIBSONAI_INDEX_PATH", str(tmp_path / "index.db"))
+    return gibson
+
+
+def payload(company_name: str = "Acme") -> str:
+    return json.dumps({"company_name": company_name, "contacts": CONTACTS})
+
+
+def test_write_behind_returns_before_the_api_answers(tool_env, tmp_path):
+    tool_env.latency = 0.5
+    tool = ContactStorageTool()
+    started = time.perf_counter()
+    result = tool._run(payload())
+    assert time.perf_counter() - started < 0.5
+    assert result.startswith("Queued company 'Acme' with 2 contacts")
+
+    from src.tools.contact_outbox import get_outbox
+
+    outbox = get_outbox(tool.outbox_path, tool._new_client)
+    try:
+        assert outbox.drain(timeout=5) == 0
+    finally:
+        outbox.stop()
+    assert stored_names(tool_env) == ["Ann Lee", "Bo Chen"]
+    # a rerun finds every contact in the index and writes nothing
+    assert "already stored" in tool._run(payload())
+
+
+def test_async_path_stores_through_the_async_client(tool_env, monkeypatch):
+    monkeypatch.setenv("GIBSONAI_WRITE_BEHIND", "false")
+    tool_env.rejected = {"Bo Chen": 422}
+    tool = ContactStorageTool()
+
+    first = asyncio.run(tool._arun(payload()))
+    assert "Stored 1 of 2 contacts" in first and "422" in first
+    # the rerun skips the stored contact and reuses the indexed company id
+    second = asyncio.run(tool._arun(payload("Acme, Inc.")))
+    assert "Stored 0 of 1 contacts" in second
+    assert tool_env.requests == {"sales-company": 1, "sales-contact": 3}
+    assert stored_names(tool_env) == ["Ann Lee"]
+    tool._client.close()
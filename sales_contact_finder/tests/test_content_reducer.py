@@ -0,0 +1,82 @@
+"""ContentReducer: boilerplate filtering, dedupe per task and the token budget."""
+
+import pytest
+
+from src.tools.content_reducer import MIN_PARTIAL_CHARS, ContentReducer
+from src.tracing import CHARS_PER_TOKEN
+
+
+def sentence(n: int, words: int = 12) -> str:
+    return " ".join(f"word{n}x{i}" for i in range(words - 1)) + " Acme."
+
+
+def page(lines: int, words: int = 12) -> str:
+    return "\n".join(sentence(n, words) for n in range(lines))
+
+
+PAGES = {
+    "short passages": page(40),
+    "passages longer than the budget": page(3, words=400),
+    "one flattened line": page(1, words=2000),
+    "mixed": "\n".join([page(5), page(2, words=300), page(30, words=5)]),
+    "no sentences": " ".join(["x" * 30] * 300),
+    "budget nearly used up": page(2, words=45) + "\n" + page(2, words=300),
+}
+
+
+@pytest.mark.parametrize("text", PAGES.values(), ids=PAGES.keys())
+@pytest.mark.parametrize("token_budget", [60, 100, 500])
+def test_output_fits_the_budget(text, token_budget):
+    reduced = ContentReducer(token_budget=token_budget).reduce(text, "task")
+    assert reduced
+    assert len(reduced) <= token_budget * CHARS_PER_TOKEN
+
+
+def test_boilerplate_is_removed_per_sentence():
+    text = (
+        "We use cookies to improve your experience. Accept all. "
+        "Acme builds billing software for 4,000 hospitals across Europe and Asia. "
+        "Copyright 2024 Acme Inc. All rights reserved."
+    )
+    reduced = ContentReducer().reduce(text, "task")
+    assert reduced == (
+        "Acme builds billing software for 4,000 hospitals across Europe and Asia."
+    )
+
+
+def test_repeated_passages_are_dropped_for_the_same_task():
+    reducer = ContentReducer()
+    text = page(10)
+    first = reducer.reduce(text, "task")
+    assert reducer.reduce(text, "task") == (
+        "This page only repeats content that was already returned."
+    )
+    assert reducer.reduce(text, "other task") == first
+
+
+def test_focus_terms_rank_passages_first():
+    reducer = ContentReducer(token_budget=(MIN_PARTIAL_CHARS + 200) // CHARS_PER_TOKEN)
+    reducer.set_focus("Globex")
+    filler = page(10)
+    relevant = "Globex appointed a new CTO to lead its cloud platform team this year."
+    reduced = reducer.reduce(filler + "\n" + relevant, "task")
+    assert relevant in reduced
+
+
+def test_a_page_without_content_falls_back_to_the_raw_text():
+    reducer = ContentReducer(token_budget=5)
+    text = "Home | About | Contact us | Log in | Sign up"
+    assert reducer.reduce(text, "task") == "Home | About |"
+    assert reducer.stats()["task"]["pages"] == 1
+
+
+def test_product_is_left_out_of_the_focus_of_product_neutral_tasks():
+    reducer = ContentReducer(
+        token_budget=(MIN_PARTIAL_CHARS + 200) // CHARS_PER_TOKEN,
+        product_neutral_tasks=["profile"],
+    )
+    reducer.set_focus("Globex", product="Invoicely")
+    product = "Invoicely would replace the invoice spreadsheets used by finance."
+    text = page(10) + "\n" + product
+    assert product in reducer.reduce(text, "fit")
+    assert product not in reducer.reduce(text, "profile")
@@ -0,0 +1,112 @@
+"""ToolResultCache and the cached scrape tool against a local web server."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.tools import cached_tools
+from src.tools.cached_tools import CachedScrapeWebsiteTool
+from src.tools.tool_cache import ToolResultCache, normalize_query, normalize_url
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ToolResultCache(
+        str(tmp_path / "cache.db"), ttl_seconds=3600, max_bytes=1024 * 1024
+    )
+    monkeypatch.setattr(cached_tools, "get_tool_cache", lambda: cache)
+    return cache
+
+
+def test_arguments_are_normalized():
+    assert normalize_query("  Acme   CTO ") == normalize_query("acme cto")
+    assert normalize_url("WWW.Acme.com/about/?utm_source=x#team") == (
+        "https://acme.com/about"
+    )
+    assert normalize_url("https://acme.com/?b=2&a=1") == "https://acme.com/?a=1&b=2"
+
+
+def test_results_are_cached_until_they_expire(cache):
+    calls = []
+
+    def run():
+        calls.append(1)
+        return {"organic": [len(calls)]}
+
+    args = {"search_query": "acme cto"}
+    assert cache.get_or_run("serper", args, run) == {"organic": [1]}
+    assert cache.get_or_run("serper", args, run) == {"organic": [1]}
+    assert cache.stats() == {"serper": {"hits": 1, "misses": 1}}
+
+    cache.ttl_seconds = 0
+    assert cache.get_or_run("serper", args, run) == {"organic": [2]}
+
+
+def test_empty_results_are_not_cached(cache):
+    assert cache.get_or_run("serper", {"q": 1}, lambda: None) is None
+    assert cache.get("serper", {"q": 1}) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.max_bytes = 350  # three entries of 102 bytes (JSON encoded)
+    for n in range(3):
+        cache.put("scrape", {"url": n}, "x" * 100)
+        time.sleep(0.01)
+    cache.get("scrape", {"url": 0})  # keeps the oldest entry in use
+    cache.put("scrape", {"url": 3}, "x" * 100)
+    kept = [n for n in range(4) if cache.get("scrape", {"url": n}) is not None]
+    assert kept == [0, 2, 3]
+
+
+@pytest.fixture
+def website():
+    """Serves /about, and answers anything else with the status in its path."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == "/about":
+                status, body = 200, "<h1>Acme</h1><p>Acme builds billing software.</p>"
+            else:
+                status = int(self.path.strip("/"))
+                body = "<h1>Error</h1><p>This page is not available.</p>"
+            payload = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    server.hits = hits
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pages_are_scraped_once(cache, website):
+    tool = CachedScrapeWebsiteTool()
+    first = tool._run(website_url=f"{website.url}/about")
+    assert "Acme builds billing software." in first
+    assert tool._run(website_url=f"{website.url}/about/") == first
+    assert website.hits == ["/about"]
+
+
+@pytest.mark.parametrize("status", [403, 404, 500, 503])
+def test_error_pages_are_not_cached(cache, website, status):
+    tool = CachedScrapeWebsiteTool()
+    url = f"{website.url}/{status}"
+    result = tool._run(website_url=url)
+    assert result.startswith(f"Failed to scrape {url}: HTTP {status}")
+    assert "not available" not in result
+    tool._run(website_url=url)
+    assert website.hits == [f"/{status}", f"/{status}"]
+    assert cache.get("scrape", {"website_url": normalize_url(url)}) is None